@@ -1,31 +1,48 @@
 # app.py — Complete robust Streamlit app for Mood-Based Playlist Manager
 import streamlit as st
-import pandas as pd
 from datetime import datetime,timezone
+import asyncio
+import contextlib
 import hashlib
-from dotenv import load_dotenv
-import os
-from supabase import create_client
+import inspect
+import threading
 import uuid
 
 # -------------------------
-# Load env & create supabase
+# Shared supabase client (created lazily, pooled — see database.py)
 # -------------------------
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+from database import supabase
 
 # -------------------------
-# Import DAO classes (must exist in dao/ folder)
+# DAO classes and heavy dependencies (pandas, numpy) are imported on first use by the page
+# that needs them, so the login screen renders without loading them (see lazy.py)
 # -------------------------
-from dao.user_dao import UserDAO
-from dao.playlist_dao import PlaylistDAO
-from dao.mood_dao import MoodDAO
-from dao.song_dao import SongDAO
-from dao.artist_dao import ArtistDAO
-from dao.playlist_song_dao import PlaylistSongDAO
-from dao.report_dao import ReportDAO
+from lazy import lazy_attr, lazy_module
+UserDAO = lazy_attr("dao.user_dao", "UserDAO")
+PlaylistDAO = lazy_attr("dao.playlist_dao", "PlaylistDAO")
+MoodDAO = lazy_attr("dao.mood_dao", "MoodDAO")
+SongDAO = lazy_attr("dao.song_dao", "SongDAO")
+ArtistDAO = lazy_attr("dao.artist_dao", "ArtistDAO")
+PlaylistSongDAO = lazy_attr("dao.playlist_song_dao", "PlaylistSongDAO")
+ReportDAO = lazy_attr("dao.report_dao", "ReportDAO")
+fan_out = lazy_attr("dao.fan_out", "fan_out")
+UnitOfWork = lazy_attr("dao.unit_of_work", "UnitOfWork")
+SongIndex = lazy_attr("recommender", "SongIndex")
+pd = lazy_module("pandas")
+playlist_generator = lazy_module("playlist_generator")
+rollups = lazy_module("rollups")
+from dao.projections import columns_for
+from local_model import LocalModel
+import instrumentation
+from config import INSTRUMENTATION_ENABLED
+
+UI_PAGE_SIZE = 100  # rows per page on the paginated Songs/Users tables
+PLAYLIST_LIST_COLUMNS = ["playlist_id", "playlist_name", "description", "created_at"]
+SEARCH_LIMIT = 25   # playlist search results shown
+CACHE_TTL = 300     # seconds a cached read may be served without a mutation
+CACHE_MAX_ENTRIES = 1000
+RECOMMEND_K = 10    # suggested songs shown per mood
+SYNC_POLL_SECONDS = 1  # how often the page checks background writes while any are in flight
 
 # -------------------------
 # Small helpers
@@ -41,178 +58,700 @@ def _data_of(resp):
         return resp.data
     return resp
 
+# -------------------------
+# Session-held data model (optimistic updates, see local_model.py)
+# Pages read through this session's LocalModel, which keeps the rows it served. The mutation helpers
+# below edit those rows first and sync with the server on a background thread, so the st.rerun()
+# after a change renders from memory: adding a song is one write request and no reads. A failed
+# write is rolled back and logged as it happens; while changes are syncing the page polls
+# (sync_status) and reruns as soon as one is rolled back, so the error shows without another click. Outside a Streamlit session (scripts,
+# benchmark.py) there is no model and the helpers run synchronously, as before.
+# -------------------------
+@contextlib.contextmanager
+def _attached(ctx):
+    """Attach a Streamlit script context to the current thread, restoring the previous one on exit.
+
+    Worker threads are pooled, so a context left attached would outlive its session.
+    """
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    thread = threading.current_thread()
+    previous = get_script_run_ctx(suppress_warning=True)
+    add_script_run_ctx(thread, ctx)
+    try:
+        yield
+    finally:
+        add_script_run_ctx(thread, previous)
+
+def _local_model():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    model = st.session_state.get("local_model")
+    if model is None:
+        # the sync thread uses st.cache_* (dispatch table, cache versions) under this session's context
+        model = LocalModel(ttl=CACHE_TTL, sync_context=lambda: _attached(ctx),
+                           on_failure=lambda message: print(f"❌ {message}"))
+        st.session_state["local_model"] = model
+    return model
+
+def _key(columns):
+    return tuple(columns) if isinstance(columns, list) else columns
+
+def _viewed(key, version_fn, load):
+    """load(version) through the session model; key names the held copy, e.g. ("moods", user_id, cols)."""
+    model = _local_model()
+    if model is None:
+        return load(version_fn())
+    return model.view(key, lambda: load(version_fn()), version_fn)
+
+def _mutate(label, remote, apply, revert, reconcile=None, optimistic=True):
+    """Apply locally and sync remote() in the background; returns `optimistic` at once.
+    Without a session model, returns remote()'s result."""
+    model = _local_model()
+    if model is None:
+        return remote()
+    model.mutate(label, apply, revert, remote, reconcile)
+    return optimistic
+
+def _rows_in(value):
+    """The row list inside a held value: a list, a (rows, cursor) page or a playlist detail's songs."""
+    if isinstance(value, tuple):
+        return value[0]
+    if isinstance(value, dict):
+        return value.setdefault("songs", [])
+    return value
+
+def _held_row(model, prefix, id_col, row_id):
+    """A row with row_id from any held list under prefix (e.g. a song's title for an optimistic add)."""
+    for key in model.keys(prefix):
+        for row in _rows_in(model.get(key)) or []:
+            if row.get(id_col) == row_id:
+                return row
+    return None
+
+def _local_insert(prefixes, row, id_col):
+    """apply/revert/reconcile that show a new row in every held list under prefixes.
+
+    reconcile swaps the placeholder for the row the server returned (its real ID and defaults).
+    """
+    placeholder = row[id_col]
+    def apply(model):
+        keys = []
+        for prefix in prefixes:
+            keys += model.edit(prefix, lambda v: _rows_in(v).append(dict(row)))
+        return keys
+    def revert(model):
+        for prefix in prefixes:
+            for key in model.keys(prefix):
+                rows = _rows_in(model.get(key))
+                rows[:] = [r for r in rows if r.get(id_col) != placeholder]
+    def reconcile(model, created):
+        created = _data_of(created)
+        created = created[0] if isinstance(created, list) and created else created
+        if not isinstance(created, dict):
+            return
+        for prefix in prefixes:
+            for key in model.keys(prefix):
+                rows = _rows_in(model.get(key))
+                for i, r in enumerate(rows):
+                    if r.get(id_col) == placeholder:
+                        rows[i] = {**r, **created}
+    return apply, revert, reconcile
+
+def _local_remove(prefixes, id_col, ids):
+    """apply/revert that hide rows with the given ids from held lists, restoring them in place on revert."""
+    ids = set(ids)
+    removed = {}
+    def apply(model):
+        keys = []
+        for prefix in prefixes:
+            def take(v):
+                rows = _rows_in(v)
+                gone = [(i, r) for i, r in enumerate(rows) if r.get(id_col) in ids]
+                rows[:] = [r for r in rows if r.get(id_col) not in ids]
+                return gone
+            for key, gone in model.edit(prefix, take).items():
+                removed[key] = gone
+                keys.append(key)
+        return keys
+    def revert(model):
+        for key, gone in removed.items():
+            if model.get(key) is None:
+                continue
+            rows = _rows_in(model.get(key))
+            for i, r in gone:
+                rows.insert(min(i, len(rows)), r)
+    return apply, revert
+
+def _local_add_songs(model_playlist_id, song_ids):
+    """apply/revert that add catalog songs to the held copies of one playlist's song list."""
+    prefixes = [("detail", model_playlist_id), ("playlist_songs", model_playlist_id)]
+    added = {}
+    def apply(model):
+        keys = []
+        for prefix in prefixes:
+            def add(v):
+                rows = _rows_in(v)
+                have = {r.get("song_id") for r in rows}
+                new = [sid for sid in song_ids if sid not in have]
+                rows.extend(dict(_held_row(model, ("catalog",), "song_id", sid) or {"song_id": sid}) for sid in new)
+                return new
+            for key, new in model.edit(prefix, add).items():
+                added[key] = set(new)
+                keys.append(key)
+        return keys
+    def revert(model):
+        for key, new in added.items():
+            value = model.get(key)
+            if value is not None:
+                rows = _rows_in(value)
+                rows[:] = [r for r in rows if r.get("song_id") not in new]
+    return apply, revert
+
 # -------------------------
 # Flexible DAO wrappers
-# These try multiple common method names/signatures so app works with slightly different DAOs
+# These accept several common method names/signatures so app works with slightly different DAOs.
+# The binding that works is resolved once per operation and kept in a dispatch table, so later
+# calls make exactly one request instead of walking the candidate list again.
 # -------------------------
-def list_playlists_for_user(dao: PlaylistDAO, user_id: str):
+@st.cache_resource
+def _dispatch_table():
+    """(operation, DAO classes) -> (candidate index or "direct", label). Survives reruns."""
+    return {}
+
+def resolved_dispatch():
+    """Which path each operation was bound to, e.g. {"create_playlist": "direct supabase query"}."""
+    return {key[0]: label for key, (_, label) in _dispatch_table().items()}
+
+def _binds(obj, name, args):
+    """True if obj.name exists and accepts args — checked locally, without a request."""
+    fn = getattr(obj, name, None)
+    if not callable(fn):
+        return False
+    try:
+        inspect.signature(fn).bind(*args)
+    except TypeError:
+        return False
+    except ValueError:
+        pass  # no introspectable signature; let the call decide
+    return True
+
+def _dispatch(op, candidates, accept, direct, failure):
+    """Run op through its resolved binding, resolving it on first success.
+
+    candidates: [(dao, method_name, args)], tried in order on the first call only.
+    accept(result) -> (ok, value); direct() -> (ok, value) is the raw supabase fallback.
+    """
+    table = _dispatch_table()
+    key = (op,) + tuple(sorted({type(obj).__name__ for obj, _, _ in candidates}))
+    chosen = table.get(key)
+    if chosen is not None:
+        index = chosen[0]
+        try:
+            if index == "direct":
+                return direct()[1]
+            obj, name, args = candidates[index]
+            return accept(getattr(obj, name)(*args))[1]
+        except Exception as e:
+            print(f"{op} via {chosen[1]} failed:", e)
+            instrumentation.record("dispatch", op, error=f"{type(e).__name__}: {e}")
+            return failure
+
+    for i, (obj, name, args) in enumerate(candidates):
+        if not _binds(obj, name, args):
+            continue
+        try:
+            ok, value = accept(getattr(obj, name)(*args))
+        except Exception as e:
+            # resolving the binding: each failed candidate costs a retry
+            instrumentation.record("dispatch", op, retries=1, error=f"{type(obj).__name__}.{name}: {e}")
+            continue
+        if ok:
+            table[key] = (i, f"{type(obj).__name__}.{name}/{len(args)}")
+            return value
+    try:
+        ok, value = direct()
+    except Exception as e:
+        print(f"{op} direct query failed:", e)
+        instrumentation.record("dispatch", op, error=f"direct: {e}")
+        return failure
+    if ok:
+        table[key] = ("direct", "direct supabase query")
+    return value
+
+def _accept_list(res):
+    data = _data_of(res)
+    if data is None:
+        return False, []
+    return True, data if isinstance(data, list) else [data]
+
+def _accept_row(res):
+    data = _data_of(res)
+    if not data:
+        return False, None
+    return True, data[0] if isinstance(data, list) else data
+
+def _accept_done(res):
+    return True, True
+
+def list_playlists_for_user(dao: PlaylistDAO, user_id: str, columns=None):
     candidates = [
-        ("list_playlists_by_user", (user_id,)),
-        ("get_playlists_by_user", (user_id,)),
-        ("list_playlists", (user_id,)),
-        ("list_playlists", ()),
-        ("get_playlists", (user_id,)),
-        ("get_playlists", ()),
+        (dao, "list_playlists_by_user", (user_id, columns)),
+        (dao, "get_playlists_by_user", (user_id, columns)),
+        (dao, "list_playlists_by_user", (user_id,)),
+        (dao, "get_playlists_by_user", (user_id,)),
+        (dao, "list_playlists", (user_id,)),
+        (dao, "list_playlists", ()),
+        (dao, "get_playlists", (user_id,)),
+        (dao, "get_playlists", ()),
     ]
-    for name, args in candidates:
-        if hasattr(dao, name):
-            try:
-                res = getattr(dao, name)(*args)
-                data = _data_of(res)
-                if data is not None:
-                    return data if isinstance(data, list) else [data]
-            except TypeError:
-                # try without args
-                try:
-                    res = getattr(dao, name)()
-                    data = _data_of(res)
-                    if data is not None:
-                        return data if isinstance(data, list) else [data]
-                except Exception:
-                    pass
-            except Exception:
-                pass
-    # fallback to direct supabase query
-    try:
-        r = supabase.table("playlists").select("*").eq("user_id", user_id).execute()
-        return r.data or []
-    except Exception:
-        return []
+    def direct():
+        r = supabase.table("playlists").select(columns_for("playlists", columns)).eq("user_id", user_id).execute()
+        return True, r.data or []
+    return _dispatch("list_playlists", candidates, _accept_list, direct, [])
 
 def create_playlist_flexible(dao: PlaylistDAO, user_id: str, name: str, description: str = "", mood_id: str = None):
+    # the ID is chosen here, so the optimistic row and the stored row are the same playlist
+    payload = {
+        "playlist_id": str(uuid.uuid4()),
+        "playlist_name": name,
+        "user_id": user_id,
+        "mood_id": mood_id,
+        "description": description,
+        "created_at": datetime.now(timezone.utc).isoformat()  # ✅ fixed
+    }
     candidates = [
-        ("create_playlist", (user_id, name, description, mood_id)),
-        ("create_playlist", (name, description, mood_id, user_id)),
-        ("create_playlist", (name, description, mood_id)),
-        ("create_playlist", ({"playlist_id": str(uuid.uuid4()), "user_id": user_id, "playlist_name": name, "description": description, "mood_id": mood_id, "created_at": datetime.now(timezone.utc).isoformat()},)),
+        (dao, "create_playlist", (user_id, name, description, mood_id)),
+        (dao, "create_playlist", (name, description, mood_id, user_id)),
+        (dao, "create_playlist", (name, description, mood_id)),
+        (dao, "create_playlist", (dict(payload),)),
     ]
-    for nm, args in candidates:
-        if hasattr(dao, nm):
-            try:
-                res = getattr(dao, nm)(*args)
-                data = _data_of(res)
-                if data:
-                    return data[0] if isinstance(data, list) else data
-            except Exception:
-                pass
     # final fallback: insert directly
-    try:
-        payload = {
-            "playlist_id": str(uuid.uuid4()),
-            "playlist_name": name,
-            "user_id": user_id,
-            "mood_id": mood_id,
-            "description": description,
-            "created_at": datetime.now(timezone.utc).isoformat()  # ✅ fixed
-        }
+    def direct():
         r = supabase.table("playlists").insert(payload).execute()
-        return r.data[0] if getattr(r, "data", None) else None
-    except Exception as e:
-        print("Error creating playlist:", e)
-        return None
+        return True, (r.data[0] if getattr(r, "data", None) else None)
+    def remote():
+        created = _dispatch("create_playlist", candidates, _accept_row, direct, None)
+        if created:
+            invalidate_cached("playlists", user_id)
+        return created
+    apply, revert, reconcile = _local_insert([("playlists", user_id)], payload, "playlist_id")
+    return _mutate("Create playlist", remote, apply, revert, reconcile, optimistic=dict(payload))
+
+def create_playlist_with_songs(user_id: str, name: str, description: str = "", mood_id: str = None, song_ids=()):
+    """Create a playlist and fill it in one unit of work; returns the new row or None."""
+    playlist_id = str(uuid.uuid4())
+    payload = {
+        "playlist_id": playlist_id,
+        "playlist_name": name,
+        "user_id": user_id,
+        "mood_id": mood_id,
+        "description": description,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    def remote():
+        uow = UnitOfWork()
+        op = uow.insert("playlists", payload)
+        uow.add_songs_to_playlist(playlist_id, song_ids)
+        report = uow.flush()
+        invalidate_cached("playlists", user_id)
+        invalidate_cached("playlist_songs", playlist_id)
+        if report["failed"]:
+            print(f"create_playlist_with_songs: {report['failed']} of {report['operations']} operations failed")
+            return None
+        rows = report["results"][op]["rows"]
+        return rows[0] if rows else None
+    apply, revert, reconcile = _local_insert([("playlists", user_id)], payload, "playlist_id")
+    return _mutate("Create playlist", remote, apply, revert, reconcile, optimistic=dict(payload))
 
 def update_playlist_flexible(dao: PlaylistDAO, playlist_id: str, user_id: str = None, name: str = None, description: str = None, mood_id: str = None):
     candidates = [
-        ("update_playlist", (playlist_id, name, description, mood_id)),
-        ("update_playlist", (playlist_id, {"playlist_name": name, "description": description, "mood_id": mood_id})),
-        ("update_playlist", (playlist_id, name)),
-        ("update_playlist", (playlist_id, {"playlist_name": name})),
+        (dao, "update_playlist", (playlist_id, name, description, mood_id)),
+        (dao, "update_playlist", (playlist_id, {"playlist_name": name, "description": description, "mood_id": mood_id})),
+        (dao, "update_playlist", (playlist_id, name)),
+        (dao, "update_playlist", (playlist_id, {"playlist_name": name})),
     ]
-    for nm, args in candidates:
-        if hasattr(dao, nm):
-            try:
-                res = getattr(dao, nm)(*args)
-                return True
-            except Exception:
-                pass
     # fallback to supabase update
-    try:
+    def direct():
         upd = {}
         if name is not None: upd["playlist_name"] = name
         if description is not None: upd["description"] = description
         if mood_id is not None: upd["mood_id"] = mood_id
         if not upd:
-            return False
+            return True, False
         r = supabase.table("playlists").update(upd).eq("playlist_id", playlist_id).execute()
-        return bool(getattr(r, "data", None))
-    except Exception:
-        return False
+        return True, bool(getattr(r, "data", None))
+    def remote():
+        ok = _dispatch("update_playlist", candidates, _accept_done, direct, False)
+        if ok:
+            invalidate_cached("playlists", user_id)
+        return ok
+
+    changes = {k: v for k, v in (("playlist_name", name), ("description", description), ("mood_id", mood_id)) if v is not None}
+    previous = {}  # id(row) -> (row, old values)
+    def edit_row(row):
+        if row.get("playlist_id") == playlist_id:
+            previous[id(row)] = (row, {k: row.get(k) for k in changes})
+            row.update(changes)
+    def apply(model):
+        keys = list(model.edit(("playlists", user_id), lambda v: [edit_row(r) for r in v]))
+        def edit_detail(v):
+            edit_row(v.get("playlist") or {})
+            if "mood_id" in changes:
+                previous["mood"] = (v, v.get("mood"))
+                mood = _held_row(model, ("moods", user_id), "mood_id", mood_id)
+                v["mood"] = {"mood_id": mood_id, "mood_name": mood.get("mood_name")} if mood else None
+        return keys + list(model.edit(("detail", playlist_id), edit_detail))
+    def revert(model):
+        for key, saved in previous.items():
+            if key == "mood":
+                saved[0]["mood"] = saved[1]
+            else:
+                saved[0].update(saved[1])
+    return _mutate("Update playlist", remote, apply, revert)
 
 def delete_playlist_flexible(dao: PlaylistDAO, playlist_id: str, user_id: str = None):
     candidates = [
-        ("delete_playlist", (playlist_id,)),
-        ("delete_playlist", (playlist_id, user_id)),
-        ("delete_playlist_by_id", (playlist_id,)),
+        (dao, "delete_playlist", (playlist_id,)),
+        (dao, "delete_playlist", (playlist_id, user_id)),
+        (dao, "delete_playlist_by_id", (playlist_id,)),
     ]
-    for nm, args in candidates:
-        if hasattr(dao, nm):
-            try:
-                res = getattr(dao, nm)(*args)
-                return True
-            except Exception:
-                pass
-    try:
+    def direct():
         r = supabase.table("playlists").delete().eq("playlist_id", playlist_id).execute()
-        return bool(getattr(r, "data", None))
-    except Exception:
-        return False
+        return True, bool(getattr(r, "data", None))
+    def remote():
+        ok = _dispatch("delete_playlist", candidates, _accept_done, direct, False)
+        if ok:
+            invalidate_cached("playlists", user_id)
+            invalidate_cached("playlist_songs", playlist_id)
+        return ok
+    hide, unhide = _local_remove([("playlists", user_id)], "playlist_id", [playlist_id])
+    dropped = {}
+    def apply(model):
+        dropped.update(model.drop(("detail", playlist_id)))
+        return hide(model)
+    def revert(model):
+        unhide(model)
+        model.restore(dropped)
+    return _mutate("Delete playlist", remote, apply, revert)
 
 def add_song_to_playlist_flexible(playlist_dao: PlaylistDAO, playlist_id: str, song_id: str):
-    names = ["add_song_to_playlist", "add_song", "attach_song"]
-    for n in names:
-        if hasattr(playlist_dao, n):
-            try:
-                res = getattr(playlist_dao, n)(playlist_id, song_id)
-                return True
-            except Exception:
-                pass
-    try:
+    candidates = [(playlist_dao, n, (playlist_id, song_id)) for n in ("add_song_to_playlist", "add_song", "attach_song")]
+    def direct():
         r = supabase.table("playlist_songs").insert({"playlist_id": playlist_id, "song_id": song_id}).execute()
-        return bool(getattr(r, "data", None))
-    except Exception:
-        return False
+        return True, bool(getattr(r, "data", None))
+    def remote():
+        ok = _dispatch("add_song_to_playlist", candidates, _accept_done, direct, False)
+        if ok:
+            invalidate_cached("playlist_songs", playlist_id)
+        return ok
+    apply, revert = _local_add_songs(playlist_id, [song_id])
+    return _mutate("Add song", remote, apply, revert)
 
 def remove_song_from_playlist_flexible(playlist_dao: PlaylistDAO, playlist_id: str, song_id: str):
-    names = ["remove_song_from_playlist", "remove_song", "detach_song"]
-    for n in names:
-        if hasattr(playlist_dao, n):
-            try:
-                res = getattr(playlist_dao, n)(playlist_id, song_id)
-                return True
-            except Exception:
-                pass
-    try:
+    candidates = [(playlist_dao, n, (playlist_id, song_id)) for n in ("remove_song_from_playlist", "remove_song", "detach_song")]
+    def direct():
         r = supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).eq("song_id", song_id).execute()
-        return bool(getattr(r, "data", None))
-    except Exception:
+        return True, bool(getattr(r, "data", None))
+    def remote():
+        ok = _dispatch("remove_song_from_playlist", candidates, _accept_done, direct, False)
+        if ok:
+            invalidate_cached("playlist_songs", playlist_id)
+        return ok
+    apply, revert = _local_remove([("detail", playlist_id), ("playlist_songs", playlist_id)], "song_id", [song_id])
+    return _mutate("Remove song", remote, apply, revert)
+
+def add_songs_to_playlist_flexible(playlist_dao: PlaylistDAO, playlist_id: str, song_ids: list):
+    """Add many songs in one request; songs already in the playlist are ignored."""
+    song_ids = list(dict.fromkeys(song_ids))
+    if not song_ids:
         return False
+    candidates = [(playlist_dao, "add_songs_to_playlist", (playlist_id, song_ids))]
+    def direct():
+        rows = [{"playlist_id": playlist_id, "song_id": sid} for sid in song_ids]
+        supabase.table("playlist_songs").upsert(rows, on_conflict="playlist_id,song_id", ignore_duplicates=True).execute()
+        return True, True
+    def remote():
+        ok = _dispatch("add_songs_to_playlist", candidates, _accept_done, direct, False)
+        if ok:
+            invalidate_cached("playlist_songs", playlist_id)
+        return ok
+    apply, revert = _local_add_songs(playlist_id, song_ids)
+    return _mutate("Add songs", remote, apply, revert)
+
+def remove_songs_from_playlist_flexible(playlist_dao: PlaylistDAO, playlist_id: str, song_ids: list):
+    """Remove many songs in one request."""
+    song_ids = list(dict.fromkeys(song_ids))
+    if not song_ids:
+        return False
+    candidates = [(playlist_dao, "remove_songs_from_playlist", (playlist_id, song_ids))]
+    def direct():
+        supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).in_("song_id", song_ids).execute()
+        return True, True
+    def remote():
+        ok = _dispatch("remove_songs_from_playlist", candidates, _accept_done, direct, False)
+        if ok:
+            invalidate_cached("playlist_songs", playlist_id)
+        return ok
+    apply, revert = _local_remove([("detail", playlist_id), ("playlist_songs", playlist_id)], "song_id", song_ids)
+    return _mutate("Remove songs", remote, apply, revert)
+
+def move_song_flexible(playlist_song_dao: PlaylistSongDAO, playlist_id: str, song_id: str, index: int):
+    """Move a song to 0-based index; the server rewrites that one song's position key."""
+    def remote():
+        ok = playlist_song_dao.move_song(playlist_id, song_id, index) is not None
+        if ok:
+            invalidate_cached("playlist_songs", playlist_id)
+        return ok
+    before = {}  # key -> the list's previous order
+    def apply(model):
+        keys = []
+        for prefix in (("detail", playlist_id), ("playlist_songs", playlist_id)):
+            def move(v):
+                rows = _rows_in(v)
+                at = next((i for i, r in enumerate(rows) if r.get("song_id") == song_id), None)
+                if at is None:
+                    return None
+                saved = list(rows)
+                rows.insert(max(0, min(index, len(rows) - 1)), rows.pop(at))
+                return saved
+            for key, saved in model.edit(prefix, move).items():
+                if saved is not None:
+                    before[key] = saved
+                    keys.append(key)
+        return keys
+    def revert(model):
+        for key, saved in before.items():
+            if model.get(key) is not None:
+                _rows_in(model.get(key))[:] = saved
+    return _mutate("Move song", remote, apply, revert)
+
+def _pending_id():
+    # placeholder key for a row the server has not numbered yet; reconcile replaces it
+    return f"pending-{uuid.uuid4()}"
+
+def create_mood_flexible(dao: MoodDAO, user_id: str, name: str, description: str = ""):
+    def remote():
+        try:
+            created = dao.create_mood(user_id, name, description)
+        except TypeError:
+            created = dao.create_mood(name, description)
+        if created:
+            invalidate_cached("moods", user_id)
+        return created
+    row = {"mood_id": _pending_id(), "user_id": user_id, "mood_name": name, "description": description}
+    apply, revert, reconcile = _local_insert([("moods", user_id)], row, "mood_id")
+    return _mutate("Create mood", remote, apply, revert, reconcile)
+
+def create_song_flexible(dao: SongDAO, title: str, duration: int):
+    def remote():
+        try:
+            created = dao.create_song(title, duration)
+        except TypeError:
+            created = dao.create_song(None, title, duration)
+        invalidate_cached("songs")
+        return _data_of(created)
+    row = {"song_id": _pending_id(), "title": title, "duration": duration}
+    apply, revert, reconcile = _local_insert([("catalog",)], row, "song_id")
+    dropped = {}
+    def apply_all(model):
+        # pages are ordered by song_id, which the server assigns; reload them once the row exists
+        dropped.update(model.drop(("songs_page",)))
+        return apply(model)
+    def revert_all(model):
+        revert(model)
+        model.restore(dropped)
+    return _mutate("Create song", remote, apply_all, revert_all, reconcile)
+
+def create_artist_flexible(dao: ArtistDAO, user_id: str, name: str, description: str = ""):
+    def remote():
+        try:
+            created = dao.create_artist(user_id, name, description)
+        except TypeError:
+            created = dao.create_artist(name, description)
+        invalidate_cached("artists", user_id)
+        return _data_of(created)
+    row = {"artist_id": _pending_id(), "user_id": user_id, "name": name, "description": description}
+    apply, revert, reconcile = _local_insert([("artists", user_id)], row, "artist_id")
+    return _mutate("Create artist", remote, apply, revert, reconcile)
 
 def get_songs_in_playlist_flexible(playlist_song_dao: PlaylistSongDAO, playlist_dao: PlaylistDAO, playlist_id: str):
-    tries = [
-        (playlist_song_dao, "list_songs_in_playlist"),
-        (playlist_song_dao, "get_songs_in_playlist"),
-        (playlist_dao, "get_songs_in_playlist"),
-        (playlist_dao, "list_songs_in_playlist"),
+    candidates = [
+        (playlist_song_dao, "list_songs_in_playlist", (playlist_id,)),
+        (playlist_song_dao, "get_songs_in_playlist", (playlist_id,)),
+        (playlist_dao, "get_songs_in_playlist", (playlist_id,)),
+        (playlist_dao, "list_songs_in_playlist", (playlist_id,)),
     ]
-    for obj, name in tries:
-        if hasattr(obj, name):
-            try:
-                res = getattr(obj, name)(playlist_id)
-                data = _data_of(res)
-                if data is not None:
-                    return data if isinstance(data, list) else [data]
-            except Exception:
-                pass
-    # fallback: manual join
+    # fallback: join in one request via an embedded select
+    def direct():
+        ps = supabase.table("playlist_songs").select("song_id, songs(*)").eq("playlist_id", playlist_id).execute()
+        return True, [r["songs"] for r in (ps.data or []) if r.get("songs")]
+    return _dispatch("get_songs_in_playlist", candidates, _accept_list, direct, [])
+
+# -------------------------
+# Cached reads (st.cache_data)
+# Loaders take a `version` read from a table shared by all sessions. The mutation helpers above
+# bump only the (entity, scope) they touched, so a rerun re-queries just the data that changed.
+# Per-user data is keyed by user_id; the song catalog is global and shared across sessions.
+# -------------------------
+@st.cache_resource
+def _cache_versions():
+    """(entity, scope) -> version counter."""
+    return {}
+
+def _cache_version(entity, scope=None):
+    return _cache_versions().get((entity, scope), 0)
+
+def invalidate_cached(entity, scope=None):
+    versions = _cache_versions()
+    versions[(entity, scope)] = versions.get((entity, scope), 0) + 1
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_moods(user_id, columns, version):
+    mood_dao = MoodDAO()
+    return _data_of(mood_dao.get_moods_by_user(user_id, columns=columns)) or []
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_playlists(user_id, columns, version):
+    return list_playlists_for_user(PlaylistDAO(), user_id, columns=columns) or []
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_playlist_search(user_id, query, columns, version):
+    return PlaylistDAO().search_playlists(user_id, query, limit=SEARCH_LIMIT, columns=columns)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_playlists_by_mood(mood_id, columns, version):
+    return PlaylistDAO().get_playlists_by_mood(mood_id, columns=columns) or []
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_songs_in_playlist(playlist_id, version):
+    return get_songs_in_playlist_flexible(PlaylistSongDAO(), PlaylistDAO(), playlist_id) or []
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_song_catalog(columns, version):
+    return _data_of(SongDAO().list_songs(columns=columns)) or []
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_songs_page(after, limit, columns, version):
+    return SongDAO().list_songs_page(after=after, limit=limit, columns=columns)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_artists(user_id, version):
+    artist_dao = ArtistDAO()
+    if hasattr(artist_dao, "list_artists"):
+        return _data_of(artist_dao.list_artists()) or []
+    return _data_of(artist_dao.get_artists_by_user(user_id)) or []
+
+# The reads below go through the session model (_viewed), so the mutation helpers can edit what they
+# return; search and by-mood results are not edited optimistically and refresh through the versions.
+def cached_moods(user_id, columns="detail"):
+    return _viewed(("moods", user_id, _key(columns)), lambda: _cache_version("moods", user_id),
+                   lambda v: _load_moods(user_id, columns, v))
+
+def cached_playlists(user_id, columns=None):
+    return _viewed(("playlists", user_id, _key(columns)), lambda: _cache_version("playlists", user_id),
+                   lambda v: _load_playlists(user_id, columns, v))
+
+def cached_artists(user_id):
+    return _viewed(("artists", user_id), lambda: _cache_version("artists", user_id),
+                   lambda v: _load_artists(user_id, v))
+
+def cached_playlist_search(user_id, query, columns="summary"):
+    return _load_playlist_search(user_id, query, columns, _cache_version("playlists", user_id))
+
+def cached_playlists_by_mood(user_id, mood_id, columns="summary"):
+    # moods belong to one user, so that user's playlist mutations cover this key
+    return _load_playlists_by_mood(mood_id, columns, _cache_version("playlists", user_id))
+
+def cached_songs_in_playlist(playlist_id):
+    return _viewed(("playlist_songs", playlist_id), lambda: _cache_version("playlist_songs", playlist_id),
+                   lambda v: _load_songs_in_playlist(playlist_id, v))
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_playlist_detail(playlist_id, version):
+    return PlaylistDAO().get_playlist_detail(playlist_id)
+
+def cached_playlist_detail(user_id, playlist_id):
+    """Playlist + mood + songs in one round trip; changes to either the playlist or its songs refresh it."""
+    version = lambda: (_cache_version("playlists", user_id), _cache_version("playlist_songs", playlist_id))
+    return _viewed(("detail", playlist_id), version, lambda v: _load_playlist_detail(playlist_id, v))
+
+def cached_song_catalog(columns="summary"):
+    return _viewed(("catalog", _key(columns)), lambda: _cache_version("songs"),
+                   lambda v: _load_song_catalog(columns, v))
+
+def cached_songs_page(after=None, limit=UI_PAGE_SIZE, columns="detail"):
+    return _viewed(("songs_page", after, limit, _key(columns)), lambda: _cache_version("songs"),
+                   lambda v: _load_songs_page(after, limit, columns, v))
+
+@st.cache_resource(max_entries=1, show_spinner="Indexing song catalog…")
+def _song_index(version):
+    return SongIndex.from_pages(SongDAO().iter_songs(columns="detail"))
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_mood_seeds(mood_id, version):
+    return PlaylistDAO().get_song_ids_by_mood(mood_id)
+
+def recommend_songs(user_id, mood_id, mood_text="", k=RECOMMEND_K, exclude=()):
+    """Top-k catalog songs for a mood (see recommender.py); the index is rebuilt only when songs change."""
+    index = _song_index(_cache_version("songs"))
+    # membership edits refresh the seeds via CACHE_TTL; playlist create/update/delete bump them at once
     try:
-        ps = supabase.table("playlist_songs").select("song_id").eq("playlist_id", playlist_id).execute()
-        ids = [r["song_id"] for r in (ps.data or []) if r.get("song_id")]
-        if not ids:
-            return []
-        songs = supabase.table("songs").select("*").in_("song_id", ids).execute()
-        return songs.data or []
-    except Exception:
+        seeds = _load_mood_seeds(mood_id, _cache_version("playlists", user_id))
+    except Exception as e:
+        st.warning(f"Couldn't load this mood's playlists ({e}); suggestions use the mood name only.")
+        seeds = []
+    if not seeds and not mood_text:
         return []
+    return index.recommend(seeds, text=mood_text, k=k, exclude=exclude)
+
+def _in_script_ctx(fn):
+    """Let fn use st.cache_data from a worker thread without missing-context warnings."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return fn
+    ctx = get_script_run_ctx()
+    def run(*args):
+        with _attached(ctx):
+            return fn(*args)
+    return run
+
+def prefetch(**calls):
+    """Run a page's independent cached loaders concurrently, e.g. prefetch(moods=(cached_moods, uid)).
+
+    Cache hits return immediately and misses overlap, so the page waits for its slowest
+    query rather than the sum of them. Returns {name: result, or None if it failed}.
+    """
+    coros = {name: asyncio.to_thread(_in_script_ctx(fn), *args) for name, (fn, *args) in calls.items()}
+    results = fan_out(**coros)
+    for name, value in results.items():
+        if isinstance(value, Exception):
+            print(f"prefetch {name} failed:", value)
+            results[name] = None
+    return results
+
+def keyset_pager(state_key: str, fetch_page, page_size: int = UI_PAGE_SIZE):
+    """Render Prev/Next controls over a keyset-paginated DAO method and return the current page.
+
+    session_state[state_key] holds the cursor each visited page started from, so
+    going back never re-reads the pages in between.
+    """
+    cursors = st.session_state.setdefault(state_key, [None])
+    rows, next_cursor = fetch_page(after=cursors[-1], limit=page_size)
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    if col_prev.button("◀ Prev", key=f"{state_key}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    col_info.caption(f"Page {len(cursors)} · {len(rows)} rows")
+    if col_next.button("Next ▶", key=f"{state_key}_next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+    return rows
 
 # -------------------------
 # Auth helpers & UI
@@ -244,15 +783,28 @@ def ensure_profile_and_sync(user_id: str, email: str):
     except Exception as e:
         print("ensure_profile_and_sync() error:", e)
 
+def sync_profile(user_id: str, email: str):
+    """The users row for this auth user, created or adopted if needed; one RPC round trip.
+    Falls back to ensure_profile_and_sync() plus a role lookup when the RPC is not deployed."""
+    profile = UserDAO().sync_profile(user_id, email)
+    if profile is not None:
+        return profile
+    ensure_profile_and_sync(user_id, email)
+    try:
+        resp = supabase.table("users").select("role").eq("user_id", user_id).maybe_single().execute()
+        return getattr(resp, "data", None) or {}
+    except Exception as e:
+        print("sync_profile() role lookup error:", e)
+        return {}
+
 def sign_in(email: str, password: str):
     try:
         res = supabase.auth.sign_in_with_password({"email": email, "password": password})
         user = getattr(res, "user", None) or (getattr(res, "data", {}) or {}).get("user")
         sess = getattr(res, "session", None) or (getattr(res, "data", {}) or {}).get("session")
         if user and getattr(user, "id", None):
-            ensure_profile_and_sync(user.id, email)
-            role_resp = supabase.table("users").select("role").eq("user_id", user.id).maybe_single().execute()
-            role = role_resp.data.get("role") if getattr(role_resp, "data", None) else "User"
+            # the role is read here once and kept in session state until sign-out
+            role = sync_profile(user.id, email).get("role") or "User"
             st.session_state.auth = {"user": {"id": user.id}, "email": email, "role": role}
             st.success("Signed in.")
             st.rerun()
@@ -266,7 +818,7 @@ def sign_up(email: str, password: str):
         res = supabase.auth.sign_up({"email": email, "password": password})
         user = getattr(res, "user", None) or (getattr(res, "data", {}) or {}).get("user")
         if user and getattr(user, "id", None):
-            ensure_profile_and_sync(user.id, email)
+            sync_profile(user.id, email)
             st.success("Account created — verify email if your Supabase is configured for confirmation.")
         else:
             st.error("Sign-up returned no user id (check Supabase response).")
@@ -279,6 +831,7 @@ def sign_out():
     except Exception:
         pass
     st.session_state.auth = {"user": None, "email": None, "role": None}
+    st.session_state.pop("local_model", None)
     st.rerun()
 
 # -------------------------
@@ -287,23 +840,46 @@ def sign_out():
 def playlists_page():
     st.header("🎵 Playlists — Manage your playlists")
     playlist_dao = PlaylistDAO()
-    playlist_song_dao = PlaylistSongDAO()
-    song_dao = SongDAO()
-    mood_dao = MoodDAO()
 
     user_id = st.session_state.auth["user"]["id"]
 
+    # Warm every independent read of this page concurrently; the calls below are then cache hits
+    search_term = st.session_state.get("search_playlists") or ""
+    selected_prev = st.session_state.get("select_playlist_manage") or ""
+    reads = {
+        "moods": (cached_moods, user_id, "summary"),
+        "catalog": (cached_song_catalog, "summary"),
+    }
+    if search_term and hasattr(playlist_dao, "search_playlists"):
+        reads["playlists"] = (cached_playlist_search, user_id, search_term, PLAYLIST_LIST_COLUMNS)
+    else:
+        reads["playlists"] = (cached_playlists, user_id, PLAYLIST_LIST_COLUMNS)
+    if selected_prev:
+        reads["detail"] = (cached_playlist_detail, user_id, selected_prev)
+    prefetch(**reads)
+
     # Create block
     with st.expander("➕ Create New Playlist", expanded=False):
         name = st.text_input("Playlist name", key="create_name")
         desc = st.text_area("Description", key="create_desc")
         # moods list (fallback to all moods if per-user not available)
-        moods = _data_of(mood_dao.get_moods_by_user(user_id) if hasattr(mood_dao, "get_moods_by_user") else (mood_dao.list_moods() if hasattr(mood_dao, "list_moods") else [])) or []
+        moods = cached_moods(user_id, columns="summary")
         mood_map = {m.get("mood_name", m.get("name","")): m.get("mood_id") for m in moods if m.get("mood_id")}
         selected_mood_name = st.selectbox("Mood (optional)", [""] + list(mood_map.keys()), key="create_mood")
+        catalog = {f"{s.get('title', '')} ({s.get('song_id')})": s.get("song_id") for s in cached_song_catalog(columns="summary") if s.get("song_id")}
+        initial_songs = st.multiselect("Initial songs (optional)", list(catalog.keys()), key="create_songs")
         if st.button("Create Playlist", key="btn_create_playlist"):
             if not name:
                 st.warning("Enter playlist name.")
+            elif initial_songs:
+                # playlist + its songs go out as two bulk requests instead of one per song
+                created = create_playlist_with_songs(user_id, name, desc or "", mood_map.get(selected_mood_name),
+                                                     [catalog[label] for label in initial_songs])
+                if created:
+                    st.success(f"Playlist created with {len(initial_songs)} song(s).")
+                    st.rerun()
+                else:
+                    st.error("Create failed. Check console for details.")
             else:
                 created = create_playlist_flexible(playlist_dao, user_id, name, desc or "", mood_map.get(selected_mood_name))
                 if created:
@@ -316,7 +892,12 @@ def playlists_page():
 
     # Search + list
     search = st.text_input("🔎 Search playlists by name", key="search_playlists")
-    playlists = list_playlists_for_user(playlist_dao, user_id) or []
+    # only what the table and the update form render
+    if search and hasattr(playlist_dao, "search_playlists"):
+        # matched and ranked server-side; only the top hits come back
+        playlists = cached_playlist_search(user_id, search, columns=PLAYLIST_LIST_COLUMNS)
+    else:
+        playlists = cached_playlists(user_id, columns=PLAYLIST_LIST_COLUMNS)
 
     # normalize name keys
     def _playlist_name(p):
@@ -325,7 +906,7 @@ def playlists_page():
                 return p[k]
         return "<Unnamed>"
 
-    if search:
+    if search and not hasattr(playlist_dao, "search_playlists"):
         playlists = [p for p in playlists if search.lower() in str(_playlist_name(p)).lower()]
 
     if not playlists:
@@ -350,8 +931,13 @@ def playlists_page():
     if not selected_id:
         return
 
-    selected_record = next((p for p in playlists if (p.get("playlist_id") == selected_id or str(p.get("playlist_id")) == str(selected_id) or p.get("id") == selected_id)), None)
+    # one request for the playlist, its mood and its songs
+    detail = cached_playlist_detail(user_id, selected_id) or {}
+    selected_record = detail.get("playlist") or next((p for p in playlists if (p.get("playlist_id") == selected_id or str(p.get("playlist_id")) == str(selected_id) or p.get("id") == selected_id)), None)
+    current_mood = (detail.get("mood") or {}).get("mood_name", "")
     st.markdown(f"### ⚙️ Manage: **{_playlist_name(selected_record) if selected_record else selected_id}**")
+    if current_mood:
+        st.caption(f"Mood: {current_mood}")
 
     # Update
     with st.expander("✏️ Update playlist", expanded=False):
@@ -359,7 +945,8 @@ def playlists_page():
         new_name = st.text_input("New name", value=cur_name, key="update_name")
         new_desc = st.text_area("New description", value=selected_record.get("description","") if selected_record else "", key="update_desc")
         # mood options again
-        mood_choice = st.selectbox("Mood (optional)", [""] + list(mood_map.keys()), key="update_mood")
+        mood_options = [""] + list(mood_map.keys())
+        mood_choice = st.selectbox("Mood (optional)", mood_options, index=mood_options.index(current_mood) if current_mood in mood_options else 0, key="update_mood")
         if st.button("Update Playlist", key="btn_update_playlist"):
             ok = update_playlist_flexible(playlist_dao, selected_id, user_id=user_id, name=new_name, description=new_desc, mood_id=mood_map.get(mood_choice))
             if ok:
@@ -382,23 +969,46 @@ def playlists_page():
 
     # Songs in playlist (view/remove)
     st.subheader("🎧 Songs in playlist")
-    songs_in = get_songs_in_playlist_flexible(playlist_song_dao, playlist_dao, selected_id) or []
+    songs_in = detail.get("songs") if detail else cached_songs_in_playlist(selected_id)
+    songs_in = songs_in or []
     if songs_in:
         # prefer columns title/song_id
         srows = []
-        for s in songs_in:
+        for n, s in enumerate(songs_in, 1):
             sid = s.get("song_id") or s.get("id") or s.get("songId")
             title = s.get("title") or s.get("name") or s.get("song_name") or ""
-            srows.append({"song_id": sid, "title": title})
+            srows.append({"#": n, "song_id": sid, "title": title, "duration": s.get("duration")})
         st.dataframe(pd.DataFrame(srows), use_container_width=True)
 
+        # Reorder: each move rewrites only the moved song's position key
+        with st.expander("↕️ Reorder songs", expanded=False):
+            order_ids = [r["song_id"] for r in srows]
+            labels = {r["song_id"]: f"{r['#']}. {r['title']} — {r['song_id']}" for r in srows}
+            # options are song IDs so the selection follows the song after it moves
+            picked = st.selectbox("Song", order_ids, format_func=labels.get, key="select_song_move")
+            current = order_ids.index(picked)
+            target = None
+            c1, c2, c3, c4 = st.columns([1, 1, 1, 1])
+            if c1.button("⬆️ Move up", key="btn_move_up", disabled=current == 0):
+                target = current - 1
+            if c2.button("⬇️ Move down", key="btn_move_down", disabled=current == len(srows) - 1):
+                target = current + 1
+            to_pos = c3.number_input("Position", min_value=1, max_value=len(srows), value=current + 1, key="move_to_pos")
+            if c4.button("Move to", key="btn_move_to", disabled=to_pos == current + 1):
+                target = int(to_pos) - 1
+            if target is not None:
+                if move_song_flexible(PlaylistSongDAO(), selected_id, srows[current]["song_id"], target):
+                    st.rerun()
+                else:
+                    st.error("Move failed.")
+
         remove_map = {f"{r['title']} — {r['song_id']}": r['song_id'] for r in srows}
-        to_remove_label = st.selectbox("Select song to remove", list(remove_map.keys()), key="select_song_remove")
-        if st.button("Remove song from playlist", key="btn_remove_song"):
-            sid = remove_map[to_remove_label]
-            ok = remove_song_from_playlist_flexible(playlist_dao, selected_id, sid)
+        to_remove_labels = st.multiselect("Select songs to remove", list(remove_map.keys()), key="select_song_remove")
+        if st.button("Remove songs from playlist", key="btn_remove_song", disabled=not to_remove_labels):
+            sids = [remove_map[label] for label in to_remove_labels]
+            ok = remove_songs_from_playlist_flexible(playlist_dao, selected_id, sids)
             if ok:
-                st.success("Removed song.")
+                st.success(f"Removed {len(sids)} song(s).")
                 st.rerun()
             else:
                 st.error("Remove failed.")
@@ -407,34 +1017,51 @@ def playlists_page():
 
     st.markdown("---")
 
-    # Add song to playlist
-    st.subheader("➕ Add song to playlist")
-    all_songs = _data_of(song_dao.list_songs() if hasattr(song_dao, "list_songs") else []) or []
+    # Add songs to playlist (one bulk request for the whole selection)
+    st.subheader("➕ Add songs to playlist")
+    all_songs = cached_song_catalog(columns="summary")
+    in_playlist = {str(s.get("song_id") or s.get("id")) for s in songs_in}
+    all_songs = [s for s in all_songs if str(s.get("song_id") or s.get("id")) not in in_playlist]
     if not all_songs:
         st.info("No songs available (create songs in Songs module).")
     else:
         add_map = { (s.get("title") or s.get("name") or s.get("song_name") or "") + " — " + str(s.get("song_id") or s.get("id")): (s.get("song_id") or s.get("id")) for s in all_songs }
-        add_choice = st.selectbox("Select song to add", list(add_map.keys()), key="select_song_add")
-        if st.button("Add song to playlist", key="btn_add_song"):
-            sid = add_map[add_choice]
-            ok = add_song_to_playlist_flexible(playlist_dao, selected_id, sid)
+        add_choices = st.multiselect("Select songs to add", list(add_map.keys()), key="select_song_add")
+        if st.button("Add songs to playlist", key="btn_add_song", disabled=not add_choices):
+            sids = [add_map[label] for label in add_choices]
+            ok = add_songs_to_playlist_flexible(playlist_dao, selected_id, sids)
             if ok:
-                st.success("Song added.")
+                st.success(f"Added {len(sids)} song(s).")
                 st.rerun()
             else:
                 st.error("Add failed.")
+
+    # Suggestions for the playlist's mood
+    current_mood_id = (detail.get("mood") or {}).get("mood_id")
+    if current_mood_id:
+        st.subheader(f"✨ Suggested for *{current_mood}*")
+        suggestions = recommend_songs(user_id, current_mood_id, current_mood, exclude=in_playlist)
+        if suggestions:
+            suggest_map = {f"{r['title']} — {r['song_id']}": r["song_id"] for r in suggestions}
+            picked = st.multiselect("Suggested songs", list(suggest_map.keys()), key="select_song_suggest")
+            if st.button("Add suggested songs", key="btn_add_suggested", disabled=not picked):
+                sids = [suggest_map[label] for label in picked]
+                if add_songs_to_playlist_flexible(playlist_dao, selected_id, sids):
+                    st.success(f"Added {len(sids)} song(s).")
+                    st.rerun()
+                else:
+                    st.error("Add failed.")
+        else:
+            st.caption("No suggestions yet.")
 def playlists_by_mood_page():
     st.markdown("<h2 style='color:#007bff;'>🎵 Playlists by Mood</h2>", unsafe_allow_html=True)
     st.write("Select a mood to see playlists associated with it.")
 
-    mood_dao = MoodDAO()
-    playlist_dao = PlaylistDAO()
-
     # Get logged-in user
-    user_id = st.session_state.auth.get("user_id")
+    user_id = (st.session_state.auth.get("user") or {}).get("id")
 
     try:
-        moods = mood_dao.get_moods_by_user(user_id)
+        moods = cached_moods(user_id, columns="summary")
     except Exception as e:
         st.error(f"Error fetching moods: {e}")
         return
@@ -451,7 +1078,7 @@ def playlists_by_mood_page():
         selected_mood_id = mood_options[selected_mood_name]
 
         try:
-            playlists = playlist_dao.get_playlists_by_mood(selected_mood_id)
+            playlists = cached_playlists_by_mood(user_id, selected_mood_id, columns="summary")
         except Exception as e:
             st.error(f"Error fetching playlists: {e}")
             return
@@ -473,6 +1100,31 @@ def playlists_by_mood_page():
         else:
             st.warning(f"No playlists found for mood **{selected_mood_name}**.")
 
+        with st.expander(f"⏱️ Generate a *{selected_mood_name}* playlist", expanded=False):
+            minutes = st.number_input("Length (minutes)", min_value=1, max_value=600, value=45, key="gen_minutes")
+            tolerance = st.number_input("Tolerance (seconds)", min_value=0, max_value=600, value=playlist_generator.DEFAULT_TOLERANCE, key="gen_tolerance")
+            gen_name = st.text_input("Playlist name (optional)", key="gen_name")
+            if st.button("Generate playlist", key="btn_generate_playlist"):
+                try:
+                    result = playlist_generator.generate_playlist(_song_index(_cache_version("songs")), user_id, selected_mood_id,
+                                               selected_mood_name, int(minutes * 60), int(tolerance), name=gen_name or None)
+                except Exception as e:
+                    st.error(f"Generate failed: {e}")
+                else:
+                    if result:
+                        invalidate_cached("playlists", user_id)
+                        invalidate_cached("playlist_songs", result["playlist_id"])
+                        total = result["total"]
+                        st.success(f"Created a {total // 60}:{total % 60:02d} playlist with {len(result['songs'])} songs.")
+                        st.dataframe(pd.DataFrame(result["songs"])[["title", "duration"]], width='stretch')
+                    else:
+                        st.warning("No combination of songs fits that length. Try a larger tolerance.")
+
+        suggestions = recommend_songs(user_id, selected_mood_id, selected_mood_name)
+        if suggestions:
+            st.markdown(f"### ✨ Songs that fit *{selected_mood_name}*")
+            st.dataframe(pd.DataFrame(suggestions)[["title", "duration", "score"]], width='stretch')
+
 
 
 
@@ -489,18 +1141,14 @@ def moods_page():
         mdesc = st.text_area("Description")
         if st.form_submit_button("Create Mood"):
             try:
-                # try signature with user_id first
-                try:
-                    mood_dao.create_mood(user_id, mname, mdesc)
-                except TypeError:
-                    mood_dao.create_mood(mname, mdesc)
+                create_mood_flexible(mood_dao, user_id, mname, mdesc)
                 st.success("Mood created.")
                 st.rerun()
             except Exception as e:
                 st.error(f"Create failed: {e}")
 
     # List & search
-    moods = _data_of(mood_dao.get_moods_by_user(user_id) if hasattr(mood_dao, "get_moods_by_user") else (mood_dao.list_moods() if hasattr(mood_dao, "list_moods") else [])) or []
+    moods = cached_moods(user_id)
     if moods:
         df = pd.DataFrame(moods)
         st.dataframe(df, use_container_width=True)
@@ -516,16 +1164,13 @@ def songs_page():
         duration = st.number_input("Duration (seconds)", min_value=0)
         if st.form_submit_button("Create Song"):
             try:
-                try:
-                    song_dao.create_song(title, duration)
-                except TypeError:
-                    song_dao.create_song(None, title, duration)
+                create_song_flexible(song_dao, title, duration)
                 st.success("Song created.")
                 st.rerun()
             except Exception as e:
                 st.error(f"Create failed: {e}")
 
-    songs = _data_of(song_dao.list_songs() if hasattr(song_dao, "list_songs") else [])
+    songs = keyset_pager("songs_pager", cached_songs_page)
     if songs:
         st.dataframe(pd.DataFrame(songs), use_container_width=True)
     else:
@@ -577,15 +1222,12 @@ def artists_page():
         desc = st.text_area("Description")
         if st.form_submit_button("Create Artist"):
             try:
-                try:
-                    artist_dao.create_artist(user_id, name, desc)
-                except TypeError:
-                    artist_dao.create_artist(name, desc)
+                create_artist_flexible(artist_dao, user_id, name, desc)
                 st.success("Artist created.")
                 st.rerun()
             except Exception as e:
                 st.error(f"Create failed: {e}")
-    artists = _data_of(artist_dao.list_artists() if hasattr(artist_dao, "list_artists") else [])
+    artists = cached_artists(user_id)
     if artists:
         st.dataframe(pd.DataFrame(artists), use_container_width=True)
     else:
@@ -607,15 +1249,43 @@ def users_page():
                 st.rerun()
             except Exception as e:
                 st.error(f"Create failed: {e}")
-    users = _data_of(user_dao.list_all_users() if hasattr(user_dao, "list_all_users") else [])
+    # "detail" leaves out password_hash
+    users = keyset_pager("users_pager", lambda **kw: user_dao.list_users_page(columns="detail", **kw))
     if users:
         st.dataframe(pd.DataFrame(users), use_container_width=True)
     else:
         st.info("No users found.")
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner="Updating trends…")
+def _load_trends(freq):
+    # rollups persist closed buckets, so a refresh only recounts the open one
+    return rollups.created_trend(freq), rollups.library_growth(freq)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_usernames(user_ids):
+    # labels only the plotted users; a rename shows up after CACHE_TTL
+    users = UserDAO().get_users_by_ids(user_ids, columns="summary")
+    return {u.get("user_id"): u.get("username") or u.get("email") for u in users}
+
 def reports_page():
     st.header("📊 Reports")
     repo = ReportDAO()
+
+    st.subheader("Trends")
+    freq = st.radio("Bucket", list(rollups.FREQS), index=1, horizontal=True, key="report_freq")
+    try:
+        trend, growth = _load_trends(freq)
+        if trend.empty:
+            st.info("No data.")
+        else:
+            st.caption(f"Created per {freq}")
+            st.bar_chart(trend)
+        if not growth.empty:
+            names = _load_usernames(tuple(growth.columns))
+            st.caption("Library growth (cumulative playlists, largest libraries)")
+            st.line_chart(growth.rename(columns=lambda uid: names.get(uid) or uid))
+    except Exception as e:
+        st.error(f"Trend error: {e}")
     try:
         urole = _data_of(repo.count_users_by_role() if hasattr(repo, "count_users_by_role") else [])
         st.subheader("Users by role")
@@ -629,9 +1299,60 @@ def reports_page():
             st.dataframe(pd.DataFrame(pm))
         else:
             st.info("No data.")
+        largest = repo.largest_playlists() if hasattr(repo, "largest_playlists") else []
+        st.subheader("Largest playlists")
+        if largest:
+            st.dataframe(pd.DataFrame(largest))
+        else:
+            st.info("No data.")
+        with st.expander("Maintenance", expanded=False):
+            st.caption("Counters are updated on every write; a rebuild recounts them from scratch.")
+            if st.button("Rebuild report counters", key="btn_rebuild_aggregates"):
+                st.dataframe(pd.DataFrame(repo.rebuild_aggregates()))
     except Exception as e:
         st.error(f"Report error: {e}")
 
+def sync_status():
+    """Report optimistic changes that were rolled back, and how many are still syncing."""
+    model = _local_model()
+    if model is None:
+        return
+    for failure in model.take_failures():
+        st.error(failure)
+    if not model.syncing():
+        return
+    fragment = getattr(st, "fragment", None)  # Streamlit >= 1.37
+    if fragment is None:
+        st.sidebar.caption(f"⏳ Syncing {model.syncing()} change(s)…")
+        return
+    fragment(run_every=SYNC_POLL_SECONDS)(_watch_sync)(model)
+
+def _watch_sync(model):
+    """Polled while changes sync; reruns the page as soon as one is rolled back so it shows now."""
+    if model.has_failures():
+        st.rerun()
+    pending = model.syncing()
+    if pending:
+        st.caption(f"⏳ Syncing {pending} change(s)…")
+
+def debug_panel(scope):
+    """Sidebar summary of this rerun's DAO calls and round trips (INSTRUMENTATION_ENABLED=1)."""
+    totals = scope.totals()
+    with st.sidebar.expander(f"🐞 Debug · {totals['round_trips']} round trips, {totals['query_ms']:.0f} ms", expanded=False):
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Round trips", totals["round_trips"])
+        c2.metric("Query ms", totals["query_ms"])
+        c3.metric("Rerun ms", totals["wall_ms"])
+        st.caption(f"{totals['rows']} rows · {totals['bytes'] / 1024:.1f} KiB · {totals['errors']} errors")
+        if scope.records:
+            st.dataframe(pd.DataFrame(scope.records).drop(columns=["page"]), width='stretch')
+        st.caption("Slowest calls this session")
+        st.dataframe(pd.DataFrame(instrumentation.summary()[:15]), width='stretch')
+        bindings = resolved_dispatch()
+        if bindings:
+            st.caption("Resolved DAO bindings")
+            st.json(bindings)
+
 # -------------------------
 # Login screen + main
 # -------------------------
@@ -719,9 +1440,20 @@ def main():
     pages = ["Moods", "Playlists", "Songs", "Playlists by Mood", "Logout"]
     if role == "Admin":
         pages.insert(0, "Users")
+        pages.insert(-1, "Reports")
 
     choice = st.sidebar.radio("Go to", pages)
 
+    sync_status()
+    if INSTRUMENTATION_ENABLED:
+        instrumentation.install()
+    with instrumentation.collect(choice) as scope:
+        route(choice)
+    if INSTRUMENTATION_ENABLED:
+        debug_panel(scope)
+
+
+def route(choice):
     # 🧱 Routing
     if choice == "Moods":
         moods_page()
@@ -733,6 +1465,8 @@ def main():
         playlists_by_mood_page()
     elif choice == "Users":
         users_page()
+    elif choice == "Reports":
+        reports_page()
     elif choice == "Logout":
         logout_page()
     else:
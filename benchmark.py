@@ -0,0 +1,532 @@
+"""Benchmarks for the DAOs, the app's flexible wrappers and the report queries.
+
+    python benchmark.py --scale 100k                      # seed (once) and run
+    python benchmark.py --scale 1k --out base.json
+    python benchmark.py --scale 1k --compare base.json    # exit 1 on regressions
+
+A local SQLite backend is seeded with synthetic users, artists, moods, songs,
+playlists and memberships. Every row ID and value comes from --seed, so two
+runs with the same scale and seed see identical data. Seeded databases are
+reused between runs (see --db / --fresh).
+
+Each case is called --repeat times after --warmup discarded calls; writes
+clean up after themselves (create -> update -> delete chains). Full scans
+(list_songs, iter_*, ...) run at most SCAN_REPEAT times. Results give
+p50/p95/p99 latency and serial throughput per case and are saved as JSON.
+--compare flags cases whose p95 grew by more than --threshold.
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import database
+
+# songs per scale; every other table is sized from it
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SEED_CHUNK = 5000
+SCAN_REPEAT = 3
+PLAYLISTS_PER_USER = 5
+SONGS_PER_PLAYLIST = 20
+MOODS_PER_USER = 3
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)  # created_at spreads over the following year
+
+MOOD_NAMES = ["Happy", "Calm", "Focus", "Energetic", "Melancholy", "Romantic", "Chill", "Party"]
+WORDS = ["blue", "night", "river", "echo", "summer", "neon", "gold", "rain", "drift", "fire",
+         "paper", "glass", "north", "velvet", "static", "bloom"]
+
+
+# -------------------------
+# Synthetic data
+# -------------------------
+class Dataset:
+    """Row counts and deterministic IDs for one (scale, seed)."""
+
+    def __init__(self, songs, seed):
+        self.seed = seed
+        self.songs = songs
+        self.users = max(10, songs // 100)
+        self.artists = max(10, songs // 20)
+        self.moods = self.users * MOODS_PER_USER
+        self.playlists = self.users * PLAYLISTS_PER_USER
+        self.memberships = self.playlists * min(SONGS_PER_PLAYLIST, songs)
+        self.namespace = uuid.uuid5(uuid.NAMESPACE_URL, f"playlist-manager-benchmark/{seed}")
+
+    def id(self, table, i):
+        """IDs are derived, not stored, so 1M songs need no in-memory ID list."""
+        return str(uuid.uuid5(self.namespace, f"{table}/{i}"))
+
+    def created_at(self, rng):
+        return (EPOCH + timedelta(seconds=rng.randrange(365 * 86400))).isoformat()
+
+    def counts(self):
+        return {"users": self.users, "artists": self.artists, "moods": self.moods, "songs": self.songs,
+                "playlists": self.playlists, "playlist_songs": self.memberships}
+
+    def rows(self, table):
+        """Yield the rows of one table; each table has its own RNG stream."""
+        rng = random.Random(f"{self.seed}/{table}")
+        if table == "users":
+            for i in range(self.users):
+                yield {"user_id": self.id("users", i), "username": f"user{i}",
+                       "email": f"user{i}@bench.example", "password_hash": "-",
+                       "role": "Admin" if rng.random() < 0.05 else "User", "created_at": self.created_at(rng)}
+        elif table == "artists":
+            for i in range(self.artists):
+                yield {"artist_id": self.id("artists", i), "user_id": self.id("users", rng.randrange(self.users)),
+                       "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+                       "created_at": self.created_at(rng)}
+        elif table == "moods":
+            for i in range(self.moods):
+                yield {"mood_id": self.id("moods", i), "user_id": self.id("users", i // MOODS_PER_USER),
+                       "mood_name": MOOD_NAMES[i % len(MOOD_NAMES)], "description": rng.choice(WORDS),
+                       "created_at": self.created_at(rng)}
+        elif table == "songs":
+            for i in range(self.songs):
+                yield {"song_id": self.id("songs", i), "title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}",
+                       "duration": rng.randint(90, 420), "artist_id": self.id("artists", rng.randrange(self.artists)),
+                       "created_at": self.created_at(rng)}
+        elif table == "playlists":
+            for i in range(self.playlists):
+                user = i // PLAYLISTS_PER_USER
+                mood = user * MOODS_PER_USER + rng.randrange(MOODS_PER_USER)
+                yield {"playlist_id": self.id("playlists", i), "user_id": self.id("users", user),
+                       "playlist_name": f"{rng.choice(WORDS).title()} mix {i}", "mood_id": self.id("moods", mood),
+                       "created_at": self.created_at(rng)}
+        elif table == "playlist_songs":
+            per = min(SONGS_PER_PLAYLIST, self.songs)
+            for i in range(self.playlists):
+                for s in rng.sample(range(self.songs), per):
+                    yield {"playlist_id": self.id("playlists", i), "song_id": self.id("songs", s),
+                           "added_at": self.created_at(rng)}
+
+
+def is_seeded(ds):
+    last = ds.id("playlists", ds.playlists - 1)
+    res = database.supabase.table("playlist_songs").select("song_id").eq("playlist_id", last).limit(1).execute()
+    return bool(res.data)
+
+
+def seed(ds):
+    """Insert every table in FK order, SEED_CHUNK rows per request."""
+    for table, total in ds.counts().items():
+        start, chunk, done = time.perf_counter(), [], 0
+        for row in ds.rows(table):
+            chunk.append(row)
+            if len(chunk) == SEED_CHUNK:
+                database.supabase.table(table).insert(chunk).execute()
+                done += len(chunk)
+                chunk = []
+                print(f"\r  {table}: {done}/{total}", end="", flush=True)
+        if chunk:
+            database.supabase.table(table).insert(chunk).execute()
+            done += len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"\r  {table}: {done} rows in {elapsed:.1f}s ({done / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+# -------------------------
+# Cases
+# -------------------------
+class Case:
+    def __init__(self, group, name, fn, scan=False):
+        self.group = group
+        self.name = name
+        self.fn = fn        # fn(i) performs one call
+        self.scan = scan    # reads a whole table: fewer repeats
+
+
+def _drain(pages):
+    return sum(len(p) for p in pages)
+
+
+def dao_cases(ds, rng, state):
+    from dao.artist_dao import ArtistDAO
+    from dao.mood_dao import MoodDAO
+    from dao.playlist_dao import PlaylistDAO
+    from dao.playlist_song_dao import PlaylistSongDAO
+    from dao.song_dao import SongDAO
+    from dao.user_dao import UserDAO
+
+    users, moods, artists, songs, playlists = UserDAO(), MoodDAO(), ArtistDAO(), SongDAO(), PlaylistDAO()
+    memberships = PlaylistSongDAO()
+    run = uuid.uuid4().hex[:8]
+
+    def any_id(table, count):
+        return ds.id(table, rng.randrange(count))
+
+    def user():
+        return any_id("users", ds.users)
+
+    def song_for(i, offset=0):
+        # distinct per call, so single-row inserts never hit the (playlist, song) unique index
+        return ds.id("songs", (i * 7919 + offset) % ds.songs)
+
+    def created(table, res):
+        rows = res.data if hasattr(res, "data") else res
+        row = rows[0] if isinstance(rows, list) and rows else rows
+        if isinstance(row, dict):
+            state.setdefault(table, []).append(row)
+        return res
+
+    def take(table):
+        return state[table].pop() if state.get(table) else {}
+
+    def peek(table, i):
+        rows = state.get(table) or [{}]
+        return rows[i % len(rows)]
+
+    def playlist_order():
+        playlist_id = any_id("playlists", ds.playlists)
+        return playlist_id, [r["song_id"] for r in memberships.get_song_positions(playlist_id)]
+
+    bench_playlist = state["bench_playlist"]
+    c = Case
+    return [
+        c("dao", "UserDAO.create_user", lambda i: created("users", users.create_user(f"bench{run}-{i}", f"bench-{run}-{i}@bench.example", "-"))),
+        c("dao", "UserDAO.list_all_users", lambda i: users.list_all_users("summary"), scan=True),
+        c("dao", "UserDAO.list_users_page", lambda i: users.list_users_page(user(), 100)),
+        c("dao", "UserDAO.iter_users", lambda i: _drain(users.iter_users(columns="summary")), scan=True),
+        c("dao", "UserDAO.update_user", lambda i: users.update_user(peek("users", i).get("user_id"), f"renamed{i}", peek("users", i).get("email"), "User")),
+        c("dao", "UserDAO.delete_user", lambda i: users.delete_user(take("users").get("user_id"))),
+        c("dao", "UserDAO.sync_profile", lambda i: users.sync_profile(user(), None)),
+
+        c("dao", "MoodDAO.create_mood", lambda i: created("moods", moods.create_mood(user(), f"Bench {run} {i}"))),
+        c("dao", "MoodDAO.list_moods", lambda i: moods.list_moods(), scan=True),
+        c("dao", "MoodDAO.list_moods_page", lambda i: moods.list_moods_page(any_id("moods", ds.moods), 100)),
+        c("dao", "MoodDAO.iter_moods", lambda i: _drain(moods.iter_moods()), scan=True),
+        c("dao", "MoodDAO.get_moods_by_user", lambda i: moods.get_moods_by_user(user())),
+        c("dao", "MoodDAO.update_mood", lambda i: moods.update_mood(peek("moods", i).get("mood_id"), peek("moods", i).get("user_id"), description=f"d{i}")),
+        c("dao", "MoodDAO.delete_mood", lambda i: (lambda m: moods.delete_mood(m.get("mood_id"), m.get("user_id")))(take("moods"))),
+
+        c("dao", "ArtistDAO.create_artist", lambda i: created("artists", artists.create_artist(user(), f"Bench {run} {i}"))),
+        c("dao", "ArtistDAO.get_artists_by_user", lambda i: artists.get_artists_by_user(user())),
+        c("dao", "ArtistDAO.update_artist", lambda i: artists.update_artist(peek("artists", i).get("artist_id"), peek("artists", i).get("user_id"), description=f"d{i}")),
+        c("dao", "ArtistDAO.delete_artist", lambda i: (lambda a: artists.delete_artist(a.get("artist_id"), a.get("user_id")))(take("artists"))),
+
+        c("dao", "SongDAO.create_song", lambda i: created("songs", songs.create_song(f"Bench {run} {i}", 200))),
+        c("dao", "SongDAO.list_songs", lambda i: songs.list_songs("summary"), scan=True),
+        c("dao", "SongDAO.list_songs_for_user", lambda i: songs.list_songs_for_user(user(), "summary"), scan=True),
+        c("dao", "SongDAO.list_songs_page", lambda i: songs.list_songs_page(any_id("songs", ds.songs), 100)),
+        c("dao", "SongDAO.list_songs_for_user_page", lambda i: songs.list_songs_for_user_page(user(), any_id("songs", ds.songs), 100)),
+        c("dao", "SongDAO.iter_songs", lambda i: _drain(songs.iter_songs(columns="summary")), scan=True),
+        c("dao", "SongDAO.update_song", lambda i: songs.update_song(peek("songs", i).get("song_id"), duration=201 + i)),
+        c("dao", "SongDAO.delete_song", lambda i: songs.delete_song(take("songs").get("song_id"))),
+
+        c("dao", "PlaylistDAO.create_playlist", lambda i: created("playlists", playlists.create_playlist(
+            {"user_id": user(), "playlist_name": f"Bench {run} {i}", "mood_id": any_id("moods", ds.moods)}))),
+        c("dao", "PlaylistDAO.get_playlists_by_user", lambda i: playlists.get_playlists_by_user(user())),
+        c("dao", "PlaylistDAO.list_playlists_page", lambda i: playlists.list_playlists_page(user(), limit=100)),
+        c("dao", "PlaylistDAO.iter_playlists", lambda i: _drain(playlists.iter_playlists(user()))),
+        c("dao", "PlaylistDAO.search_playlists", lambda i: playlists.search_playlists(user(), rng.choice(WORDS))),
+        c("dao", "PlaylistDAO.update_playlist", lambda i: playlists.update_playlist(
+            peek("playlists", i).get("playlist_id"), {"description": f"d{i}"}, peek("playlists", i).get("user_id"))),
+        c("dao", "PlaylistDAO.get_songs_in_playlist", lambda i: playlists.get_songs_in_playlist(any_id("playlists", ds.playlists))),
+        c("dao", "PlaylistDAO.get_playlist_detail", lambda i: playlists.get_playlist_detail(any_id("playlists", ds.playlists))),
+        c("dao", "PlaylistDAO.add_song_to_playlist", lambda i: playlists.add_song_to_playlist(bench_playlist, song_for(i))),
+        c("dao", "PlaylistDAO.remove_song_from_playlist", lambda i: playlists.remove_song_from_playlist(bench_playlist, song_for(i))),
+        c("dao", "PlaylistDAO.add_songs_to_playlist", lambda i: playlists.add_songs_to_playlist(bench_playlist, [song_for(i, k) for k in range(10)])),
+        c("dao", "PlaylistDAO.remove_songs_from_playlist", lambda i: playlists.remove_songs_from_playlist(bench_playlist, [song_for(i, k) for k in range(10)])),
+        c("dao", "PlaylistDAO.list_playlists_by_mood", lambda i: playlists.list_playlists_by_mood(any_id("moods", ds.moods))),
+        c("dao", "PlaylistDAO.get_playlists_by_mood", lambda i: playlists.get_playlists_by_mood(any_id("moods", ds.moods))),
+        c("dao", "PlaylistDAO.get_song_ids_by_mood", lambda i: playlists.get_song_ids_by_mood(any_id("moods", ds.moods))),
+        c("dao", "PlaylistDAO.delete_playlist", lambda i: playlists.delete_playlist(take("playlists").get("playlist_id"))),
+
+        c("dao", "PlaylistSongDAO.add_song_to_playlist", lambda i: memberships.add_song_to_playlist(bench_playlist, song_for(i))),
+        c("dao", "PlaylistSongDAO.remove_song_from_playlist", lambda i: memberships.remove_song_from_playlist(bench_playlist, song_for(i))),
+        c("dao", "PlaylistSongDAO.add_songs_to_playlist", lambda i: memberships.add_songs_to_playlist(bench_playlist, [song_for(i, k) for k in range(10)])),
+        c("dao", "PlaylistSongDAO.remove_songs_from_playlist", lambda i: memberships.remove_songs_from_playlist(bench_playlist, [song_for(i, k) for k in range(10)])),
+        c("dao", "PlaylistSongDAO.list_songs_in_playlist", lambda i: memberships.list_songs_in_playlist(any_id("playlists", ds.playlists))),
+        c("dao", "PlaylistSongDAO.get_song_positions", lambda i: memberships.get_song_positions(any_id("playlists", ds.playlists))),
+        # reads the order, then rewrites one row
+        c("dao", "PlaylistSongDAO.move_song", lambda i: (lambda pid, ids: memberships.move_song(pid, ids[-1], 0))(*playlist_order())),
+        c("dao", "PlaylistSongDAO.rebalance_positions", lambda i: memberships.rebalance_positions(*playlist_order())),
+    ]
+
+
+def app_cases(ds, rng, state):
+    """The app.py wrappers (resolved through _dispatch); needs streamlit importable."""
+    import app
+    from dao.playlist_dao import PlaylistDAO
+    from dao.playlist_song_dao import PlaylistSongDAO
+
+    playlists, memberships = PlaylistDAO(), PlaylistSongDAO()
+    run = uuid.uuid4().hex[:8]
+    bench_playlist = state["bench_playlist"]
+    made = state.setdefault("app_playlists", [])
+
+    def user():
+        return ds.id("users", rng.randrange(ds.users))
+
+    def song_for(i, offset=0):
+        return ds.id("songs", (i * 6151 + offset + 1) % ds.songs)
+
+    def create(i):
+        row = app.create_playlist_flexible(playlists, user(), f"App bench {run} {i}", "", ds.id("moods", rng.randrange(ds.moods)))
+        if row:
+            made.append(row)
+        return row
+
+    def with_songs(i):
+        row = app.create_playlist_with_songs(user(), f"App bench {run} songs {i}", "", None, [song_for(i, k) for k in range(10)])
+        if row:
+            made.append(row)
+        return row
+
+    def delete(i):
+        row = made.pop() if made else {}
+        return app.delete_playlist_flexible(playlists, row.get("playlist_id"), row.get("user_id"))
+
+    def peek(i):
+        return made[i % len(made)] if made else {}
+
+    c = Case
+    return [
+        c("app", "list_playlists_for_user", lambda i: app.list_playlists_for_user(playlists, user(), app.PLAYLIST_LIST_COLUMNS)),
+        c("app", "create_playlist_flexible", create),
+        c("app", "create_playlist_with_songs", with_songs),
+        c("app", "update_playlist_flexible", lambda i: app.update_playlist_flexible(
+            playlists, peek(i).get("playlist_id"), peek(i).get("user_id"), description=f"d{i}")),
+        c("app", "add_song_to_playlist_flexible", lambda i: app.add_song_to_playlist_flexible(playlists, bench_playlist, song_for(i))),
+        c("app", "remove_song_from_playlist_flexible", lambda i: app.remove_song_from_playlist_flexible(playlists, bench_playlist, song_for(i))),
+        c("app", "add_songs_to_playlist_flexible", lambda i: app.add_songs_to_playlist_flexible(playlists, bench_playlist, [song_for(i, k) for k in range(10)])),
+        c("app", "remove_songs_from_playlist_flexible", lambda i: app.remove_songs_from_playlist_flexible(playlists, bench_playlist, [song_for(i, k) for k in range(10)])),
+        c("app", "get_songs_in_playlist_flexible", lambda i: app.get_songs_in_playlist_flexible(
+            memberships, playlists, ds.id("playlists", rng.randrange(ds.playlists)))),
+        c("app", "delete_playlist_flexible", delete),
+    ]
+
+
+def report_cases(ds, rng, state):
+    import rollups
+    from dao.report_dao import ReportDAO
+
+    reports = ReportDAO()
+
+    def some_playlists():
+        return [ds.id("playlists", rng.randrange(ds.playlists)) for _ in range(50)]
+
+    c = Case
+    return [
+        c("reports", "ReportDAO.count_users_by_role", lambda i: reports.count_users_by_role()),
+        c("reports", "ReportDAO.count_playlists_by_mood", lambda i: reports.count_playlists_by_mood()),
+        c("reports", "ReportDAO.get_playlist_stats", lambda i: reports.get_playlist_stats(some_playlists())),
+        c("reports", "ReportDAO.largest_playlists", lambda i: reports.largest_playlists(10)),
+        c("reports", "ReportDAO.rebuild_aggregates", lambda i: reports.rebuild_aggregates(), scan=True),
+        c("reports", "rpc:count_users_by_role", lambda i: database.supabase.rpc("count_users_by_role").execute(), scan=True),
+        c("reports", "rpc:count_playlists_by_mood", lambda i: database.supabase.rpc("count_playlists_by_mood").execute(), scan=True),
+        c("reports", "rollups.created_trend", lambda i: rollups.created_trend("week")),
+        c("reports", "rollups.library_growth", lambda i: rollups.library_growth("month")),
+    ]
+
+
+GROUPS = {"dao": dao_cases, "app": app_cases, "reports": report_cases}
+
+
+def uncovered_dao_methods(cases):
+    """Public DAO methods with no "dao"/"reports" case, so new methods are not silently skipped."""
+    from dao.artist_dao import ArtistDAO
+    from dao.mood_dao import MoodDAO
+    from dao.playlist_dao import PlaylistDAO
+    from dao.playlist_song_dao import PlaylistSongDAO
+    from dao.report_dao import ReportDAO
+    from dao.song_dao import SongDAO
+    from dao.user_dao import UserDAO
+
+    names = {c.name for c in cases}
+    return [f"{cls.__name__}.{attr}"
+            for cls in (ArtistDAO, MoodDAO, PlaylistDAO, PlaylistSongDAO, ReportDAO, SongDAO, UserDAO)
+            for attr, fn in vars(cls).items()
+            if not attr.startswith("_") and inspect.isfunction(fn) and f"{cls.__name__}.{attr}" not in names]
+
+
+# -------------------------
+# Running and reporting
+# -------------------------
+def _percentile(sorted_ms, q):
+    if len(sorted_ms) == 1:
+        return sorted_ms[0]
+    return statistics.quantiles(sorted_ms, n=100, method="inclusive")[q - 1]
+
+
+def run_case(case, repeat, warmup):
+    n = min(repeat, SCAN_REPEAT) if case.scan else repeat
+    samples, errors, last_error = [], 0, None
+    for i in range(warmup + n):
+        start = time.perf_counter()
+        try:
+            case.fn(i)
+        except Exception as e:
+            if i >= warmup:
+                errors += 1
+                last_error = f"{type(e).__name__}: {e}"
+            continue
+        if i >= warmup:
+            samples.append((time.perf_counter() - start) * 1000)
+    result = {"group": case.group, "calls": n, "errors": errors, "error": last_error}
+    if samples:
+        samples.sort()
+        result.update({
+            "p50_ms": round(_percentile(samples, 50), 3),
+            "p95_ms": round(_percentile(samples, 95), 3),
+            "p99_ms": round(_percentile(samples, 99), 3),
+            "mean_ms": round(statistics.fmean(samples), 3),
+            "max_ms": round(samples[-1], 3),
+            "ops_per_s": round(len(samples) / (sum(samples) / 1000), 1) if sum(samples) else None,
+        })
+    return result
+
+
+def _fmt(value, spec=".2f"):
+    return "-" if value is None else format(value, spec)
+
+
+def print_results(results):
+    print(f"{'case':<46} {'calls':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}")
+    for name, r in results.items():
+        print(f"{name[:46]:<46} {r['calls']:>5} {r['errors']:>4} {_fmt(r.get('p50_ms')):>9} "
+              f"{_fmt(r.get('p95_ms')):>9} {_fmt(r.get('p99_ms')):>9} {_fmt(r.get('ops_per_s'), ',.1f'):>10}")
+    for name, r in results.items():
+        if r["errors"]:
+            print(f"⚠️ {name}: {r['errors']} of {r['calls']} calls failed ({r['error']})")
+
+
+def compare(results, baseline, threshold, floor_ms=0.5):
+    """Print p50/p95 changes against a saved run; returns the names of regressed cases.
+
+    A case regresses when its p95 grew by more than threshold (a fraction) and by
+    more than floor_ms, so sub-millisecond jitter is not reported.
+    """
+    regressed = []
+    print(f"\n{'case':<46} {'p50 base':>9} {'p50 now':>9} {'p95 base':>9} {'p95 now':>9} {'Δp95':>8}")
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or base.get("p95_ms") is None or r.get("p95_ms") is None:
+            continue
+        change = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        flag = ""
+        if change > threshold and r["p95_ms"] - base["p95_ms"] > floor_ms:
+            regressed.append(name)
+            flag = " ⚠️"
+        print(f"{name[:46]:<46} {_fmt(base.get('p50_ms')):>9} {_fmt(r.get('p50_ms')):>9} "
+              f"{_fmt(base['p95_ms']):>9} {_fmt(r['p95_ms']):>9} {change:>+8.0%}{flag}")
+    return regressed
+
+
+def _setup(ds, state):
+    # a dedicated playlist for membership writes, so seeded playlists keep their songs
+    playlist_id = ds.id("playlists", "bench")
+    database.supabase.table("playlists").upsert({
+        "playlist_id": playlist_id, "user_id": ds.id("users", 0), "playlist_name": "Benchmark scratch",
+    }).execute()
+    database.supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).execute()
+    state["bench_playlist"] = playlist_id
+
+
+def _cleanup(state):
+    """Delete rows the write cases created but did not remove (e.g. when a delete case failed)."""
+    keys = {"users": "user_id", "moods": "mood_id", "artists": "artist_id", "songs": "song_id",
+            "playlists": "playlist_id", "app_playlists": "playlist_id"}
+    for name, key in keys.items():
+        ids = [r[key] for r in state.get(name, []) if r.get(key)]
+        table = "playlists" if name == "app_playlists" else name
+        for i in range(0, len(ids), 500):
+            database.supabase.table(table).delete().in_(key, ids[i:i + 500]).execute()
+    database.supabase.table("playlist_songs").delete().eq("playlist_id", state["bench_playlist"]).execute()
+
+
+def run(ds, groups, repeat=20, warmup=2, only=None):
+    rng = random.Random(f"{ds.seed}/cases")
+    state = {}
+    _setup(ds, state)
+    cases = []
+    for group in groups:
+        try:
+            cases.extend(GROUPS[group](ds, rng, state))
+        except ImportError as e:
+            print(f"⚠️ Skipping {group} benchmarks: {e}")
+    missing = uncovered_dao_methods(cases) if "dao" in groups and "reports" in groups else []
+    if missing:
+        print(f"⚠️ DAO methods without a benchmark: {', '.join(missing)}")
+    results = {}
+    try:
+        for case in cases:
+            if only and not any(o in case.name for o in only):
+                continue
+            results[case.name] = run_case(case, repeat, warmup)
+    finally:
+        _cleanup(state)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DAOs, app wrappers and reports on seeded local data.")
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="songs in the dataset (default: 1k)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file (default: <tmp>/playlist-bench-<scale>-<seed>.db)")
+    parser.add_argument("--fresh", action="store_true", help="delete the database and seed again")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--only", nargs="+", help="run only cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per case")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls per case")
+    parser.add_argument("--out", help="results JSON (default: bench-<scale>-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 growth counted as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    from sqlite_backend import SQLiteClient
+
+    ds = Dataset(SCALES[args.scale], args.seed)
+    path = args.db or os.path.join(tempfile.gettempdir(), f"playlist-bench-{args.scale}-{args.seed}.db")
+    if args.fresh:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    database.set_client(SQLiteClient(path))
+    if not is_seeded(ds):
+        print(f"Seeding {path} ({', '.join(f'{n:,} {t}' for t, n in ds.counts().items())})")
+        seed(ds)
+
+    started = datetime.now(timezone.utc)
+    results = run(ds, args.groups, args.repeat, args.warmup, args.only)
+    print_results(results)
+
+    report = {
+        "meta": {
+            "scale": args.scale, "seed": args.seed, "counts": ds.counts(), "repeat": args.repeat,
+            "warmup": args.warmup, "backend": "sqlite", "started_at": started.isoformat(),
+            "python": platform.python_version(), "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    out = args.out or f"bench-{args.scale}-{started.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to {out}")
+
+    # a case that never succeeds has no timings worth keeping as a baseline
+    broken = [name for name, r in results.items() if r["calls"] and r["errors"] == r["calls"]]
+    if broken:
+        print(f"\n❌ {len(broken)} case(s) failed on every call: {', '.join(broken)}")
+        return 1
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressed = compare(results, json.load(f), args.threshold)
+        if regressed:
+            print(f"\n❌ {len(regressed)} regression(s): {', '.join(regressed)}")
+            return 1
+        print("\n✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,27 @@
-from dao.user_dao import UserDAO
-from dao.playlist_dao import PlaylistDAO
-from dao.mood_dao import MoodDAO
-from dao.playlist_song_dao import PlaylistSongDAO
-from dao.song_dao import SongDAO
-from dao.artist_dao import ArtistDAO  # Added import for ArtistDAO
-from dao.report_dao import ReportDAO
-
+import argparse
 import hashlib
+import sys
+
+import commands
+import instrumentation
+# DAO modules and numpy load on first use, so the menu shows without them (see lazy.py)
+from lazy import lazy_attr, lazy_module
+from config import DAO_CACHE_ENABLED, INSTRUMENTATION_ENABLED
+
+UserDAO = lazy_attr("dao.user_dao", "UserDAO")
+PlaylistDAO = lazy_attr("dao.playlist_dao", "PlaylistDAO")
+MoodDAO = lazy_attr("dao.mood_dao", "MoodDAO")
+PlaylistSongDAO = lazy_attr("dao.playlist_song_dao", "PlaylistSongDAO")
+SongDAO = lazy_attr("dao.song_dao", "SongDAO")
+ArtistDAO = lazy_attr("dao.artist_dao", "ArtistDAO")
+ReportDAO = lazy_attr("dao.report_dao", "ReportDAO")
+cached = lazy_attr("dao.cache", "cached")
+get_cache = lazy_attr("dao.cache", "get_cache")
+UnitOfWork = lazy_attr("dao.unit_of_work", "UnitOfWork")
+SongIndex = lazy_attr("recommender", "SongIndex")
+playlist_generator = lazy_module("playlist_generator")
+
+CLI_PAGE_SIZE = 50  # songs printed per page in "List All Songs"
 
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
@@ -74,6 +89,36 @@ def user_menu(user_dao):
         else:
             print("Invalid choice. Please enter a number from 1 to 6.")
 
+def generate_playlist_prompt():
+    user_id = input("Enter User ID who owns the playlist: ").strip()
+    mood_id = input("Enter Mood ID: ").strip()
+    mood = next((m for m in MoodDAO().get_moods_by_user(user_id, columns="summary") if m["mood_id"] == mood_id), None)
+    if not mood:
+        print("Mood not found for this user.")
+        return
+    try:
+        minutes = float(input("Target length in minutes: ").strip())
+        default = playlist_generator.DEFAULT_TOLERANCE
+        tolerance = int(input(f"Tolerance in seconds (default {default}): ").strip() or default)
+    except ValueError:
+        print("Please enter numbers.")
+        return
+    name = input("Playlist name (optional): ").strip() or None
+    print("Indexing song catalog...")
+    index = SongIndex.from_pages(SongDAO().iter_songs(columns="detail"))
+    try:
+        result = playlist_generator.generate_playlist(index, user_id, mood_id, mood["mood_name"], int(minutes * 60), tolerance, name=name)
+    except Exception as e:
+        print(f"❌ Generate failed: {e}")
+        return
+    if not result:
+        print("No combination of songs fits that length.")
+        return
+    print(f"Playlist {result['playlist_id']} created: {len(result['songs'])} songs, "
+          f"{result['total'] // 60}:{result['total'] % 60:02d} total.")
+    for song in result["songs"]:
+        print(f"- {song['title']} ({song['duration']}s)")
+
 def playlist_menu(playlist_dao):
     while True:
         print("\nPlaylist Management")
@@ -82,9 +127,10 @@ def playlist_menu(playlist_dao):
         print("3. Update Playlist")
         print("4. Delete Playlist")
         print("5. List All Playlists")
-        print("6. Back to Main Menu")
+        print("6. Generate Playlist for a Mood")
+        print("7. Back to Main Menu")
 
-        choice = input("Enter choice (1-6): ").strip()
+        choice = input("Enter choice (1-7): ").strip()
 
         if choice == "1":
             user_id = input("Enter User ID who owns the playlist: ").strip()
@@ -132,10 +178,13 @@ def playlist_menu(playlist_dao):
                 print(f"- ID: {pl['playlist_id']}, Name: {pl['name']}, User ID: {pl['user_id']}, Mood ID: {pl.get('mood_id')}")
 
         elif choice == "6":
+            generate_playlist_prompt()
+
+        elif choice == "7":
             break
 
         else:
-            print("Invalid choice, please select 1-6.")
+            print("Invalid choice, please select 1-7.")
 
 def mood_menu(mood_dao):
     while True:
@@ -195,29 +244,81 @@ def mood_menu(mood_dao):
         else:
             print("Invalid choice, please select 1-6.")
 
+def _apply_playlist_edit(playlist_id, add=(), remove=()):
+    """Queue a batch of playlist_songs changes and flush them as bulk requests."""
+    if not (add or remove):
+        return None
+    uow = UnitOfWork()
+    uow.add_songs_to_playlist(playlist_id, add)
+    uow.remove_songs_from_playlist(playlist_id, remove)
+    report = uow.flush()
+    if DAO_CACHE_ENABLED:
+        # the cached DAO wrappers read this playlist's songs; nothing to drop when they are not in use
+        get_cache().invalidate([("playlist_songs", playlist_id)])
+    return report
+
+def _move_song(playlist_song_dao):
+    """Move one song up, down or to a numbered place; only that song's row is rewritten."""
+    playlist_id = input("Enter Playlist ID: ").strip()
+    order = playlist_song_dao.get_song_positions(playlist_id)
+    if not order:
+        print("No songs found or playlist is empty.")
+        return
+    for n, row in enumerate(order, 1):
+        print(f"{n}. Song ID: {row['song_id']}")
+    pick = input("Song number or ID to move: ").strip()
+    ids = [row["song_id"] for row in order]
+    if pick.isdigit() and 1 <= int(pick) <= len(ids):
+        current = int(pick) - 1
+    elif pick in ids:
+        current = ids.index(pick)
+    else:
+        print("Song not in playlist.")
+        return
+    where = input("Move (u)p, (d)own, or to position number: ").strip().lower()
+    if where in ("u", "up"):
+        index = current - 1
+    elif where in ("d", "down"):
+        index = current + 1
+    elif where.isdigit() and int(where) >= 1:
+        index = int(where) - 1
+    else:
+        print("Invalid move.")
+        return
+    if not 0 <= index < len(ids) or index == current:
+        print("Song is already there.")
+        return
+    if playlist_song_dao.move_song(playlist_id, ids[current], index, order=order) is not None:
+        print(f"Moved to position {index + 1}.")
+    else:
+        print("Failed to move song.")
+
 def playlist_song_menu(playlist_song_dao):
     while True:
         print("\nManage Songs in Playlists")
         print("1. Add Song to Playlist")
         print("2. Remove Song from Playlist")
         print("3. List Songs in Playlist")
-        print("4. Back to Main Menu")
+        print("4. Move Song (up/down/to position)")
+        print("5. Back to Main Menu")
 
-        choice = input("Enter choice (1-4): ").strip()
+        choice = input("Enter choice (1-5): ").strip()
 
         if choice == "1":
             playlist_id = input("Enter Playlist ID: ").strip()
-            song_id = input("Enter Song ID to add: ").strip()
-            if playlist_song_dao.add_song_to_playlist(playlist_id, song_id):
-                print("Song added to playlist.")
+            song_ids = [s.strip() for s in input("Enter Song ID(s) to add (comma-separated): ").split(",") if s.strip()]
+            report = _apply_playlist_edit(playlist_id, add=song_ids)
+            if report and not report["failed"]:
+                print(f"Added {len(song_ids)} song(s) in {report['requests']} request(s).")
             else:
                 print("Failed to add song.")
 
         elif choice == "2":
             playlist_id = input("Enter Playlist ID: ").strip()
-            song_id = input("Enter Song ID to remove: ").strip()
-            if playlist_song_dao.remove_song_from_playlist(playlist_id, song_id):
-                print("Song removed from playlist.")
+            song_ids = [s.strip() for s in input("Enter Song ID(s) to remove (comma-separated): ").split(",") if s.strip()]
+            report = _apply_playlist_edit(playlist_id, remove=song_ids)
+            if report and not report["failed"]:
+                print(f"Removed {len(song_ids)} song(s) in {report['requests']} request(s).")
             else:
                 print("Failed to remove song.")
 
@@ -226,16 +327,19 @@ def playlist_song_menu(playlist_song_dao):
             songs = playlist_song_dao.list_songs_in_playlist(playlist_id)
             if songs:
                 print(f"Songs in playlist {playlist_id}:")
-                for s in songs:
-                    print(f"- Song ID: {s['song_id']}")
+                for n, s in enumerate(songs, 1):
+                    print(f"{n}. Song ID: {s['song_id']}")
             else:
                 print("No songs found or playlist is empty.")
 
         elif choice == "4":
+            _move_song(playlist_song_dao)
+
+        elif choice == "5":
             break
 
         else:
-            print("Invalid choice. Please select 1-4.")
+            print("Invalid choice. Please select 1-5.")
 
 def song_menu(song_dao):
     while True:
@@ -290,10 +394,14 @@ def song_menu(song_dao):
                 print("Delete cancelled.")
 
         elif choice == "5":
-            songs = song_dao.list_songs()
-            print(f"Total songs: {len(songs)}")
-            for s in songs:
-                print(f"- ID: {s['song_id']}, Title: {s['title']}, Duration: {s.get('duration')} sec, Artist ID: {s.get('artist_id')}, Genre ID: {s.get('genre_id')}")
+            shown = 0
+            for page in song_dao.iter_songs(page_size=CLI_PAGE_SIZE):
+                for s in page:
+                    print(f"- ID: {s['song_id']}, Title: {s['title']}, Duration: {s.get('duration')} sec, Artist ID: {s.get('artist_id')}, Genre ID: {s.get('genre_id')}")
+                shown += len(page)
+                if len(page) == CLI_PAGE_SIZE and input(f"-- {shown} songs shown. Enter for more, q to stop: ").strip().lower() == "q":
+                    break
+            print(f"Songs listed: {shown}")
 
         elif choice == "6":
             break
@@ -363,9 +471,11 @@ def report_menu(report_dao):
         print("\nReports Menu")
         print("1. User Count by Role")
         print("2. Playlist Count by Mood")
-        print("3. Back to Main Menu")
+        print("3. Largest Playlists")
+        print("4. Rebuild Report Counters")
+        print("5. Back to Main Menu")
 
-        choice = input("Enter choice (1-3): ").strip()
+        choice = input("Enter choice (1-5): ").strip()
 
         if choice == "1":
             data = report_dao.count_users_by_role()
@@ -386,18 +496,37 @@ def report_menu(report_dao):
                     print("No data available.")
 
         elif choice == "3":
+            data = report_dao.largest_playlists()
+            if data:
+                print("Largest playlists:")
+                for item in data:
+                    print(f"- {item['playlist_name']} ({item['playlist_id']}): {item['song_count']} songs, "
+                          f"{item['total_duration'] // 60} min")
+            else:
+                print("No data available.")
+
+        elif choice == "4":
+            for item in report_dao.rebuild_aggregates():
+                print(f"- {item['table']}: {item['rows']} rows")
+            print("Report counters rebuilt.")
+
+        elif choice == "5":
             break
         else:
-            print("Invalid choice. Please enter 1, 2, or 3.")
+            print("Invalid choice. Please enter a number between 1 and 5.")
 
 def main_menu():
-    user_dao = UserDAO()
-    playlist_dao = PlaylistDAO()
-    mood_dao = MoodDAO()
-    playlist_song_dao = PlaylistSongDAO()
-    song_dao = SongDAO()
-    artist_dao = ArtistDAO()
-    report_dao = ReportDAO()  # Initialize ReportDAO
+    # name, menu, DAO class, wrap in the read-through cache
+    MENUS = {
+        "1": ("User Management", user_menu, UserDAO, False),
+        "2": ("Playlist Management", playlist_menu, PlaylistDAO, True),
+        "3": ("Mood Management", mood_menu, MoodDAO, True),
+        "4": ("Manage Songs in Playlists", playlist_song_menu, PlaylistSongDAO, True),
+        "5": ("Song Management", song_menu, SongDAO, True),
+        "6": ("Artist Management", artist_menu, ArtistDAO, False),
+        "7": ("Reports", report_menu, ReportDAO, False),
+    }
+    daos = {}  # created on first visit to their menu
 
     while True:
         print("\nMood-Based Playlist Manager")
@@ -412,27 +541,46 @@ def main_menu():
 
         choice = input("Enter choice (1-8): ").strip()
 
-        if choice == "1":
-            user_menu(user_dao)
-        elif choice == "2":
-            playlist_menu(playlist_dao)
-        elif choice == "3":
-            mood_menu(mood_dao)
-        elif choice == "4":
-            playlist_song_menu(playlist_song_dao)
-        elif choice == "5":
-            song_menu(song_dao)
-        elif choice == "6":
-            artist_menu(artist_dao)
-        elif choice == "7":
-            report_menu(report_dao)
-        elif choice == "8":
+        if choice == "8":
+            if DAO_CACHE_ENABLED:
+                print(f"DAO cache stats: {get_cache().stats()['total']}")
+            if instrumentation.enabled():
+                print("\nProfile (per DAO method / query):")
+                print(instrumentation.format_summary())
             print("Exiting...")
             break
+        elif choice in MENUS:
+            name, menu, dao_class, cacheable = MENUS[choice]
+            if choice not in daos:
+                dao = dao_class()
+                daos[choice] = cached(dao) if DAO_CACHE_ENABLED and cacheable else dao
+            with instrumentation.collect(name):
+                menu(daos[choice])
         else:
             print("Invalid choice. Please enter a number between 1 and 8.")
 
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mood-Based Playlist Manager. Without a command, opens the interactive menu.")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every DAO call and query; print a summary on exit")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json",
+                        help="output of scriptable commands (default: json)")
+    commands.add_subcommands(parser)
+    args = parser.parse_args(argv)
+    if args.profile or INSTRUMENTATION_ENABLED:
+        instrumentation.install()
+
+    if args.group is None:
+        main_menu()
+        return 0
+    code = commands.run_batch(args) if args.command == "batch" else commands.run_command(args)
+    if instrumentation.enabled():
+        print(instrumentation.format_summary(), file=sys.stderr)
+    return code
+
+
 if __name__ == "__main__":
-    main_menu()
+    sys.exit(main())
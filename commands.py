@@ -0,0 +1,494 @@
+"""Non-interactive subcommands for cli.py, and batch mode.
+
+    python cli.py songs list --limit 20
+    python cli.py --format ndjson songs list --all > songs.ndjson
+    python cli.py playlist add-songs <playlist_id> <song_id> <song_id> ...
+    python cli.py report moods
+    python cli.py batch ops.txt --concurrency 8 --batch-size 500
+
+Results go to stdout as JSON (default) or NDJSON (one row per line for list
+results). DAO diagnostics go to stderr, so stdout stays machine-readable. A
+failed command prints ❌ to stderr and exits 1.
+
+Batch mode reads one command per line from a file or stdin, written the way
+it would follow `cli.py` (shlex quoting; blank lines and # comments are
+skipped). Writes (create/delete/add-songs/remove-songs) are collected into
+chunks of --batch-size and each chunk is flushed through one UnitOfWork.
+That turns thousands of single-row writes into a few bulk requests per table.
+Chunks are flushed one at a time, in input order. A UnitOfWork applies its
+operations by table and kind, not in queue order, so a line that writes a row
+an earlier line in the chunk wrote or referenced (remove-songs then add-songs
+of the same song) starts a new chunk; the final state is the one running the
+lines one at a time would leave. Reads run on a pool of
+--concurrency threads while later lines are still being parsed, so a read
+may see the state before or after nearby writes. Each result is one NDJSON
+line {"line", "command", "ok", "result" | "error"}, written as operations
+complete; a throughput and error summary goes to stderr at the end.
+"""
+import argparse
+import contextlib
+import contextvars
+import hashlib
+import json
+import shlex
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import instrumentation
+from lazy import lazy_attr
+
+UserDAO = lazy_attr("dao.user_dao", "UserDAO")
+PlaylistDAO = lazy_attr("dao.playlist_dao", "PlaylistDAO")
+MoodDAO = lazy_attr("dao.mood_dao", "MoodDAO")
+SongDAO = lazy_attr("dao.song_dao", "SongDAO")
+ReportDAO = lazy_attr("dao.report_dao", "ReportDAO")
+UnitOfWork = lazy_attr("dao.unit_of_work", "UnitOfWork")
+
+DEFAULT_LIMIT = 100
+BATCH_SIZE = 500
+CONCURRENCY = 8
+
+# "group action" -> (run, queue); exactly one is set.
+#   run(args) -> result (a generator streams list output)
+#   queue(args, uow) -> finish(report) -> result, for writes that batch mode can merge
+COMMANDS = {}
+
+
+class CommandError(Exception):
+    pass
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _new_id(args):
+    """The id a create command inserts under, fixed on first use so a replayed line reuses it."""
+    if getattr(args, "new_id", None) is None:
+        args.new_id = str(uuid.uuid4())
+    return args.new_id
+
+
+def _results(report, indexes):
+    """Rows returned for the given UoW operations; raises CommandError if any failed."""
+    results = [report["results"][i] for i in indexes]
+    errors = [r["error"] for r in results if not r["ok"]]
+    if errors:
+        raise CommandError(errors[0])
+    return [row for r in results for row in r["rows"]]
+
+
+def _paged(args, fetch_page, iter_all):
+    """--all streams every page; otherwise one page with its cursor."""
+    if args.all:
+        return (row for page in iter_all() for row in page)
+    rows, next_cursor = fetch_page(args.after, args.limit)
+    return {"rows": rows, "next_cursor": next_cursor}
+
+
+# -------------------------
+# Commands
+# -------------------------
+def _users_list(args):
+    dao = UserDAO()
+    return _paged(args, lambda after, limit: dao.list_users_page(after, limit, args.columns),
+                  lambda: dao.iter_users(columns=args.columns))
+
+
+def _users_create(args, uow):
+    row = {"user_id": _new_id(args), "username": args.username, "email": args.email,
+           "password_hash": hashlib.sha256(args.password.encode()).hexdigest(), "role": args.role}
+    i = uow.insert("users", row)
+    return lambda report: _results(report, [i])[0]
+
+
+def _songs_list(args):
+    dao = SongDAO()
+    return _paged(args, lambda after, limit: dao.list_songs_page(after, limit, args.columns),
+                  lambda: dao.iter_songs(columns=args.columns))
+
+
+def _songs_create(args, uow):
+    i = uow.insert("songs", {"song_id": _new_id(args), "title": args.title, "duration": args.duration,
+                             "artist_id": args.artist_id, "created_at": _now()})
+    return lambda report: _results(report, [i])[0]
+
+
+def _songs_delete(args, uow):
+    i = uow.delete("songs", song_id=args.song_id)
+    return lambda report: {"song_id": args.song_id, "deleted": len(_results(report, [i]))}
+
+
+def _moods_list(args):
+    dao = MoodDAO()
+    return dao.get_moods_by_user(args.user, args.columns) if args.user else dao.list_moods(args.columns)
+
+
+def _moods_create(args, uow):
+    i = uow.insert("moods", {"mood_id": _new_id(args), "user_id": args.user, "mood_name": args.name,
+                             "description": args.description, "created_at": _now()})
+    return lambda report: _results(report, [i])[0]
+
+
+def _playlist_list(args):
+    dao = PlaylistDAO()
+    return _paged(args, lambda after, limit: dao.list_playlists_page(args.user, after, limit, args.columns),
+                  lambda: dao.iter_playlists(args.user, columns=args.columns))
+
+
+def _playlist_show(args):
+    detail = PlaylistDAO().get_playlist_detail(args.playlist_id)
+    if detail is None:
+        raise CommandError(f"playlist {args.playlist_id} not found")
+    return detail
+
+
+def _playlist_create(args, uow):
+    playlist_id = _new_id(args)
+    i = uow.insert("playlists", {"playlist_id": playlist_id, "user_id": args.user, "playlist_name": args.name,
+                                 "description": args.description, "mood_id": args.mood, "created_at": _now()})
+    added = uow.add_songs_to_playlist(playlist_id, args.songs)
+
+    def finish(report):
+        row = _results(report, [i])[0]
+        return dict(row, songs_added=len(_results(report, added)))
+    return finish
+
+
+def _playlist_add_songs(args, uow):
+    added = uow.add_songs_to_playlist(args.playlist_id, args.song_ids)
+    # songs already in the playlist are skipped and return no row
+    return lambda report: {"playlist_id": args.playlist_id, "added": len(_results(report, added))}
+
+
+def _playlist_remove_songs(args, uow):
+    removed = uow.remove_songs_from_playlist(args.playlist_id, args.song_ids)
+    return lambda report: {"playlist_id": args.playlist_id, "removed": len(_results(report, removed))}
+
+
+def _playlist_delete(args, uow):
+    i = uow.delete("playlists", playlist_id=args.playlist_id)
+    return lambda report: {"playlist_id": args.playlist_id, "deleted": len(_results(report, [i]))}
+
+
+def _report_roles(args):
+    return ReportDAO().count_users_by_role()
+
+
+def _report_moods(args):
+    return ReportDAO().count_playlists_by_mood()
+
+
+def _report_largest(args):
+    return ReportDAO().largest_playlists(args.limit)
+
+
+def _page_args(p, columns="summary"):
+    p.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"rows per page (default {DEFAULT_LIMIT})")
+    p.add_argument("--after", help="cursor from a previous page's next_cursor")
+    p.add_argument("--all", action="store_true", help="stream every row instead of one page")
+    p.add_argument("--columns", default=columns, help=f"projection name or column list (default {columns})")
+
+
+SPECS = [
+    # group, action, help, arguments, run, queue
+    ("users", "list", "list users", _page_args, _users_list, None),
+    ("users", "create", "create a user", lambda p: (
+        p.add_argument("username"), p.add_argument("email"), p.add_argument("password"),
+        p.add_argument("--role", default="User")), None, _users_create),
+    ("songs", "list", "list songs", _page_args, _songs_list, None),
+    ("songs", "create", "add a song to the catalog", lambda p: (
+        p.add_argument("title"), p.add_argument("--duration", type=int, help="seconds"),
+        p.add_argument("--artist-id")), None, _songs_create),
+    ("songs", "delete", "delete a song", lambda p: p.add_argument("song_id"), None, _songs_delete),
+    ("moods", "list", "list moods (all, or one user's)", lambda p: (
+        p.add_argument("--user"), p.add_argument("--columns", default="detail")), _moods_list, None),
+    ("moods", "create", "create a mood", lambda p: (
+        p.add_argument("--user", required=True), p.add_argument("name"),
+        p.add_argument("--description", default="")), None, _moods_create),
+    ("playlist", "list", "list playlists (all, or one user's)", lambda p: (
+        _page_args(p), p.add_argument("--user")), _playlist_list, None),
+    ("playlist", "show", "a playlist with its mood and songs", lambda p: p.add_argument("playlist_id"),
+     _playlist_show, None),
+    ("playlist", "create", "create a playlist, optionally with songs", lambda p: (
+        p.add_argument("--user", required=True), p.add_argument("name"), p.add_argument("--mood"),
+        p.add_argument("--description", default=""), p.add_argument("--songs", nargs="*", default=[])),
+     None, _playlist_create),
+    ("playlist", "add-songs", "add songs to a playlist", lambda p: (
+        p.add_argument("playlist_id"), p.add_argument("song_ids", nargs="+")), None, _playlist_add_songs),
+    ("playlist", "remove-songs", "remove songs from a playlist", lambda p: (
+        p.add_argument("playlist_id"), p.add_argument("song_ids", nargs="+")), None, _playlist_remove_songs),
+    ("playlist", "delete", "delete a playlist", lambda p: p.add_argument("playlist_id"), None, _playlist_delete),
+    ("report", "roles", "user count by role", lambda p: None, _report_roles, None),
+    ("report", "moods", "playlist count by mood", lambda p: None, _report_moods, None),
+    ("report", "largest", "playlists with the most songs", lambda p: p.add_argument("--limit", type=int, default=10),
+     _report_largest, None),
+]
+
+
+class _StrictParser(argparse.ArgumentParser):
+    """Raises instead of exiting, for parsing batch lines."""
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+def add_subcommands(parser, batch=True):
+    """Add the command groups to parser (an argparse parser or a _StrictParser)."""
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=("json", "ndjson"), default=argparse.SUPPRESS)
+    groups = parser.add_subparsers(dest="group", metavar="COMMAND")
+    actions = {}
+    for group, action, help_text, arguments, run, queue in SPECS:
+        if group not in actions:
+            actions[group] = groups.add_parser(group, help=f"{group} commands").add_subparsers(
+                dest="action", metavar="ACTION", required=True)
+        sub = actions[group].add_parser(action, help=help_text, parents=[output])
+        arguments(sub)
+        sub.set_defaults(command=f"{group} {action}")
+        COMMANDS[f"{group} {action}"] = (run, queue)
+    if batch:
+        sub = groups.add_parser("batch", help="run commands from a file or stdin (NDJSON results)")
+        sub.add_argument("file", nargs="?", default="-", help="one command per line (default: stdin)")
+        sub.add_argument("--concurrency", type=int, default=CONCURRENCY, help="parallel reads")
+        sub.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="writes merged per flush")
+        sub.set_defaults(command="batch")
+    return parser
+
+
+# -------------------------
+# Running
+# -------------------------
+def execute(args):
+    """Run one parsed command and return its result."""
+    run, queue = COMMANDS[args.command]
+    with instrumentation.collect(args.command):
+        if run is not None:
+            return run(args)
+        uow = UnitOfWork()
+        finish = queue(args, uow)
+        return finish(uow.flush())
+
+
+def emit(result, fmt, out):
+    if fmt == "ndjson":
+        rows = result if isinstance(result, list) or hasattr(result, "__next__") else [result]
+        for row in rows:
+            out.write(json.dumps(row, default=str) + "\n")
+    else:
+        if hasattr(result, "__next__"):
+            result = list(result)
+        out.write(json.dumps(result, indent=2, default=str) + "\n")
+    out.flush()
+
+
+def run_command(args, out=None):
+    """Execute and print one command; returns the process exit code."""
+    out = out or sys.stdout
+    try:
+        # DAO diagnostics are print()s; keep them off stdout (out is bound before the redirect)
+        with contextlib.redirect_stdout(sys.stderr):
+            emit(execute(args), args.format, out)
+    except Exception as e:
+        print(f"❌ {args.command} failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+class BatchRunner:
+    def __init__(self, concurrency=CONCURRENCY, batch_size=BATCH_SIZE, out=None):
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.out = out or sys.stdout
+        self.parser = add_subcommands(_StrictParser(prog="batch"), batch=False)
+        self.stats = Counter()
+        self.errors = Counter()
+
+    def _parse(self, line):
+        try:
+            args = self.parser.parse_args(shlex.split(line))
+        except SystemExit:  # --help
+            raise CommandError("help is not available in batch mode")
+        if getattr(args, "command", None) is None:
+            raise CommandError("missing command")
+        return args
+
+    def _read(self, line_no, args):
+        try:
+            result = execute(args)
+            if hasattr(result, "__next__"):
+                result = list(result)
+            return [(line_no, args.command, True, result)]
+        except Exception as e:
+            return [(line_no, args.command, False, str(e))]
+
+    def _flush(self, chunk):
+        """One UnitOfWork for a chunk of writes; each command gets its own result.
+
+        A failed bulk request fails every command queued into it, so when the
+        chunk has failures those commands are replayed one at a time, each in
+        its own UnitOfWork, to pin the error on the lines actually at fault.
+        A replayed line keeps its ids and only re-sends the operations that did
+        not land the first time, so nothing is written twice.
+        """
+        out, report, spans = self._write(chunk)
+        if not report["failed"] or len(chunk) == 1:
+            return out
+        for i, (line_no, args) in enumerate(chunk):
+            if not out[i][2] and line_no in spans:
+                start, end = spans[line_no]
+                landed = {j - start: report["results"][j] for j in range(start, end) if report["results"][j]["ok"]}
+                out[i] = self._write([(line_no, args)], landed)[0][0]
+        return out
+
+    def _write(self, chunk, landed=None):
+        """Queue and flush commands.
+
+        Returns (records, report, {line number: (first, end) operation index}
+        for the lines that queued cleanly).
+        """
+        uow = UnitOfWork()
+        finishers, spans = [], {}
+        for line_no, args in chunk:
+            start = len(uow)
+            try:
+                finishers.append((line_no, args, COMMANDS[args.command][1](args, uow)))
+                spans[line_no] = (start, len(uow))
+            except Exception as e:
+                finishers.append((line_no, args, e))
+        with instrumentation.collect("batch flush"):
+            report = uow.flush(landed)
+        self.stats["requests"] += report["requests"]
+        out = []
+        for line_no, args, finish in finishers:
+            if isinstance(finish, Exception):
+                out.append((line_no, args.command, False, str(finish)))
+                continue
+            try:
+                out.append((line_no, args.command, True, finish(report)))
+            except Exception as e:
+                out.append((line_no, args.command, False, str(e)))
+        return out, report, spans
+
+    @staticmethod
+    def _touched(args):
+        """(writes, refs) for one write command, from queueing it into a scratch UnitOfWork."""
+        probe = UnitOfWork()
+        try:
+            COMMANDS[args.command][1](args, probe)
+        except Exception:
+            return set(), set()  # _write reports the error
+        return probe.touched()
+
+    @staticmethod
+    def _overlaps(keys, seen):
+        """Whether any (table, key) in keys hits one in seen ({table: keys}); a None key hits the whole table."""
+        for table, key in keys:
+            rows = seen.get(table)
+            if rows and (key is None or key in rows or None in rows):
+                return True
+        return False
+
+    def _record(self, records):
+        for line_no, command, ok, value in records:
+            entry = {"line": line_no, "command": command, "ok": ok}
+            entry["result" if ok else "error"] = value
+            self.out.write(json.dumps(entry, default=str) + "\n")
+            self.stats["ok" if ok else "failed"] += 1
+            if not ok:
+                self.errors[f"{command}: {value}"[:160]] += 1
+
+    @staticmethod
+    def _submit(pool, fn, *args):
+        # pool threads don't inherit context variables; carry the instrumentation scope (--profile) over
+        return pool.submit(contextvars.copy_context().run, fn, *args)
+
+    def run(self, lines):
+        """Run every command in lines; returns a summary dict."""
+        start = time.perf_counter()
+        pending, chunk = set(), []
+        written, referenced = {}, {}  # {table: keys} for the current chunk
+        reads = ThreadPoolExecutor(self.concurrency, thread_name_prefix="batch-read")
+        writer = ThreadPoolExecutor(1, thread_name_prefix="batch-write")  # keeps write chunks in order
+
+        def drain(limit):
+            nonlocal pending
+            while len(pending) > limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._record(future.result())
+
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                for line_no, line in enumerate(lines, 1):
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    try:
+                        args = self._parse(line)
+                    except (CommandError, ValueError) as e:
+                        self._record([(line_no, line.split()[0], False, f"bad command: {e}")])
+                        continue
+                    if COMMANDS[args.command][1] is not None:
+                        writes, refs = self._touched(args)
+                        if chunk and (self._overlaps(writes, written) or self._overlaps(writes, referenced)
+                                      or self._overlaps(refs, written)):
+                            pending.add(self._submit(writer, self._flush, chunk))
+                            chunk, written, referenced = [], {}, {}
+                        chunk.append((line_no, args))
+                        for seen, keys in ((written, writes), (referenced, refs)):
+                            for table, key in keys:
+                                seen.setdefault(table, set()).add(key)
+                        if len(chunk) >= self.batch_size:
+                            pending.add(self._submit(writer, self._flush, chunk))
+                            chunk, written, referenced = [], {}, {}
+                    else:
+                        self.stats["reads"] += 1
+                        pending.add(self._submit(reads, self._read, line_no, args))
+                    drain(self.concurrency * 2)
+                if chunk:
+                    pending.add(self._submit(writer, self._flush, chunk))
+                drain(0)
+        finally:
+            reads.shutdown()
+            writer.shutdown()
+            self.out.flush()
+
+        elapsed = time.perf_counter() - start
+        total = self.stats["ok"] + self.stats["failed"]
+        return {
+            "operations": total,
+            "ok": self.stats["ok"],
+            "failed": self.stats["failed"],
+            "seconds": round(elapsed, 3),
+            "ops_per_s": round(total / elapsed, 1) if elapsed else None,
+            "write_requests": self.stats["requests"],
+            "reads": self.stats["reads"],
+            "top_errors": self.errors.most_common(5),
+        }
+
+
+def format_batch_summary(summary):
+    lines = [f"{'✅' if not summary['failed'] else '⚠️'} {summary['operations']} operations in "
+             f"{summary['seconds']:.2f}s ({summary['ops_per_s'] or 0:,.0f} ops/s): "
+             f"{summary['ok']} ok, {summary['failed']} failed; "
+             f"{summary['write_requests']} bulk write requests, {summary['reads']} reads"]
+    for message, count in summary["top_errors"]:
+        lines.append(f"   {count} × {message}")
+    return "\n".join(lines)
+
+
+def run_batch(args):
+    """Entry point for `cli.py batch`; returns the process exit code."""
+    runner = BatchRunner(args.concurrency, args.batch_size)
+    if args.file == "-":
+        summary = runner.run(sys.stdin)
+    else:
+        with open(args.file, encoding="utf-8") as f:
+            summary = runner.run(f)
+    print(format_batch_summary(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
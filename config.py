@@ -5,8 +5,35 @@ load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-import os
 
+# HTTP connection pool shared by every DAO (see database.get_client)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+
+# Storage engine behind the DAOs: "supabase" (hosted) or "sqlite" (local file)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "playlist_manager.db")
+
+# Opt-in read-through DAO cache (dao/cache.py)
+DAO_CACHE_ENABLED = os.getenv("DAO_CACHE_ENABLED", "0").lower() in ("1", "true", "yes")
+DAO_CACHE_MAX_BYTES = int(os.getenv("DAO_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+DAO_CACHE_TTLS = {
+    "songs": float(os.getenv("DAO_CACHE_TTL_SONGS", "300")),
+    "moods": float(os.getenv("DAO_CACHE_TTL_MOODS", "120")),
+    "playlists": float(os.getenv("DAO_CACHE_TTL_PLAYLISTS", "60")),
+    "playlist_songs": float(os.getenv("DAO_CACHE_TTL_PLAYLIST_SONGS", "30")),
+}
+
+# Rows per page for keyset-paginated list APIs (dao/pagination.py)
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "500"))
 
+# IDs per in_ filter; they go in the GET URL, so this stays well under proxy URL limits
+IN_FILTER_BATCH = int(os.getenv("IN_FILTER_BATCH", "200"))
 
+# Rows per bulk write in the CSV/JSONL importer (importer.py)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
 
+# Per-call DAO/query timing (instrumentation.py) and the app's sidebar debug panel
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "0").lower() in ("1", "true", "yes")
@@ -1,10 +1,6 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
 from datetime import datetime
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
+from dao.projections import columns_for
 
 class ArtistDAO:
     def create_artist(self, user_id, name, description=None):
@@ -15,8 +11,8 @@ class ArtistDAO:
             "created_at": datetime.now().isoformat()
         }).execute()
 
-    def get_artists_by_user(self, user_id):
-        res = supabase.table("artists").select("*").eq("user_id", user_id).execute()
+    def get_artists_by_user(self, user_id, columns=None):
+        res = supabase.table("artists").select(columns_for("artists", columns)).eq("user_id", user_id).execute()
         return res.data if res.data else []
 
     def update_artist(self, artist_id, user_id, name=None, description=None):
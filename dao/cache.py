@@ -0,0 +1,228 @@
+"""Opt-in read-through cache for the DAO classes.
+
+Wrap any DAO with ``cached(dao)``: read methods listed in READ_POLICIES are
+served from memory until their per-entity TTL expires, and successful write
+methods listed in WRITE_POLICIES drop exactly the entries they affect.
+Entries are tagged (e.g. ``("moods", "user", <user_id>)`` or
+``("playlist", <playlist_id>)``) and writes invalidate by tag. Cached results
+are shared, so treat them as read-only.
+"""
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from config import DAO_CACHE_MAX_BYTES, DAO_CACHE_TTLS
+
+
+def _ids(rows, key):
+    return [r.get(key) for r in rows or [] if isinstance(r, dict) and r.get(key)]
+
+
+# method -> (entity, tags(args, result))
+READ_POLICIES = {
+    "list_moods": ("moods", lambda a, res: [("moods", "all")]),
+    "get_moods_by_user": ("moods", lambda a, res: [("moods", "user", a["user_id"])]),
+    "list_songs": ("songs", lambda a, res: [("songs",)]),
+    "list_songs_for_user": ("songs", lambda a, res: [("songs",)]),
+    "get_playlists_by_user": ("playlists", lambda a, res: [("playlists", "user", a["user_id"])]
+                              + [("playlist", pid) for pid in _ids(res, "playlist_id")]),
+    "get_playlists_by_mood": ("playlists", lambda a, res: [("playlists", "mood", a["mood_id"])]
+                              + [("playlist", pid) for pid in _ids(res, "playlist_id")]),
+    "list_playlists_by_mood": ("playlists", lambda a, res: [("playlists", "mood", a["mood_id"])]
+                               + [("playlist", pid) for pid in _ids(res, "playlist_id")]),
+    "search_playlists": ("playlists", lambda a, res: [("playlists", "user", a["user_id"])]
+                         + [("playlist", pid) for pid in _ids(res, "playlist_id")]),
+    "get_playlist_detail": ("playlists", lambda a, res: [("playlist", a["playlist_id"]),
+                                                         ("playlist_songs", a["playlist_id"])]
+                            + [("song", sid) for sid in _ids((res or {}).get("songs"), "song_id")]),
+    "get_songs_in_playlist": ("playlist_songs", lambda a, res: [("playlist_songs", a["playlist_id"])]
+                              + [("song", sid) for sid in _ids(res, "song_id")]),
+    "list_songs_in_playlist": ("playlist_songs", lambda a, res: [("playlist_songs", a["playlist_id"])]
+                               + [("song", sid) for sid in _ids(res, "song_id")]),
+}
+
+# method -> tags to invalidate(args)
+WRITE_POLICIES = {
+    "create_mood": lambda a: [("moods", "all"), ("moods", "user", a["user_id"])],
+    "update_mood": lambda a: [("moods", "all"), ("moods", "user", a["user_id"])],
+    "delete_mood": lambda a: [("moods", "all"), ("moods", "user", a["user_id"]),
+                              ("playlists", "mood", a["mood_id"])],
+    "create_song": lambda a: [("songs",)],
+    "update_song": lambda a: [("songs",), ("song", a["song_id"])],
+    "delete_song": lambda a: [("songs",), ("song", a["song_id"])],
+    "create_playlist": lambda a: [("playlists", "user", (a["data"] or {}).get("user_id")),
+                                  ("playlists", "mood", (a["data"] or {}).get("mood_id"))],
+    "update_playlist": lambda a: [("playlist", a["playlist_id"]), ("playlists", "user", a["user_id"]),
+                                  ("playlists", "mood", (a["update_data"] or {}).get("mood_id"))],
+    "delete_playlist": lambda a: [("playlist", a["playlist_id"]), ("playlist_songs", a["playlist_id"])],
+    "add_song_to_playlist": lambda a: [("playlist_songs", a["playlist_id"])],
+    "remove_song_from_playlist": lambda a: [("playlist_songs", a["playlist_id"])],
+    "add_songs_to_playlist": lambda a: [("playlist_songs", a["playlist_id"])],
+    "remove_songs_from_playlist": lambda a: [("playlist_songs", a["playlist_id"])],
+    "move_song": lambda a: [("playlist_songs", a["playlist_id"])],
+    "rebalance_positions": lambda a: [("playlist_songs", a["playlist_id"])],
+}
+
+
+def _approx_size(value):
+    """Rough in-memory size of DAO results (lists of flat dicts)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(v) for v in value)
+    return size
+
+
+class DAOCache:
+    def __init__(self, max_bytes=DAO_CACHE_MAX_BYTES, ttls=None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(DAO_CACHE_TTLS, **(ttls or {}))
+        self._entries = OrderedDict()   # key -> (expires_at, size, tags, entity, value)
+        self._tags = {}                 # tag -> set of keys
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {}
+
+    # ---- stats ----
+    def _bump(self, entity, field, n=1):
+        entity_stats = self._stats.setdefault(entity, {"hits": 0, "misses": 0, "evictions": 0,
+                                                        "expirations": 0, "invalidations": 0})
+        entity_stats[field] += n
+
+    def stats(self):
+        """Hit/miss counters per entity plus totals."""
+        with self._lock:
+            per_entity = {e: dict(s) for e, s in self._stats.items()}
+            totals = {}
+            for s in per_entity.values():
+                for k, v in s.items():
+                    totals[k] = totals.get(k, 0) + v
+            lookups = totals.get("hits", 0) + totals.get("misses", 0)
+            totals["hit_rate"] = round(totals.get("hits", 0) / lookups, 3) if lookups else 0.0
+            totals["entries"] = len(self._entries)
+            totals["bytes"] = self._bytes
+            return {"total": totals, "by_entity": per_entity}
+
+    # ---- storage ----
+    def _drop(self, key):
+        _, size, tags, entity, _ = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entity
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                self._bump(self._drop(key), "expirations")
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[4]
+
+    def put(self, key, entity, tags, value):
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttls.get(entity, 60), size, set(tags), entity, value)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._bump(self._drop(oldest), "evictions")
+
+    def invalidate(self, tags):
+        """Drop every entry carrying one of ``tags``; returns how many were removed."""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if key in self._entries:
+                        self._bump(self._drop(key), "invalidations")
+                        removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+
+class CachedDAO:
+    """Proxy that adds read-through caching and write invalidation to a DAO."""
+
+    def __init__(self, dao, cache=None):
+        self._dao = dao
+        self._cache = cache or get_cache()
+        self._name = type(dao).__name__
+
+    def __getattr__(self, name):
+        attr = getattr(self._dao, name)
+        if not callable(attr):
+            return attr
+        if name in READ_POLICIES:
+            return self._read(name, attr)
+        if name in WRITE_POLICIES:
+            return self._write(name, attr)
+        return attr
+
+    @staticmethod
+    def _bind(method, args, kwargs):
+        bound = inspect.signature(method).bind(*args, **kwargs)
+        bound.apply_defaults()
+        return bound.arguments
+
+    def _read(self, name, method):
+        entity, tag_fn = READ_POLICIES[name]
+
+        def wrapper(*args, **kwargs):
+            arguments = self._bind(method, args, kwargs)
+            key = (self._name, name, repr(tuple(arguments.items())))
+            hit, value = self._cache.get(key)
+            with self._cache._lock:
+                self._cache._bump(entity, "hits" if hit else "misses")
+            if hit:
+                return list(value) if isinstance(value, list) else value
+            value = method(*args, **kwargs)
+            self._cache.put(key, entity, tag_fn(arguments, value), value)
+            return list(value) if isinstance(value, list) else value
+        return wrapper
+
+    def _write(self, name, method):
+        tag_fn = WRITE_POLICIES[name]
+
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if result is not None:
+                self._cache.invalidate(tag_fn(self._bind(method, args, kwargs)))
+            return result
+        return wrapper
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Process-wide cache shared by every CachedDAO that does not bring its own."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DAOCache()
+    return _default_cache
+
+
+def cached(dao, cache=None):
+    return CachedDAO(dao, cache)
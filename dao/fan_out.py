@@ -0,0 +1,55 @@
+"""Concurrent fan-out of independent page reads.
+
+Independent page reads (moods, playlists, a playlist's songs, the song
+catalog) can run at the same time, so a page waits for its slowest query
+instead of the sum of all of them:
+
+    data = fan_out(moods=asyncio.to_thread(load_moods, uid),
+                   playlists=asyncio.to_thread(load_playlists, uid))
+
+All coroutines run on one background event loop owned by this module. The
+DAOs themselves are synchronous (their st.cache_data loaders and the session
+model sit in front of them), so app.prefetch runs each read in a worker
+thread; the shared httpx pool in database.py lets those requests overlap.
+"""
+import asyncio
+import threading
+
+import instrumentation
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="dao-fan-out-loop", daemon=True).start()
+    return _loop
+
+
+async def _in_scope(coro, scope):
+    # tasks on the loop thread don't inherit the caller's context; carry the instrumentation scope over
+    with instrumentation.within(scope):
+        return await coro
+
+
+def run_async(coro):
+    """Run a coroutine on the fan-out event loop from synchronous code and return its result."""
+    scope = instrumentation.current_scope()
+    if scope is not None:
+        coro = _in_scope(coro, scope)
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+async def gather_queries(**coros):
+    """Await independent queries concurrently; returns {name: result or the exception raised}."""
+    results = await asyncio.gather(*coros.values(), return_exceptions=True)
+    return dict(zip(coros, results))
+
+
+def fan_out(**coros):
+    """Synchronous entry point for gather_queries (Streamlit pages, CLI)."""
+    return run_async(gather_queries(**coros))
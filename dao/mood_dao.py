@@ -1,10 +1,8 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
 from datetime import datetime, timezone
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
+from dao.pagination import fetch_page, iter_pages
+from dao.projections import columns_for
+from config import PAGE_SIZE
 
 class MoodDAO:
     def create_mood(self, user_id, mood_name, description=""):
@@ -21,25 +19,37 @@ class MoodDAO:
             print(f"❌ Error creating mood: {e}")
             return None
 
-    def list_moods(self):
+    def list_moods(self, columns="detail"):
         """Fetch all moods."""
         try:
-            res = supabase.table("moods").select("mood_id, mood_name, description, created_at").execute()
+            res = supabase.table("moods").select(columns_for("moods", columns)).execute()
             return res.data if res.data else []
         except Exception as e:
             print(f"❌ Error listing moods: {e}")
             return []
 
-    def get_moods_by_user(self, user_id):
+    def list_moods_page(self, after=None, limit=PAGE_SIZE, columns="detail"):
+        """Fetch one page of moods ordered by mood_id; returns (rows, next_cursor)."""
+        try:
+            return fetch_page("moods", "mood_id", columns_for("moods", columns), after, limit)
+        except Exception as e:
+            print(f"❌ Error listing moods page: {e}")
+            return [], None
+
+    def iter_moods(self, page_size=PAGE_SIZE, columns="detail"):
+        """Yield all moods one page at a time."""
+        return iter_pages("moods", "mood_id", columns_for("moods", columns), page_size)
+
+    def get_moods_by_user(self, user_id, columns="detail"):
         """Fetch moods for a given user."""
         try:
-            res = supabase.table("moods").select("mood_id, mood_name, description, created_at").eq("user_id", user_id).execute()
+            res = supabase.table("moods").select(columns_for("moods", columns)).eq("user_id", user_id).execute()
             return res.data if res.data else []
         except Exception as e:
             print("⚠️ get_moods_by_user() fallback (no user_id):", e)
             # fallback: return all moods if filtering fails
             try:
-                res = supabase.table("moods").select("mood_id, mood_name, description, created_at").execute()
+                res = supabase.table("moods").select(columns_for("moods", columns)).execute()
                 return res.data if res.data else []
             except Exception as e2:
                 print(f"❌ Fallback also failed: {e2}")
@@ -0,0 +1,84 @@
+"""Keyset (cursor) pagination shared by the DAO list APIs.
+
+Pages are ordered by the table's primary key and resume strictly after the
+last key seen, so every page is an index range scan no matter how deep the
+caller has paged — unlike offset pagination, which rescans skipped rows.
+"""
+from config import IN_FILTER_BATCH, PAGE_SIZE
+from database import supabase
+
+
+def fetch_page(table, key, columns="*", after=None, limit=PAGE_SIZE, filters=()):
+    """Return (rows, next_cursor); next_cursor is None once the last page is reached."""
+    if columns != "*" and key not in [c.strip() for c in columns.split(",")]:
+        columns = f"{key}, {columns}"
+    query = supabase.table(table).select(columns)
+    # filters: (column, value) for equality, or (column, op, value) such as ("created_at", "gte", start)
+    for f in filters:
+        column, value = f[0], f[-1]
+        query = getattr(query, f[1] if len(f) == 3 else "eq")(column, value)
+    if after is not None:
+        query = query.gt(key, after)
+    res = query.order(key).limit(limit).execute()
+    rows = res.data if res and res.data else []
+    next_cursor = rows[-1][key] if len(rows) == limit else None
+    return rows, next_cursor
+
+
+def iter_pages(table, key, columns="*", page_size=PAGE_SIZE, filters=(), after=None):
+    """Yield pages lazily; only one page is held in memory at a time."""
+    while True:
+        rows, after = fetch_page(table, key, columns, after, page_size, filters)
+        if rows:
+            yield rows
+        if after is None:
+            return
+
+
+def iter_pages_composite(table, outer, inner, columns="*", page_size=PAGE_SIZE, filters=()):
+    """Keyset pages over a two-column key such as playlist_songs (playlist_id, song_id).
+
+    (outer, inner) > (a, b) is split into two index range scans that need only
+    eq/gt: the rest of group a past b, then the groups after a. Each page costs
+    one or two requests; only one page is held in memory at a time.
+    """
+    wanted = [c.strip() for c in columns.split(",")] if columns != "*" else []
+    for key in (inner, outer):
+        if wanted and key not in wanted:
+            columns = f"{key}, {columns}"
+
+    def query(extra):
+        q = supabase.table(table).select(columns)
+        for f in list(filters) + extra:
+            q = getattr(q, f[1] if len(f) == 3 else "eq")(f[0], f[-1])
+        return q
+
+    last = None
+    while True:
+        rows = []
+        if last is not None:
+            res = query([(outer, last[0]), (inner, "gt", last[1])]).order(inner).limit(page_size).execute()
+            rows = res.data if res and res.data else []
+        if len(rows) < page_size:
+            q = query([(outer, "gt", last[0])] if last is not None else [])
+            res = q.order(outer).order(inner).limit(page_size - len(rows)).execute()
+            rows += res.data if res and res.data else []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last = (rows[-1][outer], rows[-1][inner])
+
+
+def iter_playlist_songs(playlist_filters=(), columns="playlist_id, song_id", page_size=PAGE_SIZE):
+    """playlist_songs pages for the playlists matching playlist_filters.
+
+    The playlists are walked one page at a time and their memberships fetched
+    IN_FILTER_BATCH playlists per in_ filter (the IDs go in the URL), so
+    requests scale with pages, not playlists, and no read hits the server's row cap.
+    """
+    for playlists in iter_pages("playlists", "playlist_id", "playlist_id", page_size, playlist_filters):
+        ids = [p["playlist_id"] for p in playlists]
+        for i in range(0, len(ids), IN_FILTER_BATCH):
+            yield from iter_pages_composite("playlist_songs", "playlist_id", "song_id", columns, page_size,
+                                            [("playlist_id", "in_", ids[i:i + IN_FILTER_BATCH])])
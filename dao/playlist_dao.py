@@ -1,32 +1,97 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
 from datetime import datetime
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
+from dao.pagination import fetch_page, iter_pages, iter_playlist_songs
+from dao.projections import columns_for
+from config import PAGE_SIZE
 
 class PlaylistDAO:
     def create_playlist(self, data):
         return supabase.table("playlists").insert(data).execute()
 
-    def get_playlists_by_user(self, user_id):
-        res = supabase.table("playlists").select("*").eq("user_id", user_id).execute()
+    def get_playlists_by_user(self, user_id, columns=None):
+        res = supabase.table("playlists").select(columns_for("playlists", columns)).eq("user_id", user_id).execute()
         return res.data if res and res.data else []
 
+    def list_playlists_page(self, user_id=None, after=None, limit=PAGE_SIZE, columns=None):
+        """One page of playlists (optionally one user's) ordered by playlist_id."""
+        filters = [("user_id", user_id)] if user_id else []
+        return fetch_page("playlists", "playlist_id", columns_for("playlists", columns), after, limit, filters)
+
+    def iter_playlists(self, user_id=None, page_size=PAGE_SIZE, columns=None):
+        filters = [("user_id", user_id)] if user_id else []
+        return iter_pages("playlists", "playlist_id", columns_for("playlists", columns), page_size, filters)
+
+    def search_playlists(self, user_id, query, limit=20, columns="summary"):
+        """Top matches for query in the user's playlist names, prefix matches first.
+
+        Both steps are server-side ilike filters (trigram-indexed on Supabase, see
+        sql/playlist_search.sql; a NOCASE index range scan on SQLite) and are capped
+        at limit rows, so cost does not grow with the size of the library.
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        cols = columns_for("playlists", columns)
+        if "playlist_id" not in cols and cols != "*":
+            cols = "playlist_id, " + cols
+
+        def _match(pattern, n):
+            res = supabase.table("playlists").select(cols).eq("user_id", user_id) \
+                .ilike("playlist_name", pattern).order("playlist_name").limit(n).execute()
+            return res.data if res and res.data else []
+
+        results = _match(f"{escaped}%", limit)
+        if len(results) < limit:
+            seen = {r["playlist_id"] for r in results}
+            # over-fetch by the prefix hits, which the contains-match returns again
+            for row in _match(f"%{escaped}%", limit + len(results)):
+                if row["playlist_id"] not in seen:
+                    results.append(row)
+                    if len(results) == limit:
+                        break
+        return results
+
     def update_playlist(self, playlist_id, update_data, user_id):
-        return supabase.table("playlists").update(update_data).eq("id", playlist_id).eq("user_id", user_id).execute()
+        return supabase.table("playlists").update(update_data).eq("playlist_id", playlist_id).eq("user_id", user_id).execute()
 
     def delete_playlist(self, playlist_id):
-        return supabase.table("playlists").delete().eq("id", playlist_id).execute()
+        return supabase.table("playlists").delete().eq("playlist_id", playlist_id).execute()
 
-    def get_songs_in_playlist(self, playlist_id):
+    def get_songs_in_playlist(self, playlist_id, columns=None):
+        """columns selects the embedded song fields (default: title)."""
         res = supabase.table("playlist_songs") \
-            .select("song_id, songs(title)") \
+            .select(f"song_id, position, songs({columns_for('songs', columns, 'title')})") \
             .eq("playlist_id", playlist_id) \
+            .order("position") \
             .execute()
         return res.data if res.data else []
 
+    def get_playlist_detail(self, playlist_id):
+        """Playlist, its mood and its songs (title, duration) in one embedded-select request.
+
+        Returns {"playlist": {...}, "mood": {...} or None, "songs": [...]}, or None if not found.
+        Songs come back in playlist order (playlist_songs.position).
+        """
+        res = supabase.table("playlists") \
+            .select("playlist_id, user_id, playlist_name, description, mood_id, created_at, "
+                    "moods(mood_id, mood_name), "
+                    "playlist_songs(song_id, added_at, position, songs(song_id, title, duration))") \
+            .eq("playlist_id", playlist_id) \
+            .order("position", foreign_table="playlist_songs") \
+            .limit(1) \
+            .execute()
+        rows = res.data if res and res.data else []
+        if not rows:
+            return None
+        playlist = dict(rows[0])
+        mood = playlist.pop("moods", None)
+        songs = []
+        for item in playlist.pop("playlist_songs", None) or []:
+            song = item.get("songs") or {"song_id": item.get("song_id")}
+            songs.append(dict(song, added_at=item.get("added_at"), position=item.get("position")))
+        return {"playlist": playlist, "mood": mood, "songs": songs}
+
     def add_song_to_playlist(self, playlist_id, song_id):
         return supabase.table("playlist_songs").insert({
             "playlist_id": playlist_id,
@@ -36,15 +101,41 @@ class PlaylistDAO:
     def remove_song_from_playlist(self, playlist_id, song_id):
         return supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).eq("song_id", song_id).execute()
 
-    def list_playlists_by_mood(self, mood_id):
-        res = supabase.table("playlists").select("*").eq("mood_id", mood_id).execute()
+    def add_songs_to_playlist(self, playlist_id, song_ids):
+        """Add many songs in one request; songs already in the playlist are skipped."""
+        rows = [{"playlist_id": playlist_id, "song_id": sid} for sid in dict.fromkeys(song_ids)]
+        if not rows:
+            return None
+        return supabase.table("playlist_songs") \
+            .upsert(rows, on_conflict="playlist_id,song_id", ignore_duplicates=True) \
+            .execute()
+
+    def remove_songs_from_playlist(self, playlist_id, song_ids):
+        """Remove many songs in one request."""
+        song_ids = list(dict.fromkeys(song_ids))
+        if not song_ids:
+            return None
+        return supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).in_("song_id", song_ids).execute()
+
+    def list_playlists_by_mood(self, mood_id, columns=None):
+        res = supabase.table("playlists").select(columns_for("playlists", columns)).eq("mood_id", mood_id).execute()
         return res.data if res.data else []
-    def get_playlists_by_mood(self, mood_id):
+    def get_playlists_by_mood(self, mood_id, columns=None):
         """Fetch playlists associated with a given mood."""
         try:
-            res = supabase.table("playlists").select("*").eq("mood_id", mood_id).execute()
+            res = supabase.table("playlists").select(columns_for("playlists", columns)).eq("mood_id", mood_id).execute()
             return res.data if res.data else []
         except Exception as e:
             print(f"❌ Error fetching playlists by mood: {e}")
             return []
 
+    def get_song_ids_by_mood(self, mood_id, page_size=PAGE_SIZE):
+        """song_id of every membership in playlists tagged with mood_id; a song repeats once per playlist.
+
+        Paged and batched like every other membership walk (iter_playlist_songs).
+        Errors propagate: callers treat these as the mood's signal, and an empty
+        list would read as "no history" rather than a failed request.
+        """
+        return [r["song_id"] for page in iter_playlist_songs([("mood_id", mood_id)], "playlist_id, song_id", page_size)
+                for r in page]
+
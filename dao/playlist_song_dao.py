@@ -1,9 +1,6 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
+from dao import rank
+from dao.unit_of_work import UnitOfWork
 
 class PlaylistSongDAO:
     def add_song_to_playlist(self, playlist_id, song_id):
@@ -15,6 +12,68 @@ class PlaylistSongDAO:
     def remove_song_from_playlist(self, playlist_id, song_id):
         return supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).eq("song_id", song_id).execute()
 
+    def add_songs_to_playlist(self, playlist_id, song_ids):
+        """Add many songs in one request; songs already in the playlist are skipped."""
+        rows = [{"playlist_id": playlist_id, "song_id": sid} for sid in dict.fromkeys(song_ids)]
+        if not rows:
+            return None
+        return supabase.table("playlist_songs") \
+            .upsert(rows, on_conflict="playlist_id,song_id", ignore_duplicates=True) \
+            .execute()
+
+    def remove_songs_from_playlist(self, playlist_id, song_ids):
+        """Remove many songs in one request."""
+        song_ids = list(dict.fromkeys(song_ids))
+        if not song_ids:
+            return None
+        return supabase.table("playlist_songs").delete().eq("playlist_id", playlist_id).in_("song_id", song_ids).execute()
+
     def list_songs_in_playlist(self, playlist_id):
         res = supabase.rpc("get_songs_in_playlist", {"playlist_uuid": playlist_id}).execute()
         return res.data if res and res.data else []
+
+    def get_song_positions(self, playlist_id):
+        """[{song_id, position}] in playlist order."""
+        res = supabase.table("playlist_songs").select("song_id, position") \
+            .eq("playlist_id", playlist_id).order("position").execute()
+        return res.data if res and res.data else []
+
+    def move_song(self, playlist_id, song_id, index, order=None):
+        """Move a song to 0-based index (clamped) by rewriting its position key alone.
+
+        order is the playlist's get_song_positions() result if the caller already has it.
+        Re-spaces the whole playlist when keys are missing, tied or too long.
+        Returns None if the song is not in the playlist.
+        """
+        if order is None:
+            order = self.get_song_positions(playlist_id)
+        if song_id not in [r["song_id"] for r in order]:
+            return None
+        rest = [r for r in order if r["song_id"] != song_id]
+        index = max(0, min(index, len(rest)))
+        before = rest[index - 1]["position"] if index > 0 else None
+        after = rest[index]["position"] if index < len(rest) else None
+        key = None
+        if not (index > 0 and before is None) and not (index < len(rest) and after is None):
+            try:
+                key = rank.key_between(before, after)
+            except ValueError:
+                key = None
+        if key is None or len(key) > rank.MAX_LENGTH:
+            ids = [r["song_id"] for r in rest]
+            return self.rebalance_positions(playlist_id, ids[:index] + [song_id] + ids[index:])
+        return supabase.table("playlist_songs").update({"position": key}) \
+            .eq("playlist_id", playlist_id).eq("song_id", song_id).execute()
+
+    def rebalance_positions(self, playlist_id, song_ids):
+        """Give song_ids evenly spaced keys in this order; returns the UnitOfWork report.
+
+        Each row is updated by key rather than upserted, so a song removed
+        meanwhile stays removed. Rare (keys only run out after many moves into one gap).
+        """
+        if not song_ids:
+            return None
+        uow = UnitOfWork()
+        for sid, key in zip(song_ids, rank.spread(len(song_ids))):
+            uow.update("playlist_songs", {"position": key}, playlist_id=playlist_id, song_id=sid)
+        return uow.flush()
@@ -0,0 +1,39 @@
+"""Column projections for DAO reads.
+
+Every DAO list/get method takes ``columns``: None keeps the method's
+historical column list, a name from PROJECTIONS ("summary", "detail", ...)
+picks a predefined set, and a list/tuple or comma-separated string is sent
+as-is. Asking only for rendered columns shrinks payloads and parse time.
+"""
+
+PROJECTIONS = {
+    "songs": {
+        "summary": "song_id, title",
+        "detail": "song_id, title, duration, artist_id, genre_id, created_at",
+    },
+    "playlists": {
+        "summary": "playlist_id, playlist_name, created_at",
+        "detail": "playlist_id, user_id, playlist_name, description, mood_id, created_at",
+    },
+    "moods": {
+        "summary": "mood_id, mood_name",
+        "detail": "mood_id, mood_name, description, created_at",
+    },
+    "users": {
+        "summary": "user_id, username, email, role",
+        "detail": "user_id, username, email, role, created_at",
+    },
+    "artists": {
+        "summary": "artist_id, name",
+        "detail": "artist_id, user_id, name, description, created_at",
+    },
+}
+
+
+def columns_for(table, columns=None, default="*"):
+    """Resolve a projection name, column list or column string to a select() string."""
+    if columns is None:
+        return default
+    if isinstance(columns, (list, tuple)):
+        return ", ".join(columns)
+    return PROJECTIONS.get(table, {}).get(columns, columns)
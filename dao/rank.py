@@ -0,0 +1,82 @@
+"""Fractional rank keys for ordering playlist_songs.position.
+
+A key is a base-62 fraction written without the leading "0." and without
+trailing zeros ("V" is 0.5), so plain string comparison (SQLite's BINARY
+collation, Postgres "C") sorts keys numerically. There is always room for a
+new key between two others, so placing a song writes only that song's row:
+
+    key_between("V", "W")   # "VV"
+    key_between(None, "V")  # before the first song
+    key_between("V", None)  # after the last song (same as key_after)
+
+Keys grow when songs are dropped into the same gap repeatedly. Once a key
+would exceed MAX_LENGTH the playlist is re-spaced with spread().
+key_after() mirrors rank_after() in sql/playlist_positions.sql, which
+the insert triggers use to append new songs.
+"""
+import math
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+FIRST = "V"
+APPEND_WIDTH = 3    # appends count up in the third digit: ~120k before a key grows
+MAX_LENGTH = 12     # longer keys trigger a rebalance
+
+
+def key_after(key):
+    """The next key after key at (at least) APPEND_WIDTH digits; FIRST for an empty playlist."""
+    if not key:
+        return FIRST
+    padded = key.ljust(max(len(key), APPEND_WIDTH), "0")
+    for i in range(len(padded) - 1, -1, -1):
+        d = DIGITS.index(padded[i])
+        if d < BASE - 1:
+            return padded[:i] + DIGITS[d + 1]
+    return key + FIRST
+
+
+def key_between(before, after):
+    """A key strictly between before and after; None stands for the start or end of the playlist.
+
+    Raises ValueError when before >= after (duplicate or unordered keys need a rebalance).
+    """
+    if after is None:
+        return key_after(before)
+    if before is not None and before >= after:
+        raise ValueError(f"rank keys out of order: {before!r} >= {after!r}")
+    return _midpoint(before or "", after)
+
+
+def _midpoint(a, b):
+    # a < b; b is None for the end of the range. Never returns a key ending in "0".
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    da = DIGITS.index(a[0]) if a else 0
+    db = DIGITS.index(b[0]) if b is not None else BASE
+    if db - da > 1:
+        return DIGITS[(da + db) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[da] + _midpoint(a[1:], None)
+
+
+def spread(n):
+    """n evenly spaced, ascending keys for re-spacing a playlist.
+
+    They fill the lower half of the key space, leaving the upper half for appends.
+    """
+    width = max(APPEND_WIDTH, math.ceil(math.log(4 * (n + 1), BASE)))
+    step = BASE ** width // 2 // (n + 1)
+    return [_digits((i + 1) * step, width) for i in range(n)]
+
+
+def _digits(value, width):
+    out = []
+    for _ in range(width):
+        value, d = divmod(value, BASE)
+        out.append(DIGITS[d])
+    return "".join(reversed(out)).rstrip("0")
@@ -1,15 +1,67 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
 
 class ReportDAO:
+    """Reports read the trigger-maintained aggregate tables (sql/report_aggregates.sql).
+
+    Where those tables are not installed, the counts fall back to the
+    full-scan RPCs.
+    """
+
     def count_users_by_role(self):
+        try:
+            res = supabase.table("role_user_counts").select("role, user_count").gt("user_count", 0).order("role").execute()
+            # the counters store a missing role as ''
+            return [{"role": r["role"] or None, "count": r["user_count"]} for r in res.data or []]
+        except Exception as e:
+            print(f"⚠️ Role counters unavailable, recounting: {e}")
         res = supabase.rpc("count_users_by_role").execute()
         return res.data if res and res.data else []
 
     def count_playlists_by_mood(self):
+        try:
+            res = supabase.table("mood_playlist_counts") \
+                .select("mood_id, playlist_count, moods(mood_name)") \
+                .gt("playlist_count", 0) \
+                .order("playlist_count", desc=True) \
+                .execute()
+            return [{"mood_id": r["mood_id"], "mood_name": (r.get("moods") or {}).get("mood_name"),
+                     "count": r["playlist_count"]} for r in res.data or []]
+        except Exception as e:
+            print(f"⚠️ Mood counters unavailable, recounting: {e}")
         res = supabase.rpc("count_playlists_by_mood").execute()
         return res.data if res and res.data else []
+
+    def get_playlist_stats(self, playlist_ids):
+        """{playlist_id: {"song_count", "total_duration"}} for the given playlists."""
+        playlist_ids = list(dict.fromkeys(playlist_ids))
+        if not playlist_ids:
+            return {}
+        try:
+            res = supabase.table("playlist_stats").select("playlist_id, song_count, total_duration") \
+                .in_("playlist_id", playlist_ids).execute()
+            return {r["playlist_id"]: {"song_count": r["song_count"], "total_duration": r["total_duration"]}
+                    for r in res.data or []}
+        except Exception as e:
+            print(f"❌ Error fetching playlist stats: {e}")
+            return {}
+
+    def largest_playlists(self, limit=10):
+        """Playlists with the most songs, with their total duration in seconds."""
+        try:
+            res = supabase.table("playlist_stats") \
+                .select("playlist_id, song_count, total_duration, playlists(playlist_name)") \
+                .order("song_count", desc=True) \
+                .limit(limit) \
+                .execute()
+            return [{"playlist_id": r["playlist_id"],
+                     "playlist_name": (r.get("playlists") or {}).get("playlist_name"),
+                     "song_count": r["song_count"], "total_duration": r["total_duration"]}
+                    for r in res.data or []]
+        except Exception as e:
+            print(f"❌ Error fetching largest playlists: {e}")
+            return []
+
+    def rebuild_aggregates(self):
+        """Recount every aggregate table from the base tables; returns [{"table", "rows"}]."""
+        res = supabase.rpc("rebuild_report_aggregates").execute()
+        return res.data if res and res.data else []
@@ -1,10 +1,8 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
 from datetime import datetime
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
+from dao.pagination import fetch_page, iter_pages
+from dao.projections import columns_for
+from config import PAGE_SIZE
 
 class SongDAO:
     def create_song(self, title, duration):
@@ -14,14 +12,26 @@ class SongDAO:
             "created_at": datetime.now().isoformat()
         }).execute()
 
-    def list_songs(self):
-        res = supabase.table("songs").select("*").execute()
+    def list_songs(self, columns=None):
+        res = supabase.table("songs").select(columns_for("songs", columns)).execute()
         return res.data if res and res.data else []
 
-    def list_songs_for_user(self, user_id):
-        res = supabase.table("songs").select("*").execute()
+    def list_songs_for_user(self, user_id, columns=None):
+        res = supabase.table("songs").select(columns_for("songs", columns)).execute()
         return res.data if res and res.data else []
 
+    def list_songs_page(self, after=None, limit=PAGE_SIZE, columns=None):
+        """One page of songs ordered by song_id; returns (rows, next_cursor)."""
+        return fetch_page("songs", "song_id", columns_for("songs", columns), after, limit)
+
+    def list_songs_for_user_page(self, user_id, after=None, limit=PAGE_SIZE, columns=None):
+        # the song catalog is shared, same as list_songs_for_user
+        return self.list_songs_page(after, limit, columns)
+
+    def iter_songs(self, page_size=PAGE_SIZE, columns=None):
+        """Yield the catalog one page at a time."""
+        return iter_pages("songs", "song_id", columns_for("songs", columns), page_size)
+
     def update_song(self, song_id, title=None, duration=None):
         data = {}
         if title: data["title"] = title
@@ -0,0 +1,224 @@
+"""Collect inserts, updates and deletes and flush them as few bulk requests as possible.
+
+    with UnitOfWork() as uow:
+        pid = uow.insert("playlists", {"playlist_id": new_id, "user_id": uid, "playlist_name": "Run"})
+        uow.add_songs_to_playlist(new_id, song_ids)
+        uow.update("playlists", {"mood_id": mood_id}, playlist_id=new_id)
+    print(uow.report)
+
+On flush, inserts are grouped per table into one bulk insert (or upsert).
+Updates that set the same values are merged into one request, and so are
+deletes, with an in_ filter on the column that differs. Inserts and updates
+run parents first (users -> ... -> playlist_songs) and deletes run children
+first. Operations are applied in that order, not in the order they were
+queued, so do not queue a delete and a re-insert of the same row in one unit;
+touched() reports which rows a unit writes, to tell when to start a new one.
+"""
+from database import supabase
+
+# parents before children (foreign-key dependency order)
+TABLE_ORDER = ["users", "artists", "moods", "songs", "playlists", "playlist_songs"]
+
+UPSERT_KEYS = {"playlist_songs": "playlist_id,song_id"}
+
+# columns that identify a returned row, used to hand results back to each operation
+KEY_COLUMNS = {
+    "users": ("user_id",),
+    "artists": ("artist_id",),
+    "moods": ("mood_id",),
+    "songs": ("song_id",),
+    "playlists": ("playlist_id",),
+    "playlist_songs": ("playlist_id", "song_id"),
+}
+
+# child column -> parent table
+FOREIGN_KEYS = {
+    "moods": {"user_id": "users"},
+    "songs": {"artist_id": "artists"},
+    "playlists": {"user_id": "users", "mood_id": "moods"},
+    "playlist_songs": {"playlist_id": "playlists", "song_id": "songs"},
+}
+
+
+def _rank(table):
+    return TABLE_ORDER.index(table) if table in TABLE_ORDER else len(TABLE_ORDER)
+
+
+def _freeze(d):
+    return tuple(sorted(d.items()))
+
+
+class UnitOfWork:
+    def __init__(self):
+        self._ops = []
+        self.report = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def __len__(self):
+        return len(self._ops)
+
+    # ---- queueing (each returns the operation's index in the report) ----
+    def _queue(self, op):
+        op["index"] = len(self._ops)
+        self._ops.append(op)
+        return op["index"]
+
+    def insert(self, table, row):
+        return self._queue({"kind": "insert", "table": table, "row": dict(row), "upsert": None})
+
+    def upsert(self, table, row, on_conflict=None, ignore_duplicates=False):
+        return self._queue({"kind": "insert", "table": table, "row": dict(row),
+                            "upsert": (on_conflict or UPSERT_KEYS.get(table), ignore_duplicates)})
+
+    def update(self, table, values, **match):
+        if not match:
+            raise ValueError("update needs at least one filter column")
+        return self._queue({"kind": "update", "table": table, "values": dict(values), "match": match})
+
+    def delete(self, table, **match):
+        if not match:
+            raise ValueError("delete needs at least one filter column")
+        return self._queue({"kind": "delete", "table": table, "match": match})
+
+    def add_songs_to_playlist(self, playlist_id, song_ids):
+        """Queue playlist_songs rows; duplicates already in the playlist are ignored."""
+        return [self.upsert("playlist_songs", {"playlist_id": playlist_id, "song_id": sid}, ignore_duplicates=True)
+                for sid in dict.fromkeys(song_ids)]
+
+    def remove_songs_from_playlist(self, playlist_id, song_ids):
+        return [self.delete("playlist_songs", playlist_id=playlist_id, song_id=sid)
+                for sid in dict.fromkeys(song_ids)]
+
+    def touched(self):
+        """Rows the queued operations write, and parent rows they reference.
+
+        Returns (writes, refs), each a set of (table, key) where key is a tuple
+        of key-column values as strings. An update or delete that does not
+        filter on the whole key may hit any row, and is recorded as (table, None).
+        """
+        writes, refs = set(), set()
+        for op in self._ops:
+            fields = op["row"] if op["kind"] == "insert" else op["match"]
+            columns = KEY_COLUMNS.get(op["table"], ())
+            key = tuple(str(fields[c]) for c in columns) if columns and all(c in fields for c in columns) else None
+            writes.add((op["table"], key))
+            if op["kind"] == "update":
+                fields = {**fields, **op["values"]}
+            for column, parent in FOREIGN_KEYS.get(op["table"], {}).items():
+                if fields.get(column) is not None:
+                    refs.add((parent, (str(fields[column]),)))
+        return writes, refs
+
+    # ---- flushing ----
+    def _plan(self, skip=()):
+        """Return batches: (kind, table, ops) in execution order."""
+        inserts, updates, deletes = {}, {}, {}
+        for op in self._ops:
+            if op["index"] in skip:
+                continue
+            if op["kind"] == "insert":
+                key = (op["table"], op["upsert"], tuple(sorted(op["row"])))
+                inserts.setdefault(key, []).append(op)
+            elif op["kind"] == "update":
+                key = (op["table"], _freeze(op["values"]), tuple(sorted(op["match"])))
+                updates.setdefault(key, []).append(op)
+            else:
+                key = (op["table"], tuple(sorted(op["match"])))
+                deletes.setdefault(key, []).append(op)
+
+        batches = []
+        for groups, kind, reverse in ((inserts, "insert", False), (updates, "update", False), (deletes, "delete", True)):
+            for key in sorted(groups, key=lambda k: _rank(k[0]), reverse=reverse):
+                ops = groups[key]
+                if kind == "insert":
+                    batches.append((kind, key[0], ops))
+                else:
+                    batches.extend((kind, key[0], chunk) for chunk in self._merge_filters(ops))
+        return batches
+
+    @staticmethod
+    def _merge_filters(ops):
+        """Split same-shaped update/delete ops into chunks expressible as eq(...) + one in_()."""
+        columns = list(ops[0]["match"])
+        fixed = [c for c in columns if len({op["match"][c] for op in ops}) == 1]
+        varying = [c for c in columns if c not in fixed]
+        if len(varying) <= 1:
+            return [ops]
+        # more than one column differs: fall back to grouping on all but the last one
+        chunks = {}
+        for op in ops:
+            chunks.setdefault(tuple(op["match"][c] for c in varying[:-1]), []).append(op)
+        return list(chunks.values())
+
+    @staticmethod
+    def _filtered(query, ops):
+        match = ops[0]["match"]
+        for column in match:
+            values = list(dict.fromkeys(op["match"][column] for op in ops))
+            query = query.eq(column, values[0]) if len(values) == 1 else query.in_(column, values)
+        return query
+
+    @staticmethod
+    def _by_key(data, ops, columns):
+        """Rows per op, matched on ``columns`` with one pass over the response."""
+        index = {}
+        for row in data:
+            index.setdefault(tuple(str(row.get(c)) for c in columns), []).append(row)
+        return [index.get(tuple(str(op[1].get(c)) for c in columns), []) for op in ops]
+
+    def _execute(self, kind, table, ops):
+        if kind == "insert":
+            rows = [op["row"] for op in ops]
+            if ops[0]["upsert"]:
+                on_conflict, ignore = ops[0]["upsert"]
+                res = supabase.table(table).upsert(rows, on_conflict=on_conflict, ignore_duplicates=ignore).execute()
+            else:
+                res = supabase.table(table).insert(rows).execute()
+            data = res.data or []
+            if not ops[0]["upsert"] and len(data) == len(ops):
+                return [[row] for row in data]
+            key = [c for c in KEY_COLUMNS.get(table, ()) if c in rows[0]] or list(rows[0])
+            return self._by_key(data, [(op, op["row"]) for op in ops], key)
+
+        if kind == "update":
+            query = supabase.table(table).update(ops[0]["values"])
+        else:
+            query = supabase.table(table).delete()
+        data = self._filtered(query, ops).execute().data or []
+        return self._by_key(data, [(op, op["match"]) for op in ops], list(ops[0]["match"]))
+
+    def flush(self, landed=None):
+        """Apply every queued operation; returns and stores a report with one result per operation.
+
+        landed maps operation indexes to results from an earlier flush that
+        already applied them (a failed batch being replayed); those are
+        reported as given and not sent again.
+        """
+        landed = landed or {}
+        results = [landed.get(i) for i in range(len(self._ops))]
+        requests = 0
+        for kind, table, ops in self._plan(skip=landed):
+            requests += 1
+            try:
+                per_op_rows = self._execute(kind, table, ops)
+                for op, rows in zip(ops, per_op_rows):
+                    results[op["index"]] = {"kind": kind, "table": table, "ok": True, "rows": rows, "error": None}
+            except Exception as e:
+                print(f"❌ Unit of work {kind} on {table} failed: {e}")
+                for op in ops:
+                    results[op["index"]] = {"kind": kind, "table": table, "ok": False, "rows": [], "error": str(e)}
+        self._ops = []
+        self.report = {
+            "operations": len(results),
+            "requests": requests,
+            "failed": sum(1 for r in results if not r["ok"]),
+            "results": results,
+        }
+        return self.report
@@ -1,9 +1,7 @@
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database import supabase
+from dao.pagination import fetch_page, iter_pages
+from dao.projections import columns_for
+from config import PAGE_SIZE
 
 class UserDAO:
     def create_user(self, username, email, password_hash, role="User"):
@@ -14,10 +12,38 @@ class UserDAO:
             "role": role
         }).execute()
 
-    def list_all_users(self):
-        res = supabase.table("users").select("*").execute()
+    def sync_profile(self, user_id, email):
+        """Ensure a users row for a signed-in auth user and return it (with role) in one round trip.
+
+        Returns None when the call fails, e.g. sql/sync_user_profile.sql is not deployed yet.
+        """
+        try:
+            res = supabase.rpc("sync_user_profile", {"p_user_id": user_id, "p_email": email}).execute()
+        except Exception as e:
+            print(f"⚠️ sync_user_profile unavailable: {e}")
+            return None
+        data = res.data
+        if isinstance(data, list):
+            data = data[0] if data else None
+        return data or None
+
+    def list_all_users(self, columns=None):
+        res = supabase.table("users").select(columns_for("users", columns)).execute()
         return res.data if res and res.data else []
 
+    def get_users_by_ids(self, user_ids, columns=None):
+        if not user_ids:
+            return []
+        res = supabase.table("users").select(columns_for("users", columns)).in_("user_id", list(user_ids)).execute()
+        return res.data if res and res.data else []
+
+    def list_users_page(self, after=None, limit=PAGE_SIZE, columns=None):
+        """One page of users ordered by user_id; returns (rows, next_cursor)."""
+        return fetch_page("users", "user_id", columns_for("users", columns), after, limit)
+
+    def iter_users(self, page_size=PAGE_SIZE, columns=None):
+        return iter_pages("users", "user_id", columns_for("users", columns), page_size)
+
     def update_user(self, user_id, username, email, role):
         return supabase.table("users").update({
             "username": username,
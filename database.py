@@ -1,4 +1,95 @@
-from supabase import create_client
-from config import SUPABASE_URL, SUPABASE_KEY
+import threading
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+from config import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_POOL_SIZE,
+    SUPABASE_KEEPALIVE_EXPIRY,
+    SUPABASE_TIMEOUT,
+    SUPABASE_CONNECT_TIMEOUT,
+    STORAGE_BACKEND,
+    SQLITE_PATH,
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_http_client():
+    """One keep-alive httpx pool, so TLS handshakes are paid once per process."""
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_POOL_SIZE,
+            max_keepalive_connections=SUPABASE_POOL_SIZE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+    )
+
+
+def _create_supabase_client():
+    from supabase import create_client, ClientOptions
+
+    fields = getattr(ClientOptions, "__dataclass_fields__", {})
+    opts = {"postgrest_client_timeout": SUPABASE_TIMEOUT}
+    if "httpx_client" in fields:
+        # supabase-py >= 2.x accepts an injected httpx client for every sub-client
+        opts["httpx_client"] = _build_http_client()
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(**opts))
+
+
+def _create_client():
+    if STORAGE_BACKEND == "sqlite":
+        from sqlite_backend import SQLiteClient
+        return SQLiteClient(SQLITE_PATH)
+    if STORAGE_BACKEND != "supabase":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND!r}")
+    return _create_supabase_client()
+
+
+def get_client():
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+def set_client(client):
+    """Install a specific backend client (e.g. a SQLiteClient for benchmarks)."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def reset_client():
+    """Drop the shared client (e.g. after changing env settings in tests/scripts)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+_query_wrapper = None
+
+
+def set_query_wrapper(wrapper):
+    """Pass table()/from_()/rpc() through wrapper(factory, name) (see instrumentation.py); None removes it."""
+    global _query_wrapper
+    _query_wrapper = wrapper
+
+
+class _LazyClient:
+    """Stand-in for the shared client; nothing is built until an attribute is used."""
+
+    def __getattr__(self, name):
+        attr = getattr(get_client(), name)
+        if _query_wrapper is not None and name in ("table", "from_", "rpc"):
+            return _query_wrapper(attr, name)
+        return attr
+
+
+supabase = _LazyClient()
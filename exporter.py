@@ -0,0 +1,187 @@
+"""Streaming export of moods, playlists, playlist memberships and songs.
+
+    python exporter.py backup/ --format jsonl                # whole database
+    python exporter.py backup/ --format parquet --user <id>  # one user's library
+
+Every table is read with keyset pagination and written page by page, so
+memory stays flat however large the library is. The one exception is a user
+export of songs: the IDs of the songs that user's playlists reference are held
+in a set (about 100 bytes each) to fetch them without duplicates. One file per
+table is written to the output directory, plus a manifest.json with row counts
+and the scope. User scope covers the user's moods and playlists, their
+memberships, and the songs those playlists reference. Parquet needs pyarrow
+installed.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from config import IN_FILTER_BATCH, PAGE_SIZE
+from database import supabase
+from dao.pagination import iter_pages, iter_pages_composite, iter_playlist_songs
+
+EXPORT_TABLES = ("moods", "playlists", "playlist_songs", "songs")
+
+# table -> (keyset column, exported columns)
+EXPORT_COLUMNS = {
+    "moods": ("mood_id", ["mood_id", "user_id", "mood_name", "description", "created_at"]),
+    "playlists": ("playlist_id", ["playlist_id", "user_id", "playlist_name", "description", "mood_id", "created_at"]),
+    "playlist_songs": (("playlist_id", "song_id"), ["playlist_id", "song_id", "added_at", "position"]),
+    "songs": ("song_id", ["song_id", "title", "duration", "artist_id", "genre_id", "created_at"]),
+}
+INTEGER_COLUMNS = {"duration"}
+FORMATS = ("jsonl", "csv", "parquet")
+
+
+class _JsonlWriter:
+    def __init__(self, path, columns):
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        self._f.writelines(json.dumps(row, default=str) + "\n" for row in rows)
+
+    def close(self):
+        self._f.close()
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=columns, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._f.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(c, pa.int64() if c in INTEGER_COLUMNS else pa.string()) for c in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        arrays = {}
+        for c in self._columns:
+            if c in INTEGER_COLUMNS:
+                arrays[c] = [None if r.get(c) is None else int(r[c]) for r in rows]
+            else:
+                arrays[c] = [None if r.get(c) is None else str(r[c]) for r in rows]
+        self._writer.write_table(self._pa.Table.from_pydict(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {"jsonl": _JsonlWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+
+def _user_filters(table, user_id):
+    return [("user_id", user_id)] if user_id and table in ("moods", "playlists") else []
+
+
+def _membership_pages(user_id, page_size):
+    """playlist_songs pages on the (playlist_id, song_id) index.
+
+    The whole database is one keyset walk; a user's memberships are walked one
+    page of their playlists at a time, so requests scale with pages, not playlists.
+    """
+    (outer, inner), columns = EXPORT_COLUMNS["playlist_songs"]
+    columns = ", ".join(columns)
+    if not user_id:
+        return iter_pages_composite("playlist_songs", outer, inner, columns, page_size)
+    return iter_playlist_songs(_user_filters("playlists", user_id), columns, page_size)
+
+
+def _song_pages_by_id(song_ids):
+    """Songs by ID, IN_FILTER_BATCH IDs per request to keep the URL short."""
+    song_ids = sorted(song_ids)
+    columns = ", ".join(EXPORT_COLUMNS["songs"][1])
+    for i in range(0, len(song_ids), IN_FILTER_BATCH):
+        res = supabase.table("songs").select(columns).in_("song_id", song_ids[i:i + IN_FILTER_BATCH]).execute()
+        if res and res.data:
+            yield res.data
+
+
+def iter_export_pages(table, user_id=None, page_size=PAGE_SIZE, referenced_songs=None):
+    """Yield pages of ``table`` rows for the given scope (user_id None = whole database).
+
+    In user scope, songs are the ones collected in ``referenced_songs`` while
+    exporting playlist_songs.
+    """
+    key, columns = EXPORT_COLUMNS[table]
+    if table == "playlist_songs":
+        return _membership_pages(user_id, page_size)
+    if table == "songs" and user_id:
+        return _song_pages_by_id(referenced_songs or ())
+    return iter_pages(table, key, ", ".join(columns), page_size, _user_filters(table, user_id))
+
+
+def export_library(out_dir, fmt="jsonl", user_id=None, tables=EXPORT_TABLES, page_size=PAGE_SIZE, out=sys.stdout):
+    """Write one file per table into out_dir; returns {table: rows written}."""
+    if fmt not in WRITERS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    referenced_songs = set()
+    if user_id and "songs" in tables and "playlist_songs" not in tables:
+        # a user's songs are the ones their playlists reference
+        for page in _membership_pages(user_id, page_size):
+            referenced_songs.update(r["song_id"] for r in page)
+    # memberships before songs, so a user export knows which songs to include
+    for table in sorted(tables, key=EXPORT_TABLES.index):
+        columns = EXPORT_COLUMNS[table][1]
+        path = os.path.join(out_dir, f"{table}.{fmt}")
+        writer = WRITERS[fmt](path, columns)
+        counts[table] = 0
+        try:
+            for page in iter_export_pages(table, user_id, page_size, referenced_songs):
+                writer.write(page)
+                counts[table] += len(page)
+                if table == "playlist_songs" and user_id:
+                    referenced_songs.update(r["song_id"] for r in page)
+        finally:
+            writer.close()
+        print(f"{table}: {counts[table]} rows -> {path}", file=out)
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "scope": {"user_id": user_id} if user_id else "all",
+            "format": fmt,
+            "counts": counts,
+        }, f, indent=2)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the playlist library to JSONL, CSV or Parquet.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--user", help="export only this user's library (default: whole database)")
+    parser.add_argument("--tables", nargs="+", choices=EXPORT_TABLES, default=list(EXPORT_TABLES))
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args(argv)
+    try:
+        counts = export_library(args.out_dir, args.format, args.user, args.tables, args.page_size)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Export failed: {e}")
+        return 1
+    print(f"✅ Exported {sum(counts.values())} rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
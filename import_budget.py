@@ -0,0 +1,105 @@
+"""Cold-start import budget for the CLI and app entry points.
+
+    python import_budget.py                  # exit 1 if a budget is exceeded
+    python import_budget.py --budget cli=80 --runs 9
+
+Each entry module is imported in a fresh interpreter under ``-X importtime``
+and its cumulative import time (median of --runs) is compared with its
+budget. The check also fails if a module that should load on first use
+(see lazy.py) is imported at startup. The app is timed after streamlit
+itself is imported, since the framework's own cost is not ours to cut.
+
+Budgets are wall-clock and machine-dependent; the defaults leave headroom on
+a typical laptop. Tighten them with --budget in CI.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BUDGETS_MS = {"cli": 150, "app": 250}
+PRELOAD = {"app": "streamlit"}
+# must not be imported just to show the CLI menu or the login page
+DEFERRED = (
+    "numpy", "pandas", "pyarrow", "supabase", "httpx",
+    "dao.user_dao", "dao.playlist_dao", "dao.mood_dao", "dao.song_dao", "dao.artist_dao",
+    "dao.playlist_song_dao", "dao.report_dao", "dao.fan_out", "dao.unit_of_work",
+    "recommender", "playlist_generator", "rollups", "exporter", "importer",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module):
+    """(cumulative ms, modules imported under it) for one cold import of module."""
+    code = (f"import {PRELOAD[module]}; " if module in PRELOAD else "") + f"import {module}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True,
+                          text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    subtree = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        _, cumulative, indent, name = m.groups()
+        if len(indent) == 1:  # a top-level import closes its subtree
+            if name == module:
+                return int(cumulative) / 1000, subtree
+            subtree = []
+        else:
+            subtree.append(name)
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def check(budgets, runs):
+    failures = []
+    print(f"{'module':<8} {'median ms':>10} {'budget ms':>10}")
+    for module, budget in budgets.items():
+        samples, loaded = [], set()
+        for _ in range(runs):
+            ms, subtree = measure(module)
+            samples.append(ms)
+            loaded.update(subtree)
+        median = statistics.median(samples)
+        early = sorted(n for n in loaded if n in DEFERRED)
+        print(f"{module:<8} {median:>10.1f} {budget:>10}")
+        if median > budget:
+            failures.append(f"{module}: {median:.1f} ms > {budget} ms")
+        if early:
+            failures.append(f"{module}: imports {', '.join(early)} at startup")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if cli.py/app.py cold-start imports exceed their budget.")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help=f"override a budget (defaults: {BUDGETS_MS})")
+    parser.add_argument("--runs", type=int, default=5, help="cold imports per module; the median is used")
+    parser.add_argument("--only", choices=BUDGETS_MS, nargs="+", help="check only these entry points")
+    args = parser.parse_args(argv)
+
+    budgets = {m: b for m, b in BUDGETS_MS.items() if not args.only or m in args.only}
+    for item in args.budget:
+        module, _, ms = item.partition("=")
+        if module not in BUDGETS_MS or not ms:
+            parser.error(f"bad --budget {item!r}")
+        if module in budgets:  # an override doesn't bring back a module --only left out
+            budgets[module] = float(ms)
+
+    try:
+        failures = check(budgets, args.runs)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Within budget.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
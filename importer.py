@@ -0,0 +1,326 @@
+"""Streaming bulk import of artists, moods, songs and playlists from CSV or JSONL.
+
+    python importer.py songs catalog.csv --user <user_id>
+    python importer.py playlists playlists.jsonl --user <user_id> --resume
+
+The input is read in fixed-size chunks, so memory stays flat however large
+the file is. Each row is validated and normalized, artist and mood names are
+resolved to IDs through an in-memory map (missing ones are created), and each
+chunk is written as a handful of bulk upserts via UnitOfWork. Playlist rows
+that name songs which do not exist are rejected (one lookup per chunk) rather
+than failing the chunk's write.
+
+Row keys are derived from natural keys (song title + artist + duration, artist
+or mood name per user, playlist name per user), so re-running a chunk never
+duplicates data. After every committed chunk a checkpoint file records how
+many input rows are done; --resume continues from there.
+
+Accepted columns (CSV headers or JSON keys):
+    artists:   name, description
+    moods:     mood_name (or name), description
+    songs:     title, duration (seconds or m:ss), artist (name) or artist_id, genre_id
+    playlists: playlist_name (or name), description, mood (name) or mood_id,
+               songs (song IDs; a JSON list or "|"-separated in CSV)
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from config import IMPORT_CHUNK_SIZE, IN_FILTER_BATCH
+from database import supabase
+from dao.pagination import iter_pages
+from dao.unit_of_work import UnitOfWork
+
+# fixed so the same natural key always maps to the same row ID
+ID_NAMESPACE = uuid.UUID("e38d4ad3-7891-4830-b5a8-80ce71bc3b10")
+
+MAX_DURATION = 24 * 3600
+KINDS = ("artists", "moods", "songs", "playlists")
+
+
+def _clean(value):
+    """Trim and collapse whitespace; empty strings become None."""
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value or None
+
+
+def parse_duration(value):
+    """Seconds as int from 215, "215", "3:35" or "1:02:03"; None when blank."""
+    value = _clean(value)
+    if value is None:
+        return None
+    try:
+        if ":" in value:
+            seconds = 0
+            for part in value.split(":"):
+                seconds = seconds * 60 + int(part)
+        else:
+            seconds = int(round(float(value)))
+    except ValueError:
+        raise ValueError(f"bad duration {value!r}")
+    if not 0 <= seconds <= MAX_DURATION:
+        raise ValueError(f"duration out of range: {seconds}")
+    return seconds
+
+
+def _song_ids(raw):
+    songs = raw.get("songs") or []
+    if isinstance(songs, str):
+        songs = songs.split("|")
+    return list(dict.fromkeys(s for s in (_clean(s) for s in songs) if s))
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _natural_id(*parts):
+    return str(uuid.uuid5(ID_NAMESPACE, "\x1f".join(str(p or "").lower() for p in parts)))
+
+
+def read_rows(path, fmt=None):
+    """Yield dict rows from a CSV or JSONL file, one at a time."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield {"__error__": f"invalid JSON: {e}"}
+                        continue
+                    if isinstance(record, dict):
+                        yield record
+                    else:
+                        yield {"__error__": f"expected a JSON object, got {type(record).__name__}"}
+
+
+class Importer:
+    def __init__(self, kind, user_id=None, chunk_size=IMPORT_CHUNK_SIZE):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        self.kind = kind
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self._maps = {}
+        self._known_songs = set()
+
+    # ---- name -> id maps ----
+    def _name_map(self, table):
+        """Lower-cased name -> id for the user's artists or moods, loaded once."""
+        if table not in self._maps:
+            key, name_col = ("artist_id", "name") if table == "artists" else ("mood_id", "mood_name")
+            filters = [("user_id", self.user_id)] if self.user_id else []
+            names = {}
+            for page in iter_pages(table, key, f"{key}, {name_col}", filters=filters):
+                for row in page:
+                    if row.get(name_col):
+                        names.setdefault(row[name_col].lower(), row[key])
+            self._maps[table] = names
+        return self._maps[table]
+
+    def _resolve(self, uow, table, name, description=None):
+        """ID for an artist or mood name, queuing an insert when it does not exist yet."""
+        names = self._name_map(table)
+        found = names.get(name.lower())
+        if found:
+            return found
+        new_id = _natural_id(table, self.user_id, name)
+        if table == "artists":
+            row = {"artist_id": new_id, "user_id": self.user_id, "name": name}
+        else:
+            row = {"mood_id": new_id, "user_id": self.user_id, "mood_name": name}
+        row.update(description=description or "", created_at=self._now)
+        uow.upsert(table, row, ignore_duplicates=True)
+        names[name.lower()] = new_id
+        return new_id
+
+    # ---- per-kind row handling ----
+    def _artist(self, raw, uow):
+        name = _clean(raw.get("name"))
+        if not name:
+            raise ValueError("name is required")
+        # an existing artist of the same name is kept as-is
+        self._resolve(uow, "artists", name, _clean(raw.get("description")))
+
+    def _mood(self, raw, uow):
+        name = _clean(raw.get("mood_name") or raw.get("name"))
+        if not name:
+            raise ValueError("mood_name is required")
+        self._resolve(uow, "moods", name, _clean(raw.get("description")))
+
+    def _song(self, raw, uow):
+        title = _clean(raw.get("title"))
+        if not title:
+            raise ValueError("title is required")
+        duration = parse_duration(raw.get("duration"))
+        artist_id = _clean(raw.get("artist_id"))
+        artist = _clean(raw.get("artist"))
+        if artist and not artist_id:
+            artist_id = self._resolve(uow, "artists", artist)
+        uow.upsert("songs", {
+            "song_id": _natural_id("songs", title, artist_id, duration),
+            "title": title,
+            "duration": duration,
+            "artist_id": artist_id,
+            "genre_id": _clean(raw.get("genre_id")),
+            "created_at": self._now,
+        }, ignore_duplicates=True)
+
+    def _playlist(self, raw, uow):
+        if not self.user_id:
+            raise ValueError("playlists need --user")
+        name = _clean(raw.get("playlist_name") or raw.get("name"))
+        if not name:
+            raise ValueError("playlist_name is required")
+        song_ids = _song_ids(raw)
+        unknown = [s for s in song_ids if s not in self._known_songs]
+        if unknown:
+            # one bad ID would otherwise fail the chunk's bulk insert on the playlist_songs FK
+            raise ValueError(f"unknown song IDs: {', '.join(unknown[:5])}{' …' if len(unknown) > 5 else ''}")
+        mood_id = _clean(raw.get("mood_id"))
+        mood = _clean(raw.get("mood"))
+        if mood and not mood_id:
+            mood_id = self._resolve(uow, "moods", mood)
+        playlist_id = _natural_id("playlists", self.user_id, name)
+        uow.upsert("playlists", {
+            "playlist_id": playlist_id,
+            "user_id": self.user_id,
+            "playlist_name": name,
+            "description": _clean(raw.get("description")) or "",
+            "mood_id": mood_id,
+            "created_at": self._now,
+        }, ignore_duplicates=True)
+        uow.add_songs_to_playlist(playlist_id, song_ids)
+
+    def _load_known_songs(self, rows):
+        """The chunk's referenced song IDs that exist, one query per IN_FILTER_BATCH IDs."""
+        wanted = set()
+        for raw in rows:
+            if "__error__" not in raw:
+                wanted.update(s for s in _song_ids(raw) if _is_uuid(s))
+        wanted = sorted(wanted)
+        known = set()
+        for i in range(0, len(wanted), IN_FILTER_BATCH):
+            res = supabase.table("songs").select("song_id").in_("song_id", wanted[i:i + IN_FILTER_BATCH]).execute()
+            known.update(r["song_id"] for r in res.data or [])
+        self._known_songs = known
+
+    # ---- driving ----
+    def import_chunk(self, rows):
+        """Validate and write one chunk; returns (imported, rejects) where rejects are (row, error)."""
+        self._now = datetime.now(timezone.utc).isoformat()
+        handler = getattr(self, "_" + self.kind[:-1])
+        if self.kind == "playlists":
+            self._load_known_songs(rows)
+        uow = UnitOfWork()
+        imported, rejects = 0, []
+        for raw in rows:
+            if "__error__" in raw:
+                rejects.append((raw, raw["__error__"]))
+                continue
+            try:
+                handler(raw, uow)
+                imported += 1
+            except ValueError as e:
+                rejects.append((raw, str(e)))
+        if len(uow):
+            report = uow.flush()
+            if report["failed"]:
+                errors = {r["error"] for r in report["results"] if not r["ok"]}
+                # names queued in this chunk may not exist; reload the maps on the next attempt
+                self._maps.clear()
+                raise RuntimeError(f"chunk write failed: {'; '.join(sorted(errors))}")
+        return imported, rejects
+
+    def run(self, path, fmt=None, checkpoint_path=None, resume=False, rejects_path=None, out=sys.stdout):
+        checkpoint_path = checkpoint_path or path + ".checkpoint.json"
+        state = {"kind": self.kind, "path": os.path.abspath(path), "rows_done": 0,
+                 "imported": 0, "rejected": 0, "finished": False}
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                saved = json.load(f)
+            if saved.get("kind") == self.kind and saved.get("path") == state["path"]:
+                state = saved
+                if state.get("finished"):
+                    print(f"Nothing to do: {path} was fully imported.", file=out)
+                    return state
+                print(f"Resuming after row {state['rows_done']}.", file=out)
+
+        rows = itertools.islice(read_rows(path, fmt), state["rows_done"], None)
+        rejects_file = open(rejects_path, "a", encoding="utf-8") if rejects_path else None
+        started, done_this_run = time.perf_counter(), 0
+        try:
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                imported, rejects = self.import_chunk(chunk)
+                for raw, error in rejects:
+                    if rejects_file:
+                        rejects_file.write(json.dumps({"row": raw, "error": error}, default=str) + "\n")
+                    elif state["rejected"] < 5:
+                        print(f"  rejected row: {error}", file=out)
+                    state["rejected"] += 1
+                state["rows_done"] += len(chunk)
+                state["imported"] += imported
+                _save_checkpoint(checkpoint_path, state)
+                done_this_run += len(chunk)
+                rate = done_this_run / max(time.perf_counter() - started, 1e-9)
+                print(f"{state['rows_done']} rows ({state['imported']} imported, "
+                      f"{state['rejected']} rejected) — {rate:,.0f} rows/s", file=out)
+        finally:
+            if rejects_file:
+                rejects_file.close()
+        state["finished"] = True
+        _save_checkpoint(checkpoint_path, state)
+        return state
+
+
+def _save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import CSV/JSONL into the playlist manager.")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path")
+    parser.add_argument("--user", help="owning user_id (required for playlists; scopes artist/mood names)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", help="default: <path>.checkpoint.json")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    parser.add_argument("--rejects", help="append rejected rows as JSONL to this file")
+    args = parser.parse_args(argv)
+
+    importer = Importer(args.kind, args.user, args.chunk_size)
+    try:
+        state = importer.run(args.path, args.format, args.checkpoint, args.resume, args.rejects)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Import stopped: {e} (re-run with --resume to continue)")
+        return 1
+    print(f"✅ Done: {state['imported']} imported, {state['rejected']} rejected.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Per-call timing for DAO methods and raw queries.
+
+    import instrumentation
+    instrumentation.install()                       # once per process
+    with instrumentation.collect("Playlists") as scope:
+        ...                                         # render a page / run a command
+    scope.records, instrumentation.summary()
+
+install() wraps every public method of the DAO classes and every builder
+returned by ``supabase.table()/from_()/rpc()`` (see database.set_query_wrapper),
+so each ``execute()`` is one "query" record and each DAO call one "dao"
+record. Records carry wall time, rows, payload bytes (size of the JSON-encoded
+response), retries and errors. They go to the current scope, which carries
+the caller page, and to a bounded process-wide log used for summary().
+Scopes are context variables. asyncio.to_thread and dao.fan_out.run_async
+carry them into the threads they use; plain threads and executor pools do
+not, so code that hands work to a pool inside a scope must submit it through
+contextvars.copy_context().run (as commands.BatchRunner and local_model do)
+for that work to report to the scope.
+Nothing is recorded until install() is called.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+LOG_SIZE = 10000
+
+_enabled = False
+_log = deque(maxlen=LOG_SIZE)
+_log_lock = threading.Lock()
+
+
+class Scope:
+    """Records made while rendering one page (or one CLI command)."""
+
+    def __init__(self, page):
+        self.page = page
+        self.records = []
+        self.started = time.perf_counter()
+
+    def totals(self):
+        queries = [r for r in self.records if r["kind"] == "query"]
+        return {
+            "page": self.page,
+            "round_trips": len(queries),
+            "query_ms": round(sum(r["ms"] for r in queries), 1),
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "rows": sum(r["rows"] for r in queries),
+            "bytes": sum(r["bytes"] for r in queries),
+            "errors": sum(1 for r in self.records if r["error"]),
+        }
+
+
+_scope = contextvars.ContextVar("instrumentation_scope", default=None)
+
+
+def current_scope():
+    return _scope.get()
+
+
+@contextmanager
+def collect(page):
+    """Open a scope for ``page``; every record made inside it is also added to scope.records."""
+    scope = Scope(page)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def within(scope):
+    """Re-enter an existing scope, e.g. from a task running on another thread."""
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def enabled():
+    return _enabled
+
+
+def _rows_of(result):
+    data = getattr(result, "data", result)
+    if inspect.isgenerator(data):
+        return 0  # lazy iterators: their pages are counted by the queries behind them
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, tuple) and data and isinstance(data[0], list):
+        return len(data[0])  # (rows, next_cursor) from the paged list APIs
+    return 0 if data is None else 1
+
+
+def _bytes_of(result):
+    data = getattr(result, "data", None)
+    if data is None:
+        return 0
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def record(kind, name, ms=0.0, rows=0, nbytes=0, retries=0, error=None):
+    """Add one record to the current scope and the process-wide log."""
+    if not _enabled:
+        return
+    scope = _scope.get()
+    entry = {
+        "kind": kind,
+        "name": name,
+        "ms": round(ms, 2),
+        "rows": rows,
+        "bytes": nbytes,
+        "retries": retries,
+        "error": error,
+        "page": scope.page if scope else None,
+    }
+    if scope is not None:
+        scope.records.append(entry)
+    with _log_lock:
+        _log.append(entry)
+
+
+def timed(kind, name, fn, *args, **kwargs):
+    """Call fn and record its wall time, rows and (for queries) payload size."""
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        record(kind, name, (time.perf_counter() - start) * 1000, error=f"{type(e).__name__}: {e}")
+        raise
+    ms = (time.perf_counter() - start) * 1000
+    record(kind, name, ms, _rows_of(result), _bytes_of(result) if kind == "query" else 0)
+    return result
+
+
+# ---- raw query builders ----
+class _QueryProxy:
+    """Follows a builder chain, remembering the table/function, and times execute()."""
+
+    def __init__(self, builder, name):
+        self._builder = builder
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._builder, attr)
+        if attr == "execute":
+            return functools.partial(timed, "query", self._name, value)
+        if not callable(value):
+            return value
+
+        def chain(*args, **kwargs):
+            result = value(*args, **kwargs)
+            # builders return themselves or a new builder; keep wrapping those
+            return _QueryProxy(result, self._name) if hasattr(result, "execute") else result
+        return chain
+
+
+def _query_wrapper(factory, kind):
+    def make(name, *args, **kwargs):
+        label = f"rpc:{name}" if kind == "rpc" else name
+        return _QueryProxy(factory(name, *args, **kwargs), label)
+    return make
+
+
+# ---- DAO classes ----
+def instrument_class(cls):
+    """Wrap cls's public methods in place (idempotent)."""
+    for attr, fn in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(fn) or getattr(fn, "_instrumented", False):
+            continue
+
+        def make(fn=fn, label=f"{cls.__name__}.{attr}"):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return timed("dao", label, fn, *args, **kwargs)
+            wrapper._instrumented = True
+            return wrapper
+        setattr(cls, attr, make())
+    return cls
+
+
+def install():
+    """Start recording: wrap the DAO classes and route raw queries through the timer."""
+    global _enabled
+    if _enabled:
+        return
+    import database
+    from dao.artist_dao import ArtistDAO
+    from dao.mood_dao import MoodDAO
+    from dao.playlist_dao import PlaylistDAO
+    from dao.playlist_song_dao import PlaylistSongDAO
+    from dao.report_dao import ReportDAO
+    from dao.song_dao import SongDAO
+    from dao.user_dao import UserDAO
+
+    for cls in (ArtistDAO, MoodDAO, PlaylistDAO, PlaylistSongDAO, ReportDAO, SongDAO, UserDAO):
+        instrument_class(cls)
+    database.set_query_wrapper(_query_wrapper)
+    _enabled = True
+
+
+# ---- reporting ----
+def records(page=None):
+    with _log_lock:
+        entries = list(_log)
+    return [r for r in entries if page is None or r["page"] == page]
+
+
+def summary(entries=None):
+    """Per-(kind, name) totals, slowest first: calls, total/mean/max ms, rows, bytes, retries, errors."""
+    groups = {}
+    for r in records() if entries is None else entries:
+        g = groups.setdefault((r["kind"], r["name"]), {
+            "kind": r["kind"], "name": r["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "rows": 0, "bytes": 0, "retries": 0, "errors": 0,
+        })
+        g["calls"] += 1
+        g["total_ms"] += r["ms"]
+        g["max_ms"] = max(g["max_ms"], r["ms"])
+        g["rows"] += r["rows"]
+        g["bytes"] += r["bytes"]
+        g["retries"] += r["retries"]
+        g["errors"] += 1 if r["error"] else 0
+    out = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+    for g in out:
+        g["total_ms"] = round(g["total_ms"], 1)
+        g["mean_ms"] = round(g["total_ms"] / g["calls"], 2)
+    return out
+
+
+def format_summary(entries=None, limit=25):
+    """Plain-text table of summary(), for the CLI's --profile."""
+    rows = summary(entries)
+    lines = [f"{'kind':<6} {'name':<40} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9} "
+             f"{'rows':>8} {'bytes':>10} {'retries':>7} {'errors':>6}"]
+    for g in rows[:limit]:
+        lines.append(f"{g['kind']:<6} {g['name'][:40]:<40} {g['calls']:>6} {g['total_ms']:>10.1f} "
+                     f"{g['mean_ms']:>9.2f} {g['max_ms']:>9.1f} {g['rows']:>8} {g['bytes']:>10} "
+                     f"{g['retries']:>7} {g['errors']:>6}")
+    queries = [g for g in rows if g["kind"] == "query"]
+    lines.append(f"{sum(g['calls'] for g in queries)} round trips, "
+                 f"{sum(g['total_ms'] for g in queries):.1f} ms in queries")
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+"""Deferred imports for the CLI and app entry points.
+
+    pd = lazy_module("pandas")
+    PlaylistDAO = lazy_attr("dao.playlist_dao", "PlaylistDAO")
+
+Both return stand-ins that import on first use (attribute access or call),
+like database.supabase does for the client. The menu or page that needs
+pandas, numpy or a DAO pays its import cost; showing the CLI menu or the
+login screen does not. Check the effect with import_budget.py.
+"""
+import importlib
+
+
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        # after the first call this is a sys.modules lookup
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+
+class _LazyAttr:
+    def __init__(self, module, name):
+        self._module = module
+        self._name = name
+        self._value = None
+
+    def _load(self):
+        if self._value is None:
+            self._value = getattr(importlib.import_module(self._module), self._name)
+        return self._value
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy {self._module}.{self._name}>"
+
+
+def lazy_module(name):
+    """Stand-in for `import name`; the module is imported on first attribute access."""
+    return _LazyModule(name)
+
+
+def lazy_attr(module, name):
+    """Stand-in for `from module import name` where name is a class or function.
+
+    Constants are read through lazy_module instead, since a stand-in cannot
+    behave as a plain value.
+    """
+    return _LazyAttr(module, name)
@@ -0,0 +1,155 @@
+"""Session-held copies of the rows a page renders, edited optimistically.
+
+    model = LocalModel(ttl=300)
+    rows = model.view(("moods", user_id), load=lambda: fetch_moods(user_id), version_fn=lambda: version("moods"))
+    model.mutate("Create mood", apply=..., revert=..., remote=lambda: dao.create_mood(...))
+
+view() keeps what a loader returned and serves it until the entry's version
+moves (someone else changed the data), its ttl passes, or it is dropped.
+mutate() edits the held values at once, so the next render costs no reads.
+It then runs the server call on a background thread, one mutation at a time
+and in order. A falsy result or an exception reverts the edit, passes a
+message to on_failure right away and queues it for take_failures(); a success runs reconcile (e.g. swap a
+placeholder row for the server's row) and marks the touched entries
+current. Entries with mutations in flight are never reloaded, so an
+optimistic edit is not overwritten by a read taken before the write landed.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Entry:
+    def __init__(self, value, version_fn):
+        self.value = value
+        self.version_fn = version_fn
+        self.version = version_fn() if version_fn else None
+        self.loaded = time.monotonic()
+
+
+class LocalModel:
+    def __init__(self, ttl=300, sync_context=None, on_failure=None):
+        self.ttl = ttl
+        # sync_context() -> a context manager entered around each sync (e.g. to attach the
+        # Streamlit script context); on_failure(message) is called from the sync thread
+        self._sync_context = sync_context or contextlib.nullcontext
+        self._on_failure = on_failure
+        self._entries = {}
+        self._pending = Counter()   # key -> mutations in flight
+        self._in_flight = 0
+        self._failures = deque(maxlen=20)
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="local-model-sync")
+
+    # ---- reads ----
+    def view(self, key, load, version_fn=None):
+        """The held value for key, loading it when missing or stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self._pending[key] or self._fresh(entry)):
+                return entry.value
+        value = load()
+        with self._lock:
+            if self._pending[key] and key in self._entries:
+                return self._entries[key].value  # a mutation started while we were loading
+            self._entries[key] = _Entry(value, version_fn)
+        return value
+
+    def _fresh(self, entry):
+        if time.monotonic() - entry.loaded > self.ttl:
+            return False
+        return entry.version_fn is None or entry.version_fn() == entry.version
+
+    def keys(self, prefix):
+        with self._lock:
+            return [k for k in self._entries if k[:len(prefix)] == prefix]
+
+    def edit(self, prefix, fn):
+        """Call fn(value) on every held entry whose key starts with prefix; returns {key: fn's result}."""
+        with self._lock:
+            return {key: fn(self._entries[key].value) for key in self.keys(prefix)}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else default
+
+    def drop(self, prefix):
+        """Forget entries (they reload on next view); returns {key: value} so a revert can restore them."""
+        with self._lock:
+            return {k: self._entries.pop(k) for k in self.keys(prefix) if not self._pending[k]}
+
+    def restore(self, dropped):
+        with self._lock:
+            for key, entry in dropped.items():
+                self._entries.setdefault(key, entry)
+
+    # ---- writes ----
+    def mutate(self, label, apply, revert, remote, reconcile=None):
+        """Apply locally now, sync in the background.
+
+        apply(model) -> keys it touched; revert(model) undoes it; remote() -> result
+        (falsy means failure); reconcile(model, result) folds the server's answer in.
+        Returns the Future of the background sync.
+        """
+        with self._lock:
+            keys = list(apply(self) or [])
+            self._pending.update(keys)
+            self._in_flight += 1
+        # the sync thread doesn't inherit context variables; run it in a copy of the caller's
+        # (e.g. so its queries report to the instrumentation scope of the page that mutated)
+        return self._executor.submit(contextvars.copy_context().run, self._sync, label, keys, revert, remote, reconcile)
+
+    def _sync(self, label, keys, revert, remote, reconcile):
+        with self._sync_context():
+            return self._apply_sync(label, keys, revert, remote, reconcile)
+
+    def _apply_sync(self, label, keys, revert, remote, reconcile):
+        failure = None
+        try:
+            result, error = remote(), None
+        except Exception as e:
+            result, error = None, e
+        with self._lock:
+            try:
+                if result:
+                    if reconcile is not None:
+                        reconcile(self, result)
+                else:
+                    revert(self)
+                    failure = f"{label} failed{f': {error}' if error else ''}; the change was undone."
+                    self._failures.append(failure)
+            finally:
+                self._in_flight -= 1
+                for key in keys:
+                    self._pending[key] -= 1
+                    if self._pending[key] <= 0:
+                        del self._pending[key]
+                    entry = self._entries.get(key)
+                    if result and entry is not None and entry.version_fn:
+                        entry.version = entry.version_fn()  # our own write moved it; the copy already has it
+        if failure and self._on_failure is not None:
+            self._on_failure(failure)
+        return result
+
+    def syncing(self):
+        """Number of mutations not yet confirmed by the server."""
+        with self._lock:
+            return self._in_flight
+
+    def has_failures(self):
+        with self._lock:
+            return bool(self._failures)
+
+    def take_failures(self):
+        with self._lock:
+            failures = list(self._failures)
+            self._failures.clear()
+        return failures
+
+    def wait(self, timeout=None):
+        """Block until every queued mutation has synced (for scripts and shutdown)."""
+        self._executor.submit(lambda: None).result(timeout)
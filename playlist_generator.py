@@ -0,0 +1,102 @@
+"""Build a playlist for a mood that runs for a target duration.
+
+    result = generate_playlist(index, user_id, mood_id, "Focus", target_seconds=45 * 60, tolerance=60)
+
+Candidates are the mood's top recommendations (recommender.SongIndex), best
+first. pick_songs() solves a bounded subset-sum over their durations: a
+Python int is used as a bitset of reachable totals (bit s set = some subset
+sums to s seconds), each song shifts and ORs it in, and the totals never
+exceed target + tolerance. The total closest to the target is then traced
+back through per-song snapshots, skipping lower-ranked songs whenever the
+total is still reachable without them. The cost is O(pool x target / 64)
+word operations, so a few thousand candidates for a multi-hour target take
+milliseconds.
+"""
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from dao.playlist_dao import PlaylistDAO
+from dao.unit_of_work import UnitOfWork
+
+POOL_SIZE = 2000        # top-ranked candidates considered
+DEFAULT_TOLERANCE = 60  # seconds either side of the target
+
+
+def pick_songs(candidates, target, tolerance=DEFAULT_TOLERANCE):
+    """Subset of candidates (best first) whose durations total target ± tolerance, or None."""
+    durations = np.array([c.get("duration") or 0 for c in candidates], dtype=np.int64)
+    upper = target + tolerance
+    lower = max(target - tolerance, 1)
+    # presort once: songs that can never fit, or have no duration, are dropped up front
+    order = np.argsort(durations, kind="stable")
+    by_duration = durations[order]
+    usable = order[np.searchsorted(by_duration, 1):np.searchsorted(by_duration, upper, side="right")]
+    if durations[usable].sum() < lower:
+        return None
+    usable = np.sort(usable)  # back to rank order, so backtracking drops the weakest songs first
+
+    mask = (1 << (upper + 1)) - 1
+    reachable = 1
+    snapshots = []
+    for i in usable:
+        snapshots.append(reachable)
+        reachable = (reachable | (reachable << int(durations[i]))) & mask
+        if (reachable >> target) & 1:
+            # the exact target is reachable; later (weaker) songs are not needed
+            break
+
+    best = None
+    for offset in range(tolerance + 1):
+        for total in (target - offset, target + offset):
+            if lower <= total <= upper and (reachable >> total) & 1:
+                best = total
+                break
+        if best is not None:
+            break
+    if best is None:
+        return None
+
+    picked = []
+    for step in range(len(snapshots) - 1, -1, -1):
+        before = snapshots[step]
+        if (before >> best) & 1:
+            continue  # reachable without this song
+        i = usable[step]
+        picked.append(candidates[i])
+        best -= int(durations[i])
+    picked.reverse()
+    return picked
+
+
+def generate_playlist(index, user_id, mood_id, mood_name, target_seconds, tolerance=DEFAULT_TOLERANCE,
+                      playlist_id=None, name=None, pool_size=POOL_SIZE):
+    """Pick songs for the mood and write them; returns {playlist_id, songs, total} or None.
+
+    With playlist_id the songs are added to that playlist; otherwise a new
+    playlist tagged with the mood is created. Either way the memberships go
+    out as one bulk insert into playlist_songs.
+    """
+    seeds = PlaylistDAO().get_song_ids_by_mood(mood_id)
+    candidates = index.recommend(seeds, text=mood_name or "", k=pool_size)
+    songs = pick_songs(candidates, int(target_seconds), int(tolerance))
+    if not songs:
+        return None
+
+    uow = UnitOfWork()
+    if playlist_id is None:
+        playlist_id = str(uuid.uuid4())
+        uow.insert("playlists", {
+            "playlist_id": playlist_id,
+            "user_id": user_id,
+            "playlist_name": name or f"{mood_name} · {round(target_seconds / 60)} min",
+            "description": f"Generated for {mood_name}",
+            "mood_id": mood_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+    uow.add_songs_to_playlist(playlist_id, [s["song_id"] for s in songs])
+    report = uow.flush()
+    if report["failed"]:
+        return None
+    return {"playlist_id": playlist_id, "songs": songs, "total": sum(s["duration"] for s in songs)}
@@ -0,0 +1,156 @@
+"""Time-series rollups for the Reports page.
+
+    trend = created_trend("week")      # playlists / moods / songs created per week
+    growth = library_growth("month")   # cumulative playlists per user
+
+Rows are streamed from the source table by ``created_at`` in keyset pages and
+counted per bucket with a vectorized pandas groupby on a time Grouper; pages
+are summed as they arrive, so memory does not grow with the table. Buckets
+that have closed are persisted in ``report_rollups``. A later refresh streams
+only the rows created after the newest persisted bucket, which is normally
+just the current, still-open bucket.
+
+Counts are of rows created in each bucket: rows deleted later are not
+subtracted, and rows written with an old ``created_at`` after their bucket
+closed are missed. ``rebuild=True`` recounts a series from scratch.
+"""
+import pandas as pd
+
+from config import PAGE_SIZE
+from database import supabase
+from dao.pagination import iter_pages
+
+# series -> (table, keyset column, dimension column or None)
+SERIES = {
+    "playlists": ("playlists", "playlist_id", None),
+    "moods": ("moods", "mood_id", None),
+    "songs": ("songs", "song_id", None),
+    "playlists_by_user": ("playlists", "playlist_id", "user_id"),
+}
+# bucket -> pandas frequency; weeks start on Monday
+FREQS = {"day": "D", "week": "W-MON", "month": "MS"}
+ROLLUP_TABLE = "report_rollups"
+
+
+def bucket_start(ts, freq):
+    """Start of the bucket containing ts (naive UTC)."""
+    ts = pd.Timestamp(ts).normalize()
+    if freq == "week":
+        return ts - pd.Timedelta(days=ts.weekday())
+    if freq == "month":
+        return ts.replace(day=1)
+    return ts
+
+
+def _next_bucket(start, freq):
+    if freq == "week":
+        return start + pd.Timedelta(days=7)
+    if freq == "month":
+        return start + pd.offsets.MonthBegin(1)
+    return start + pd.Timedelta(days=1)
+
+
+def _parse_times(values):
+    # created_at comes as ISO strings with or without an offset; naive ones are UTC
+    return pd.to_datetime(pd.Series(values, dtype=object), utc=True, format="ISO8601", errors="coerce").dt.tz_convert(None)
+
+
+def _count_page(rows, freq, dimension):
+    """Series of counts indexed by (bucket_start, dimension) for one page of rows."""
+    df = pd.DataFrame({
+        "created_at": _parse_times([r.get("created_at") for r in rows]),
+        "dimension": [str(r.get(dimension) or "") if dimension else "" for r in rows],
+    }).dropna(subset=["created_at"])
+    return df.groupby([pd.Grouper(key="created_at", freq=FREQS[freq], label="left", closed="left"),
+                       "dimension"]).size()
+
+
+def _stream_counts(series, freq, since=None):
+    table, key, dimension = SERIES[series]
+    columns = "created_at" + (f", {dimension}" if dimension else "")
+    filters = [("created_at", "gte", since.isoformat())] if since is not None else []
+    total = None
+    for page in iter_pages(table, key, columns, PAGE_SIZE, filters):
+        counts = _count_page(page, freq, dimension)
+        total = counts if total is None else total.add(counts, fill_value=0)
+    if total is None or total.empty:
+        return pd.DataFrame(columns=["bucket_start", "dimension", "count"])
+    total = total.astype("int64").rename("count").reset_index()
+    return total.rename(columns={"created_at": "bucket_start"})
+
+
+def _load_persisted(series, freq):
+    rows, start = [], 0
+    while True:
+        res = supabase.table(ROLLUP_TABLE).select("bucket_start, dimension, count") \
+            .eq("series", series).eq("freq", freq) \
+            .order("bucket_start").order("dimension") \
+            .range(start, start + PAGE_SIZE - 1).execute()
+        page = res.data if res and res.data else []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+    df = pd.DataFrame(rows, columns=["bucket_start", "dimension", "count"])
+    df["bucket_start"] = pd.to_datetime(df["bucket_start"])
+    return df
+
+
+def _persist(series, freq, df):
+    rows = [{"series": series, "freq": freq, "bucket_start": b.isoformat(), "dimension": d, "count": int(c)}
+            for b, d, c in df[["bucket_start", "dimension", "count"]].itertuples(index=False)]
+    for i in range(0, len(rows), PAGE_SIZE):
+        supabase.table(ROLLUP_TABLE).upsert(rows[i:i + PAGE_SIZE], on_conflict="series,freq,bucket_start,dimension").execute()
+
+
+def refresh_rollup(series, freq="day", now=None, rebuild=False):
+    """All buckets of a series as a DataFrame (bucket_start, dimension, count), oldest first.
+
+    Closed buckets found in this pass are persisted; the open bucket is
+    returned but recomputed on every refresh.
+    """
+    if series not in SERIES or freq not in FREQS:
+        raise ValueError(f"unknown rollup {series!r}/{freq!r}")
+    if rebuild:
+        supabase.table(ROLLUP_TABLE).delete().eq("series", series).eq("freq", freq).execute()
+    persisted = _load_persisted(series, freq)
+    since = _next_bucket(persisted["bucket_start"].max(), freq) if not persisted.empty else None
+    fresh = _stream_counts(series, freq, since)
+
+    current = bucket_start(now if now is not None else pd.Timestamp.now(tz="UTC").tz_convert(None), freq)
+    closed = fresh[fresh["bucket_start"] < current]
+    if not closed.empty:
+        _persist(series, freq, closed)
+    frames = [df for df in (persisted, fresh) if not df.empty]
+    if not frames:
+        return fresh
+    return pd.concat(frames, ignore_index=True).sort_values(["bucket_start", "dimension"], ignore_index=True)
+
+
+def _fill_buckets(wide, freq):
+    """Reindex a bucket-indexed frame so empty buckets show as 0."""
+    if wide.empty:
+        return wide
+    full = pd.date_range(wide.index.min(), wide.index.max(), freq=FREQS[freq])
+    return wide.reindex(full, fill_value=0).rename_axis("bucket_start")
+
+
+def created_trend(freq="day", series=("playlists", "moods", "songs")):
+    """Rows created per bucket, one column per series."""
+    columns = {}
+    for name in series:
+        df = refresh_rollup(name, freq)
+        columns[name] = df.groupby("bucket_start")["count"].sum() if not df.empty else pd.Series(dtype="int64")
+    wide = pd.DataFrame(columns).fillna(0).astype("int64").sort_index()
+    return _fill_buckets(wide, freq)
+
+
+def library_growth(freq="month", top=10):
+    """Cumulative playlists per user (columns = user_id) for the `top` largest libraries."""
+    df = refresh_rollup("playlists_by_user", freq)
+    if df.empty:
+        return pd.DataFrame()
+    wide = df.pivot_table(index="bucket_start", columns="dimension", values="count", aggfunc="sum", fill_value=0)
+    growth = _fill_buckets(wide, freq).cumsum()
+    keep = growth.iloc[-1].nlargest(top).index
+    return growth[keep]
@@ -0,0 +1,11 @@
+-- Supports PlaylistDAO.get_playlist_detail on Supabase/Postgres.
+-- The embedded select returns each song's added_at and orders a playlist's
+-- songs by position, served by idx_playlist_songs_playlist_position
+-- (sql/playlist_positions.sql). added_at is also the order the one-off
+-- position backfill in that file numbers existing rows in.
+
+alter table public.playlist_songs
+    add column if not exists added_at timestamptz not null default now();
+
+-- no query orders by added_at any more; the backfill runs once and scans anyway
+drop index if exists public.idx_playlist_songs_playlist_added;
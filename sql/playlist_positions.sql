@@ -0,0 +1,80 @@
+-- Playlist order on Supabase/Postgres: playlist_songs.position holds a fractional
+-- rank key (see dao/rank.py), so moving a song rewrites only that song's row.
+-- Run once in the SQL editor (safe to re-run). Existing rows are numbered in the
+-- order they were added.
+
+alter table public.playlist_songs
+    add column if not exists position text collate "C";
+
+create index if not exists idx_playlist_songs_playlist_position
+    on public.playlist_songs (playlist_id, position);
+
+-- next key after `key`; mirrors dao.rank.key_after
+create or replace function public.rank_after(key text) returns text
+language plpgsql immutable as $$
+declare
+    digits constant text := '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz';
+    padded text;
+    d int;
+begin
+    if key is null or key = '' then
+        return 'V';
+    end if;
+    padded := rpad(key, greatest(length(key), 3), '0');
+    for i in reverse length(padded)..1 loop
+        d := strpos(digits, substr(padded, i, 1));
+        if d < 62 then
+            return substr(padded, 1, i - 1) || substr(digits, d + 1, 1);
+        end if;
+    end loop;
+    return key || 'V';
+end $$;
+
+-- songs added without a position go after the playlist's last song
+create or replace function public.trg_playlist_songs_position() returns trigger
+language plpgsql as $$
+begin
+    if new.position is null then
+        select public.rank_after(max(position)) into new.position
+          from public.playlist_songs where playlist_id = new.playlist_id;
+    end if;
+    return new;
+end $$;
+
+drop trigger if exists playlist_songs_position on public.playlist_songs;
+create trigger playlist_songs_position before insert on public.playlist_songs
+    for each row execute function public.trg_playlist_songs_position();
+
+-- backfill: keys 1000 apart, in the order songs were added. Each playlist gets
+-- enough base-62 digits (at least 4) that its largest key, count * 1000, fits.
+create or replace function public.rank_key(n bigint, width int) returns text
+language plpgsql immutable as $$
+declare
+    digits constant text := '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz';
+    result text := '';
+begin
+    for i in 1..width loop
+        result := substr(digits, (n % 62)::int + 1, 1) || result;
+        n := n / 62;
+    end loop;
+    return rtrim(result, '0');
+end $$;
+
+update public.playlist_songs ps
+   set position = public.rank_key(k.rn * 1000,
+                                  greatest(4, ceil(log(62, k.cnt * 1000 + 1))::int))
+  from (select playlist_id, song_id,
+               row_number() over (partition by playlist_id order by added_at, song_id) as rn,
+               count(*) over (partition by playlist_id) as cnt
+          from public.playlist_songs where position is null) k
+ where ps.playlist_id = k.playlist_id and ps.song_id = k.song_id;
+
+-- get_songs_in_playlist (PlaylistSongDAO.list_songs_in_playlist) in playlist order
+create or replace function public.get_songs_in_playlist(playlist_uuid uuid)
+returns setof public.songs
+language sql stable as $$
+    select s.* from public.playlist_songs ps
+      join public.songs s on s.song_id = ps.song_id
+     where ps.playlist_id = playlist_uuid
+     order by ps.position;
+$$;
@@ -0,0 +1,15 @@
+-- Index behind PlaylistDAO.search_playlists on Supabase/Postgres.
+-- Run once in the SQL editor (safe to re-run).
+
+create extension if not exists pg_trgm;
+create extension if not exists btree_gin;
+
+-- both searches, eq user_id + ilike 'abc%' and ilike '%abc%', served by one
+-- GIN index: btree_gin keys user_id, the trigrams serve ilike (a btree on
+-- lower(playlist_name) could not, since the query does not use lower())
+create index if not exists idx_playlists_user_name_trgm
+    on public.playlists using gin (user_id, playlist_name gin_trgm_ops);
+
+-- superseded by idx_playlists_user_name_trgm
+drop index if exists public.idx_playlists_user_name_lower;
+drop index if exists public.idx_playlists_name_trgm;
@@ -0,0 +1,163 @@
+-- Report aggregates behind ReportDAO on Supabase/Postgres.
+-- Counters are kept current by row triggers, so reports read a few precomputed
+-- rows instead of scanning users/playlists/playlist_songs. Run once in the SQL
+-- editor (safe to re-run), then `select rebuild_report_aggregates();` to fill
+-- the tables from existing data. The same call repairs any drift later.
+
+create table if not exists public.role_user_counts (
+    role       text primary key,
+    user_count bigint not null default 0
+);
+
+create table if not exists public.mood_playlist_counts (
+    mood_id        uuid primary key references public.moods (mood_id) on delete cascade,
+    playlist_count bigint not null default 0
+);
+
+create table if not exists public.playlist_stats (
+    playlist_id    uuid primary key references public.playlists (playlist_id) on delete cascade,
+    song_count     bigint not null default 0,
+    total_duration bigint not null default 0
+);
+
+create index if not exists idx_playlist_stats_song_count on public.playlist_stats (song_count);
+
+-- users per role ------------------------------------------------------------
+create or replace function public.trg_users_role_counts() returns trigger
+language plpgsql as $$
+begin
+    if tg_op in ('DELETE', 'UPDATE') then
+        update public.role_user_counts set user_count = user_count - 1 where role = coalesce(old.role, '');
+        delete from public.role_user_counts where user_count <= 0;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into public.role_user_counts (role, user_count) values (coalesce(new.role, ''), 1)
+            on conflict (role) do update set user_count = public.role_user_counts.user_count + 1;
+    end if;
+    return null;
+end $$;
+
+drop trigger if exists users_role_counts on public.users;
+create trigger users_role_counts
+    after insert or delete on public.users
+    for each row execute function public.trg_users_role_counts();
+
+drop trigger if exists users_role_counts_upd on public.users;
+create trigger users_role_counts_upd
+    after update of role on public.users
+    for each row when (old.role is distinct from new.role)
+    execute function public.trg_users_role_counts();
+
+-- playlists per mood, plus an empty stats row per playlist ------------------
+create or replace function public.trg_playlists_mood_counts() returns trigger
+language plpgsql as $$
+begin
+    if tg_op = 'INSERT' then
+        insert into public.playlist_stats (playlist_id) values (new.playlist_id) on conflict do nothing;
+    end if;
+    if tg_op in ('DELETE', 'UPDATE') and old.mood_id is not null then
+        update public.mood_playlist_counts set playlist_count = playlist_count - 1 where mood_id = old.mood_id;
+        delete from public.mood_playlist_counts where playlist_count <= 0;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.mood_id is not null then
+        insert into public.mood_playlist_counts (mood_id, playlist_count) values (new.mood_id, 1)
+            on conflict (mood_id) do update set playlist_count = public.mood_playlist_counts.playlist_count + 1;
+    end if;
+    return null;
+end $$;
+
+drop trigger if exists playlists_mood_counts on public.playlists;
+create trigger playlists_mood_counts
+    after insert or delete on public.playlists
+    for each row execute function public.trg_playlists_mood_counts();
+
+drop trigger if exists playlists_mood_counts_upd on public.playlists;
+create trigger playlists_mood_counts_upd
+    after update of mood_id on public.playlists
+    for each row when (old.mood_id is distinct from new.mood_id)
+    execute function public.trg_playlists_mood_counts();
+
+-- songs and total duration per playlist -------------------------------------
+create or replace function public.trg_playlist_songs_stats() returns trigger
+language plpgsql as $$
+begin
+    if tg_op = 'INSERT' then
+        insert into public.playlist_stats (playlist_id, song_count, total_duration)
+            values (new.playlist_id, 1,
+                    coalesce((select duration from public.songs where song_id = new.song_id), 0))
+            on conflict (playlist_id) do update
+                set song_count = public.playlist_stats.song_count + 1,
+                    total_duration = public.playlist_stats.total_duration + excluded.total_duration;
+    else
+        update public.playlist_stats
+           set song_count = song_count - 1,
+               total_duration = total_duration
+                   - coalesce((select duration from public.songs where song_id = old.song_id), 0)
+         where playlist_id = old.playlist_id;
+    end if;
+    return null;
+end $$;
+
+drop trigger if exists playlist_songs_stats on public.playlist_songs;
+create trigger playlist_songs_stats
+    after insert or delete on public.playlist_songs
+    for each row execute function public.trg_playlist_songs_stats();
+
+create or replace function public.trg_songs_duration_stats() returns trigger
+language plpgsql as $$
+begin
+    update public.playlist_stats
+       set total_duration = total_duration + coalesce(new.duration, 0) - coalesce(old.duration, 0)
+     where playlist_id in (select playlist_id from public.playlist_songs where song_id = new.song_id);
+    return null;
+end $$;
+
+drop trigger if exists songs_duration_stats on public.songs;
+create trigger songs_duration_stats
+    after update of duration on public.songs
+    for each row when (old.duration is distinct from new.duration)
+    execute function public.trg_songs_duration_stats();
+
+-- Remove memberships while the song row (and its duration) is still visible;
+-- the on-delete-cascade runs after the song is gone.
+create or replace function public.trg_songs_delete_memberships() returns trigger
+language plpgsql as $$
+begin
+    delete from public.playlist_songs where song_id = old.song_id;
+    return old;
+end $$;
+
+drop trigger if exists songs_delete_memberships on public.songs;
+create trigger songs_delete_memberships
+    before delete on public.songs
+    for each row execute function public.trg_songs_delete_memberships();
+
+-- Full recount (ReportDAO.rebuild_aggregates / CLI "Rebuild Report Counters") --
+create or replace function public.rebuild_report_aggregates()
+returns table ("table" text, "rows" bigint)
+language plpgsql as $$
+begin
+    lock table public.role_user_counts, public.mood_playlist_counts, public.playlist_stats
+        in exclusive mode;
+
+    delete from public.role_user_counts;
+    insert into public.role_user_counts (role, user_count)
+        select coalesce(u.role, ''), count(*) from public.users u group by coalesce(u.role, '');
+
+    delete from public.mood_playlist_counts;
+    insert into public.mood_playlist_counts (mood_id, playlist_count)
+        select p.mood_id, count(*) from public.playlists p where p.mood_id is not null group by p.mood_id;
+
+    delete from public.playlist_stats;
+    insert into public.playlist_stats (playlist_id, song_count, total_duration)
+        select p.playlist_id, count(s.song_id), coalesce(sum(s.duration), 0)
+          from public.playlists p
+          left join public.playlist_songs ps on ps.playlist_id = p.playlist_id
+          left join public.songs s on s.song_id = ps.song_id
+         group by p.playlist_id;
+
+    return query
+        select 'role_user_counts', (select count(*) from public.role_user_counts)
+        union all select 'mood_playlist_counts', (select count(*) from public.mood_playlist_counts)
+        union all select 'playlist_stats', (select count(*) from public.playlist_stats);
+end $$;
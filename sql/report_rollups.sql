@@ -0,0 +1,17 @@
+-- Persisted time buckets for rollups.py (Reports page trends) on Supabase/Postgres.
+-- Run once in the SQL editor (safe to re-run). Rows are rebuilt on demand, so
+-- truncating the table is always safe.
+
+create table if not exists public.report_rollups (
+    series       text        not null,
+    freq         text        not null,
+    bucket_start timestamp   not null,
+    dimension    text        not null default '',
+    count        bigint      not null,
+    primary key (series, freq, bucket_start, dimension)
+);
+
+-- streaming rows by created_at range
+create index if not exists idx_playlists_created_at on public.playlists (created_at);
+create index if not exists idx_moods_created_at on public.moods (created_at);
+create index if not exists idx_songs_created_at on public.songs (created_at);
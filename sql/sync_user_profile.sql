@@ -0,0 +1,24 @@
+-- sync_user_profile(): the sign-in profile sync on Supabase/Postgres in one round trip.
+-- Makes sure public.users has a row for the auth user (adopting a row already
+-- registered under the same email, else inserting one) and returns that row with
+-- its role. Run once in the SQL editor (safe to re-run). Until it exists the app
+-- falls back to the select/update/insert sequence in ensure_profile_and_sync().
+
+create or replace function public.sync_user_profile(p_user_id uuid, p_email text)
+returns table (user_id uuid, username text, email text, role text)
+language plpgsql as $$
+#variable_conflict use_column
+begin
+    if not exists (select 1 from public.users where user_id = p_user_id) then
+        update public.users set user_id = p_user_id where email = p_email;
+        if not found then
+            insert into public.users (user_id, email, username, role)
+            values (p_user_id, p_email, split_part(coalesce(p_email, ''), '@', 1), 'User')
+            on conflict (user_id) do nothing;
+        end if;
+    end if;
+    return query
+        select u.user_id, u.username, u.email, u.role from public.users u where u.user_id = p_user_id;
+end $$;
+
+grant execute on function public.sync_user_profile(uuid, text) to authenticated;
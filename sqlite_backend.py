@@ -0,0 +1,729 @@
+"""Local SQLite storage engine.
+
+The DAOs are written against the Supabase/PostgREST query builder
+(``table(...).select(...).eq(...).execute()`` and ``rpc(...)``). That builder
+chain is the backend interface: ``SQLiteClient`` implements the subset of it
+the DAOs use, so every DAO runs unchanged against either engine. Select
+``STORAGE_BACKEND=sqlite`` (and optionally ``SQLITE_PATH``) to use it.
+"""
+import hashlib
+import sqlite3
+import threading
+import uuid
+
+from dao.rank import key_after, spread
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id       TEXT PRIMARY KEY,
+    username      TEXT,
+    email         TEXT UNIQUE,
+    password_hash TEXT,
+    role          TEXT DEFAULT 'User',
+    created_at    TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE TABLE IF NOT EXISTS moods (
+    mood_id     TEXT PRIMARY KEY,
+    user_id     TEXT,
+    mood_name   TEXT NOT NULL,
+    description TEXT DEFAULT '',
+    created_at  TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE TABLE IF NOT EXISTS artists (
+    artist_id   TEXT PRIMARY KEY,
+    user_id     TEXT,
+    name        TEXT NOT NULL,
+    description TEXT DEFAULT '',
+    created_at  TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE TABLE IF NOT EXISTS songs (
+    song_id    TEXT PRIMARY KEY,
+    title      TEXT NOT NULL,
+    duration   INTEGER,
+    artist_id  TEXT REFERENCES artists(artist_id) ON DELETE SET NULL,
+    genre_id   TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id   TEXT PRIMARY KEY,
+    user_id       TEXT,
+    playlist_name TEXT NOT NULL COLLATE NOCASE,
+    description   TEXT DEFAULT '',
+    mood_id       TEXT REFERENCES moods(mood_id) ON DELETE SET NULL,
+    created_at    TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE TABLE IF NOT EXISTS playlist_songs (
+    playlist_id TEXT NOT NULL REFERENCES playlists(playlist_id) ON DELETE CASCADE,
+    song_id     TEXT NOT NULL REFERENCES songs(song_id) ON DELETE CASCADE,
+    added_at    TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    position    TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_playlists_user_id ON playlists(user_id);
+CREATE INDEX IF NOT EXISTS idx_playlists_mood_id ON playlists(mood_id);
+CREATE INDEX IF NOT EXISTS idx_moods_user_id ON moods(user_id);
+-- playlist search: prefix ilike on a NOCASE column is an index range scan
+CREATE INDEX IF NOT EXISTS idx_playlists_user_name ON playlists(user_id, playlist_name);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_playlist_songs_playlist_song ON playlist_songs(playlist_id, song_id);
+CREATE INDEX IF NOT EXISTS idx_playlist_songs_song_id ON playlist_songs(song_id);
+-- songs are listed by position (idx_playlist_songs_playlist_position), not added_at
+DROP INDEX IF EXISTS idx_playlist_songs_playlist_added;
+"""
+
+# Report aggregates (ReportDAO), kept current by triggers; rebuild_report_aggregates repairs drift.
+AGGREGATES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS role_user_counts (
+    role       TEXT PRIMARY KEY,
+    user_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS mood_playlist_counts (
+    mood_id        TEXT PRIMARY KEY REFERENCES moods(mood_id) ON DELETE CASCADE,
+    playlist_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS playlist_stats (
+    playlist_id    TEXT PRIMARY KEY REFERENCES playlists(playlist_id) ON DELETE CASCADE,
+    song_count     INTEGER NOT NULL DEFAULT 0,
+    total_duration INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_playlist_stats_song_count ON playlist_stats(song_count);
+
+-- closed time buckets persisted by rollups.py
+CREATE TABLE IF NOT EXISTS report_rollups (
+    series       TEXT NOT NULL,
+    freq         TEXT NOT NULL,
+    bucket_start TEXT NOT NULL,
+    dimension    TEXT NOT NULL DEFAULT '',
+    count        INTEGER NOT NULL,
+    PRIMARY KEY (series, freq, bucket_start, dimension)
+);
+CREATE INDEX IF NOT EXISTS idx_playlists_created_at ON playlists(created_at);
+CREATE INDEX IF NOT EXISTS idx_moods_created_at ON moods(created_at);
+CREATE INDEX IF NOT EXISTS idx_songs_created_at ON songs(created_at);
+
+-- users per role
+CREATE TRIGGER IF NOT EXISTS trg_users_count_ins AFTER INSERT ON users BEGIN
+    INSERT INTO role_user_counts (role, user_count) VALUES (COALESCE(NEW.role, ''), 1)
+        ON CONFLICT (role) DO UPDATE SET user_count = user_count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_users_count_del AFTER DELETE ON users BEGIN
+    UPDATE role_user_counts SET user_count = user_count - 1 WHERE role = COALESCE(OLD.role, '');
+    DELETE FROM role_user_counts WHERE user_count <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_users_count_upd AFTER UPDATE OF role ON users
+WHEN OLD.role IS NOT NEW.role BEGIN
+    UPDATE role_user_counts SET user_count = user_count - 1 WHERE role = COALESCE(OLD.role, '');
+    DELETE FROM role_user_counts WHERE user_count <= 0;
+    INSERT INTO role_user_counts (role, user_count) VALUES (COALESCE(NEW.role, ''), 1)
+        ON CONFLICT (role) DO UPDATE SET user_count = user_count + 1;
+END;
+
+-- playlists per mood, and an empty stats row per playlist
+CREATE TRIGGER IF NOT EXISTS trg_playlists_count_ins AFTER INSERT ON playlists BEGIN
+    INSERT OR IGNORE INTO playlist_stats (playlist_id) VALUES (NEW.playlist_id);
+    INSERT INTO mood_playlist_counts (mood_id, playlist_count) SELECT NEW.mood_id, 1 WHERE NEW.mood_id IS NOT NULL
+        ON CONFLICT (mood_id) DO UPDATE SET playlist_count = playlist_count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_playlists_count_del AFTER DELETE ON playlists BEGIN
+    UPDATE mood_playlist_counts SET playlist_count = playlist_count - 1 WHERE mood_id = OLD.mood_id;
+    DELETE FROM mood_playlist_counts WHERE playlist_count <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_playlists_count_upd AFTER UPDATE OF mood_id ON playlists
+WHEN OLD.mood_id IS NOT NEW.mood_id BEGIN
+    UPDATE mood_playlist_counts SET playlist_count = playlist_count - 1 WHERE mood_id = OLD.mood_id;
+    DELETE FROM mood_playlist_counts WHERE playlist_count <= 0;
+    INSERT INTO mood_playlist_counts (mood_id, playlist_count) SELECT NEW.mood_id, 1 WHERE NEW.mood_id IS NOT NULL
+        ON CONFLICT (mood_id) DO UPDATE SET playlist_count = playlist_count + 1;
+END;
+
+-- songs and total duration per playlist
+CREATE TRIGGER IF NOT EXISTS trg_playlist_songs_stats_ins AFTER INSERT ON playlist_songs BEGIN
+    INSERT INTO playlist_stats (playlist_id, song_count, total_duration)
+        VALUES (NEW.playlist_id, 1, COALESCE((SELECT duration FROM songs WHERE song_id = NEW.song_id), 0))
+        ON CONFLICT (playlist_id) DO UPDATE SET song_count = song_count + 1,
+                                                total_duration = total_duration + excluded.total_duration;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_playlist_songs_stats_del AFTER DELETE ON playlist_songs BEGIN
+    UPDATE playlist_stats
+       SET song_count = song_count - 1,
+           total_duration = total_duration - COALESCE((SELECT duration FROM songs WHERE song_id = OLD.song_id), 0)
+     WHERE playlist_id = OLD.playlist_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_songs_stats_duration AFTER UPDATE OF duration ON songs
+WHEN OLD.duration IS NOT NEW.duration BEGIN
+    UPDATE playlist_stats SET total_duration = total_duration + COALESCE(NEW.duration, 0) - COALESCE(OLD.duration, 0)
+     WHERE playlist_id IN (SELECT playlist_id FROM playlist_songs WHERE song_id = NEW.song_id);
+END;
+-- remove memberships while the song row (and its duration) still exists; the cascade would run too late
+CREATE TRIGGER IF NOT EXISTS trg_songs_stats_del BEFORE DELETE ON songs BEGIN
+    DELETE FROM playlist_songs WHERE song_id = OLD.song_id;
+END;
+"""
+
+# Playlist order (dao/rank.py); applied after older databases gain the position column.
+# Inserts without a position are appended after the playlist's last song, as on Postgres
+# (sql/playlist_positions.sql). QueryBuilder keys its own inserts up front so RETURNING carries
+# the position; the trigger covers raw SQL. rank_after is registered on the connection by SQLiteClient.
+POSITIONS_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_playlist_songs_playlist_position ON playlist_songs(playlist_id, position);
+CREATE TRIGGER IF NOT EXISTS trg_playlist_songs_position AFTER INSERT ON playlist_songs
+WHEN NEW.position IS NULL BEGIN
+    UPDATE playlist_songs
+       SET position = rank_after((SELECT MAX(position) FROM playlist_songs WHERE playlist_id = NEW.playlist_id))
+     WHERE rowid = NEW.rowid;
+END;
+"""
+
+REBUILD_AGGREGATES_SQL = """
+DELETE FROM role_user_counts;
+INSERT INTO role_user_counts (role, user_count)
+    SELECT COALESCE(role, ''), COUNT(*) FROM users GROUP BY COALESCE(role, '');
+DELETE FROM mood_playlist_counts;
+INSERT INTO mood_playlist_counts (mood_id, playlist_count)
+    SELECT mood_id, COUNT(*) FROM playlists WHERE mood_id IS NOT NULL GROUP BY mood_id;
+DELETE FROM playlist_stats;
+INSERT INTO playlist_stats (playlist_id, song_count, total_duration)
+    SELECT p.playlist_id, COUNT(s.song_id), COALESCE(SUM(s.duration), 0)
+      FROM playlists p
+      LEFT JOIN playlist_songs ps ON ps.playlist_id = p.playlist_id
+      LEFT JOIN songs s ON s.song_id = ps.song_id
+     GROUP BY p.playlist_id;
+"""
+
+# Generated primary keys (tables not listed here have a composite key)
+PRIMARY_KEYS = {
+    "users": "user_id",
+    "moods": "mood_id",
+    "artists": "artist_id",
+    "songs": "song_id",
+    "playlists": "playlist_id",
+}
+
+# Embedded-select relationships: (table, embedded table) -> (local col, remote col, one-to-many)
+RELATIONS = {
+    ("playlist_songs", "songs"): ("song_id", "song_id", False),
+    ("playlist_songs", "playlists"): ("playlist_id", "playlist_id", False),
+    ("playlists", "playlist_songs"): ("playlist_id", "playlist_id", True),
+    ("playlists", "moods"): ("mood_id", "mood_id", False),
+    ("playlists", "users"): ("user_id", "user_id", False),
+    ("moods", "playlists"): ("mood_id", "mood_id", True),
+    ("songs", "artists"): ("artist_id", "artist_id", False),
+    ("songs", "playlist_songs"): ("song_id", "song_id", True),
+    ("artists", "songs"): ("artist_id", "artist_id", True),
+    ("users", "playlists"): ("user_id", "user_id", True),
+    ("users", "moods"): ("user_id", "user_id", True),
+    ("mood_playlist_counts", "moods"): ("mood_id", "mood_id", False),
+    ("playlist_stats", "playlists"): ("playlist_id", "playlist_id", False),
+}
+
+RPC_FUNCTIONS = {}
+
+
+class BackendError(Exception):
+    """Raised for invalid queries, mirroring postgrest.APIError."""
+
+
+class APIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _add_positions(conn):
+    """Give a database from before playlist ordering a position column, keeping the order songs were added."""
+    conn.execute("BEGIN")
+    conn.execute("ALTER TABLE playlist_songs ADD COLUMN position TEXT")
+    rows = conn.execute("SELECT rowid, playlist_id FROM playlist_songs ORDER BY playlist_id, added_at, rowid").fetchall()
+    by_playlist = {}
+    for r in rows:
+        by_playlist.setdefault(r["playlist_id"], []).append(r["rowid"])
+    for rowids in by_playlist.values():
+        conn.executemany("UPDATE playlist_songs SET position = ? WHERE rowid = ?", zip(spread(len(rowids)), rowids))
+    conn.execute("COMMIT")
+
+
+def rpc_function(name):
+    """Register a Python implementation of a Supabase RPC."""
+    def decorator(fn):
+        RPC_FUNCTIONS[name] = fn
+        return fn
+    return decorator
+
+
+def _parse_select(columns):
+    """Split 'a, b, rel(c, d(e))' into plain columns and (relation, sub-select) pairs."""
+    items, depth, buf = [], 0, ""
+    for ch in columns or "*":
+        if ch == "," and depth == 0:
+            items.append(buf.strip())
+            buf = ""
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        buf += ch
+    if buf.strip():
+        items.append(buf.strip())
+
+    plain, embeds = [], []
+    for item in items:
+        if "(" in item:
+            name, sub = item.split("(", 1)
+            embeds.append((name.strip(), sub[:-1]))
+        else:
+            plain.append(item)
+    return plain, embeds
+
+
+def _glob_pattern(pattern):
+    """Translate a LIKE pattern into a case-sensitive GLOB pattern."""
+    out = ""
+    for ch in pattern:
+        if ch in "*?[]":
+            out += "[" + ch + "]"
+        elif ch == "%":
+            out += "*"
+        elif ch == "_":
+            out += "?"
+        else:
+            out += ch
+    return out
+
+
+class QueryBuilder:
+    def __init__(self, client, table):
+        if table not in client.columns:
+            raise BackendError(f"relation \"{table}\" does not exist")
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._count = None
+        self._values = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._where = []
+        self._params = []
+        self._order = []
+        self._embed_order = {}
+        self._limit = None
+        self._offset = None
+        self._single = None
+
+    # ---- operations ----
+    def select(self, columns="*", count=None):
+        self._op = "select"
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, values, upsert=False, on_conflict=None, ignore_duplicates=False, **kwargs):
+        self._op = "upsert" if upsert else "insert"
+        self._values = values
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def upsert(self, values, on_conflict=None, ignore_duplicates=False, **kwargs):
+        return self.insert(values, upsert=True, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+
+    def update(self, values, **kwargs):
+        self._op = "update"
+        self._values = values
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # ---- filters ----
+    def _filter(self, column, sql, value):
+        self._check_column(column)
+        self._where.append(f'"{column}" {sql}')
+        self._params.append(int(value) if isinstance(value, bool) else value)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "= ?", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!= ?", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "> ?", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">= ?", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "< ?", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<= ?", value)
+
+    def ilike(self, column, pattern):
+        # SQLite only applies its LIKE index optimization when there is no ESCAPE clause
+        if "\\" not in pattern:
+            return self._filter(column, "LIKE ?", pattern)
+        return self._filter(column, "LIKE ? ESCAPE '\\'", pattern)
+
+    def like(self, column, pattern):
+        return self._filter(column, "GLOB ?", _glob_pattern(pattern))
+
+    def is_(self, column, value):
+        self._check_column(column)
+        if value is None or str(value).lower() == "null":
+            self._where.append(f'"{column}" IS NULL')
+        else:
+            self._where.append(f'"{column}" IS ?')
+            self._params.append(int(value) if isinstance(value, bool) else value)
+        return self
+
+    def in_(self, column, values):
+        self._check_column(column)
+        values = list(values)
+        if not values:
+            self._where.append("0")
+            return self
+        self._where.append(f'"{column}" IN ({", ".join("?" * len(values))})')
+        self._params.extend(values)
+        return self
+
+    # ---- modifiers ----
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None, reference_table=None):
+        foreign_table = foreign_table or reference_table
+        if foreign_table:
+            self._embed_order.setdefault(foreign_table, []).append((column, desc))
+            return self
+        self._check_column(column)
+        self._order.append(f'"{column}" {"DESC" if desc else "ASC"}')
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self._limit = int(size)
+        return self
+
+    def range(self, start, end):
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    # ---- execution ----
+    def _check_column(self, column):
+        if column not in self._client.columns[self._table]:
+            raise BackendError(f'column {self._table}.{column} does not exist')
+
+    def _where_sql(self):
+        return (" WHERE " + " AND ".join(self._where)) if self._where else ""
+
+    def execute(self):
+        with self._client.lock:
+            if self._op == "select":
+                data, count = self._run_select()
+            elif self._op in ("insert", "upsert"):
+                data, count = self._run_insert(), None
+            elif self._op == "update":
+                data, count = self._run_update(), None
+            else:
+                data, count = self._run_delete(), None
+
+        if self._single:
+            if len(data) > 1 or (self._single == "single" and not data):
+                raise BackendError(f"JSON object requested, {len(data)} rows returned")
+            data = data[0] if data else None
+        return APIResponse(data, count)
+
+    def _run_select(self):
+        plain, embeds = _parse_select(self._columns)
+        cols = self._client.columns[self._table]
+        if not plain or "*" in plain:
+            wanted = list(cols)
+        else:
+            wanted = plain
+            for c in wanted:
+                self._check_column(c)
+        # relationship keys are fetched even when not projected, then dropped
+        extra = []
+        for rel, _ in embeds:
+            key = RELATIONS.get((self._table, rel))
+            if key is None:
+                raise BackendError(f"no relationship between {self._table} and {rel}")
+            if key[0] not in wanted and key[0] not in extra:
+                extra.append(key[0])
+
+        sql = f'SELECT {", ".join(chr(34) + c + chr(34) for c in wanted + extra)} FROM "{self._table}"'
+        sql += self._where_sql()
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        if self._limit is not None:
+            sql += f" LIMIT {self._limit}"
+            if self._offset:
+                sql += f" OFFSET {self._offset}"
+        rows = [dict(r) for r in self._client.conn.execute(sql, self._params)]
+
+        for rel, sub in embeds:
+            self._client.embed(self._table, rows, rel, sub, self._embed_order)
+        for r in rows:
+            for c in extra:
+                r.pop(c, None)
+
+        count = None
+        if self._count:
+            count = self._client.conn.execute(
+                f'SELECT COUNT(*) FROM "{self._table}"' + self._where_sql(), self._params
+            ).fetchone()[0]
+        return rows, count
+
+    def _prepare_rows(self):
+        rows = self._values if isinstance(self._values, list) else [self._values]
+        pk = PRIMARY_KEYS.get(self._table)
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            for c in row:
+                self._check_column(c)
+            if pk and not row.get(pk):
+                row[pk] = str(uuid.uuid4())
+            prepared.append(row)
+        return prepared
+
+    def _run_insert(self):
+        rows = self._prepare_rows()
+        if not rows:
+            return []
+        conflict_cols = None
+        if self._op == "upsert":
+            conflict_cols = [c.strip() for c in (self._on_conflict or PRIMARY_KEYS.get(self._table, "")).split(",") if c.strip()]
+            if not conflict_cols:
+                raise BackendError(f"upsert on {self._table} needs on_conflict")
+
+        out = []
+        conn = self._client.conn
+        conn.execute("BEGIN")
+        try:
+            for row in rows:
+                payload = list(row)
+                if self._table == "playlist_songs" and row.get("position") is None:
+                    # Postgres keys the song in a BEFORE trigger, so RETURNING sees it; do the same here
+                    row["position"] = conn.execute(
+                        "SELECT rank_after(MAX(position)) FROM playlist_songs WHERE playlist_id = ?",
+                        [row.get("playlist_id")]).fetchone()[0]
+                names = list(row)
+                sql = (f'INSERT INTO "{self._table}" ({", ".join(chr(34) + n + chr(34) for n in names)}) '
+                       f'VALUES ({", ".join("?" * len(names))})')
+                if conflict_cols:
+                    sql += f' ON CONFLICT ({", ".join(conflict_cols)}) '
+                    # like PostgREST, an upsert updates only the columns it was given
+                    updates = [n for n in payload if n not in conflict_cols]
+                    if self._ignore_duplicates or not updates:
+                        sql += "DO NOTHING"
+                    else:
+                        sql += "DO UPDATE SET " + ", ".join(f'"{n}" = excluded."{n}"' for n in updates)
+                sql += " RETURNING *"
+                out.extend(dict(r) for r in conn.execute(sql, [row[n] for n in names]))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            raise BackendError(str(e)) from e
+        return out
+
+    def _run_update(self):
+        values = dict(self._values or {})
+        if not values:
+            raise BackendError("update requires at least one column")
+        for c in values:
+            self._check_column(c)
+        sql = f'UPDATE "{self._table}" SET ' + ", ".join(f'"{c}" = ?' for c in values)
+        sql += self._where_sql() + " RETURNING *"
+        try:
+            return [dict(r) for r in self._client.conn.execute(sql, list(values.values()) + self._params)]
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+
+    def _run_delete(self):
+        sql = f'DELETE FROM "{self._table}"' + self._where_sql() + " RETURNING *"
+        try:
+            return [dict(r) for r in self._client.conn.execute(sql, self._params)]
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+
+
+class RPCCall:
+    def __init__(self, client, name, params):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    def execute(self):
+        fn = RPC_FUNCTIONS.get(self._name)
+        if fn is None:
+            raise BackendError(f"function {self._name} does not exist")
+        with self._client.lock:
+            return APIResponse(fn(self._client.conn, **self._params))
+
+
+class _AuthUser:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class _AuthResponse:
+    def __init__(self, user):
+        self.user = user
+        self.session = {"user_id": user.id} if user else None
+
+
+class LocalAuth:
+    """Minimal stand-in for supabase.auth backed by the users table."""
+
+    def __init__(self, client):
+        self._client = client
+
+    @staticmethod
+    def _hash(password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def sign_up(self, credentials):
+        email = credentials["email"]
+        existing = self._client.table("users").select("user_id").eq("email", email).execute().data
+        if existing:
+            raise BackendError("User already registered")
+        row = self._client.table("users").insert({
+            "email": email,
+            "username": email.split("@")[0],
+            "password_hash": self._hash(credentials["password"]),
+            "role": "User",
+        }).execute().data[0]
+        return _AuthResponse(_AuthUser(row["user_id"]))
+
+    def sign_in_with_password(self, credentials):
+        rows = self._client.table("users").select("user_id, password_hash") \
+            .eq("email", credentials["email"]).execute().data
+        if not rows or rows[0]["password_hash"] != self._hash(credentials["password"]):
+            raise BackendError("Invalid login credentials")
+        return _AuthResponse(_AuthUser(rows[0]["user_id"]))
+
+    def sign_out(self):
+        return None
+
+
+class SQLiteClient:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("rank_after", 1, key_after, deterministic=True)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        if not any(r["name"] == "position" for r in self.conn.execute("PRAGMA table_info(playlist_songs)")):
+            _add_positions(self.conn)
+        self.conn.executescript(POSITIONS_SCHEMA)
+        new_aggregates = not self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'playlist_stats'").fetchone()
+        self.conn.executescript(AGGREGATES_SCHEMA)
+        if new_aggregates:
+            # databases created before the aggregate tables existed start out consistent
+            _rpc_rebuild_report_aggregates(self.conn)
+        self.columns = {}
+        for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'"):
+            self.columns[name] = [r["name"] for r in self.conn.execute(f'PRAGMA table_info("{name}")')]
+        self.auth = LocalAuth(self)
+
+    def table(self, name):
+        return QueryBuilder(self, name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None):
+        return RPCCall(self, fn, params)
+
+    def embed(self, table, rows, rel, sub_select, orders):
+        """Attach related rows for an embedded select such as songs(title)."""
+        local, remote, many = RELATIONS[(table, rel)]
+        keys = list({r[local] for r in rows if r.get(local) is not None})
+        plain = _parse_select(sub_select)[0]
+        strip_remote = "*" not in plain and remote not in plain
+        query = self.table(rel).select(f"{sub_select}, {remote}" if strip_remote else sub_select)
+        for column, desc in orders.get(rel, []):
+            query.order(column, desc=desc)
+        # nested embeds look up their own ordering by table name
+        query._embed_order = orders
+        children = query.in_(remote, keys)._run_select()[0] if keys else []
+
+        grouped = {}
+        for child in children:
+            key = child[remote] if not strip_remote else child.pop(remote)
+            grouped.setdefault(key, []).append(child)
+        for r in rows:
+            found = grouped.get(r.get(local), [])
+            r[rel] = found if many else (found[0] if found else None)
+
+
+# -------------------------
+# RPC equivalents
+# -------------------------
+@rpc_function("get_songs_in_playlist")
+def _rpc_get_songs_in_playlist(conn, playlist_uuid):
+    rows = conn.execute(
+        "SELECT s.* FROM playlist_songs ps JOIN songs s ON s.song_id = ps.song_id "
+        "WHERE ps.playlist_id = ? ORDER BY ps.position",
+        (playlist_uuid,),
+    )
+    return [dict(r) for r in rows]
+
+
+@rpc_function("sync_user_profile")
+def _rpc_sync_user_profile(conn, p_user_id, p_email):
+    """Ensure a users row for the signed-in user (see sql/sync_user_profile.sql); returns it with its role."""
+    profile = "user_id, username, email, role"
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(f"SELECT {profile} FROM users WHERE user_id = ?", (p_user_id,)).fetchone()
+        if row is None:
+            row = conn.execute(f"UPDATE users SET user_id = ? WHERE email = ? RETURNING {profile}",
+                               (p_user_id, p_email)).fetchone()
+        if row is None:
+            row = conn.execute(
+                f"INSERT INTO users (user_id, email, username, role) VALUES (?, ?, ?, 'User') RETURNING {profile}",
+                (p_user_id, p_email, (p_email or "").split("@")[0])).fetchone()
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [dict(row)]
+
+
+@rpc_function("count_users_by_role")
+def _rpc_count_users_by_role(conn):
+    rows = conn.execute("SELECT role, COUNT(*) AS count FROM users GROUP BY role ORDER BY role")
+    return [dict(r) for r in rows]
+
+
+@rpc_function("count_playlists_by_mood")
+def _rpc_count_playlists_by_mood(conn):
+    rows = conn.execute(
+        "SELECT p.mood_id, m.mood_name, COUNT(*) AS count FROM playlists p "
+        "LEFT JOIN moods m ON m.mood_id = p.mood_id "
+        "WHERE p.mood_id IS NOT NULL GROUP BY p.mood_id, m.mood_name ORDER BY count DESC"
+    )
+    return [dict(r) for r in rows]
+
+
+@rpc_function("rebuild_report_aggregates")
+def _rpc_rebuild_report_aggregates(conn):
+    """Recompute the report aggregate tables from the base tables; returns their row counts."""
+    conn.executescript("BEGIN;" + REBUILD_AGGREGATES_SQL + "COMMIT;")
+    return [{"table": t, "rows": conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]}
+            for t in ("role_user_counts", "mood_playlist_counts", "playlist_stats")]